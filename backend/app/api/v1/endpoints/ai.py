@@ -3,6 +3,7 @@ AI service endpoints for HANU-YOUTH platform
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional, Dict, Any
 from datetime import datetime
@@ -10,7 +11,11 @@ from app.core.database import get_db
 from app.models import User
 from app.api.v1.endpoints.auth import get_current_user
 from app.api.v1.endpoints.gamification import add_xp
+from app.services.ai_service import ai_service
+from app.services.quiz_generation import QuizBatchWriter
+from app.core.error_handling import ErrorHandler
 from pydantic import BaseModel
+import asyncio
 import json
 import os
 import uuid
@@ -25,6 +30,11 @@ class QuizGenerationRequest(BaseModel):
     question_types: List[str] = ["multiple_choice"]
     category: str = "general"
 
+class QuizStreamRequest(QuizGenerationRequest):
+    """Streaming quiz generation request model"""
+    persist: bool = False
+    batch_size: int = 5
+
 class QuizQuestion(BaseModel):
     """Quiz question model"""
     question_text: str
@@ -93,28 +103,11 @@ async def generate_quiz(
     db: Session = Depends(get_db)
 ):
     """Generate quiz using AI"""
-    # Simulate AI quiz generation (in real implementation, this would use HANU AI SDK)
-    
-    # Generate mock questions based on topic
-    questions = []
-    for i in range(request.question_count):
-        if "multiple_choice" in request.question_types:
-            questions.append(QuizQuestion(
-                question_text=f"What is the main concept of {request.topic} in question {i+1}?",
-                question_type="multiple_choice",
-                options=["Option A", "Option B", "Option C", "Option D"],
-                correct_answer="Option A",
-                explanation=f"This is the correct answer for question {i+1} about {request.topic}.",
-                points=10
-            ))
-        elif "true_false" in request.question_types:
-            questions.append(QuizQuestion(
-                question_text=f"{request.topic} is a fundamental concept in this field.",
-                question_type="true_false",
-                correct_answer="True",
-                explanation=f"This statement about {request.topic} is true.",
-                points=5
-            ))
+    # Cached by (topic, difficulty, count, question types); the stream endpoint generates fresh
+    generated = await ai_service.generate_quiz(
+        request.topic, request.difficulty, request.question_count, request.question_types
+    )
+    questions = [QuizQuestion(**question) for question in generated["questions"]]
     
     # Calculate rewards
     xp_reward = request.question_count * 5
@@ -129,6 +122,71 @@ async def generate_quiz(
         coin_reward=coin_reward
     )
 
+@router.post("/generate-quiz/stream")
+async def stream_quiz(
+    request: QuizStreamRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """Generate quiz using AI, streaming each question as an NDJSON line"""
+    xp_reward = request.question_count * 5
+    coin_reward = request.question_count * 2
+    title = f"AI-Generated Quiz: {request.topic}"
+    description = f"Automatically generated quiz about {request.topic}"
+    
+    async def events():
+        # The request's db session is closed once streaming starts, so the writer opens its own
+        writer = QuizBatchWriter(max(1, request.batch_size)) if request.persist else None
+        finished = False
+        try:
+            quiz_id = None
+            if writer:
+                quiz_id = await asyncio.to_thread(writer.open, {
+                    "title": title,
+                    "description": description,
+                    "category": request.category,
+                    "difficulty": request.difficulty,
+                    "time_limit": request.question_count * 120,
+                    "question_count": request.question_count,
+                    "xp_reward": xp_reward,
+                    "coin_reward": coin_reward,
+                    "generation_prompt": request.topic
+                })
+            
+            yield json.dumps({
+                "event": "quiz",
+                "quiz_id": quiz_id,
+                "title": title,
+                "description": description,
+                "xp_reward": xp_reward,
+                "coin_reward": coin_reward
+            }) + "\n"
+            
+            count = 0
+            async for generated in ai_service.stream_quiz_questions(
+                request.topic, request.difficulty, request.question_count, request.question_types
+            ):
+                question = QuizQuestion(**generated).model_dump()
+                yield json.dumps({"event": "question", "index": count, "question": question}) + "\n"
+                count += 1
+                
+                # Persist after the client already has the question
+                if writer and writer.add(question):
+                    await asyncio.to_thread(writer.flush)
+            
+            if writer:
+                await asyncio.to_thread(writer.finish)
+            finished = True
+            yield json.dumps({"event": "done", "quiz_id": quiz_id, "question_count": count}) + "\n"
+        except Exception as e:
+            ErrorHandler.log_error(e, "Streaming quiz generation")
+            yield json.dumps({"event": "error", "detail": "Quiz generation failed"}) + "\n"
+        finally:
+            if writer and not finished:
+                # Client went away or generation failed; drop the private draft
+                await asyncio.to_thread(writer.discard)
+    
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
 @router.post("/evaluate-quiz")
 async def evaluate_quiz_answers(
     answers: List[Dict[str, Any]],
@@ -137,56 +195,8 @@ async def evaluate_quiz_answers(
     db: Session = Depends(get_db)
 ):
     """Evaluate quiz answers using AI"""
-    # Simulate AI evaluation (in real implementation, this would use HANU AI SDK)
-    
-    evaluation_results = []
-    total_score = 0
-    max_score = 0
-    
-    for answer in answers:
-        question_id = answer.get("question_id")
-        user_answer = answer.get("user_answer")
-        correct_answer = answer.get("correct_answer")
-        
-        # Simple evaluation (mock implementation)
-        is_correct = user_answer.lower().strip() == correct_answer.lower().strip()
-        points = answer.get("points", 10) if is_correct else 0
-        
-        evaluation_results.append({
-            "question_id": question_id,
-            "user_answer": user_answer,
-            "correct_answer": correct_answer,
-            "is_correct": is_correct,
-            "points_earned": points,
-            "feedback": f"Your answer is {'correct' if is_correct else 'incorrect'}." + 
-                        (" Good job!" if is_correct else f" The correct answer is: {correct_answer}")
-        })
-        
-        total_score += points
-        max_score += answer.get("points", 10)
-    
-    percentage = (total_score / max_score) * 100 if max_score > 0 else 0
-    
-    return {
-        "evaluation_results": evaluation_results,
-        "total_score": total_score,
-        "max_score": max_score,
-        "percentage": percentage,
-        "performance_feedback": get_performance_feedback(percentage)
-    }
-
-def get_performance_feedback(percentage: float) -> str:
-    """Get performance feedback based on percentage"""
-    if percentage >= 90:
-        return "Excellent work! You have mastered this topic."
-    elif percentage >= 80:
-        return "Great job! You have a strong understanding of this topic."
-    elif percentage >= 70:
-        return "Good effort! You understand most of the concepts."
-    elif percentage >= 60:
-        return "Not bad! Review the concepts you missed to improve."
-    else:
-        return "Keep practicing! Focus on understanding the fundamental concepts."
+    # Local grader first; only near misses go to the model for review
+    return await ai_service.evaluate_answers(answers)
 
 @router.post("/translate", response_model=TranslationResponse)
 async def translate_text(
@@ -6,19 +6,48 @@ Improved time complexity and performance
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional, Dict, Any
-from datetime import datetime, timedelta
-from collections import defaultdict
-import bisect
+from datetime import datetime, timedelta, timezone
+import asyncio
+import math
+import threading
+import time
+import numpy as np
+from app.core.config import settings
 from app.core.database import get_db
 from app.models import User
 from app.api.v1.endpoints.auth import get_current_user
 from app.core.cache import cache, cache_response, CACHE_KEYS
+from app.services.search_index import search_index
+from app.services.vector_index import vector_index, hybrid_search
+from app.services.facet_index import FacetIndex, bitmap_count, bitmap_from, bitmap_members
+from app.services.range_index import RangeIndex
+from app.services.research_counters import research_counters
 from pydantic import BaseModel
 import json
 import uuid
 
 router = APIRouter()
 
+# Research ids ranked (and cached) per filter combination
+RESEARCH_RANK_DEPTH = 100
+
+# Numeric research fields with a sorted range index (popularity = view_count + rating * 100,
+# trending = decayed recent views and downloads)
+RANGE_FIELDS = ["rating", "publication_date", "view_count", "download_count", "popularity", "trending"]
+
+# Trending: a download counts as this many views; topics come from this many top items;
+# trending scores are stored inflated by 2^(age / half-life) and rebased past this exponent
+TRENDING_DOWNLOAD_WEIGHT = 3
+TRENDING_SAMPLE = 200
+TRENDING_MAX_EXPONENT = 512
+EPOCH = datetime(1970, 1, 1)
+
+def to_timestamp(value: datetime) -> float:
+    """Seconds since the epoch, treating naive datetimes as UTC"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - EPOCH).total_seconds()
+
 # User Data Models
 class UserProfile(BaseModel):
     """User profile model"""
@@ -87,6 +116,12 @@ class ResearchItem(BaseModel):
     is_bookmarked: bool = False
     is_viewed: bool = False
 
+class ResearchItemsResponse(BaseModel):
+    """Research items page with facet counts"""
+    items: List[ResearchItem]
+    total_items: int
+    facets: Dict[str, Dict[str, int]]
+
 class UserResearchActivity(BaseModel):
     """User research activity model"""
     user_id: int
@@ -111,12 +146,15 @@ class OptimizedDataStore:
         }
         self.research_data = {
             "items": {},
-            "category_index": defaultdict(list),
-            "type_index": defaultdict(list),
-            "tag_index": defaultdict(list),
-            "rating_index": []
+            "doc_ids": [],  # dense doc number -> research_id
+            "doc_numbers": {},  # research_id -> dense doc number
+            "facets": FacetIndex(["category", "type", "tags"]),  # bitmap per facet value
+            "ranges": {field: RangeIndex() for field in RANGE_FIELDS}  # value-sorted doc numbers
         }
         self.user_research_activity = {}
+        self.trending_epoch = time.time()
+        # Serialises counter application (flush thread) with trending reads and rebases
+        self.counts_lock = threading.Lock()
     
     def initialize_sample_data(self):
         """Initialize optimized sample data"""
@@ -174,18 +212,148 @@ class OptimizedDataStore:
             }
             
             self.research_data["items"][research_id] = item
-            self.research_data["category_index"][category].append(research_id)
-            self.research_data["type_index"][item_type].append(research_id)
+            doc_number = len(self.research_data["doc_ids"])
+            self.research_data["doc_ids"].append(research_id)
+            self.research_data["doc_numbers"][research_id] = doc_number
+            self.research_data["facets"].add(doc_number, {
+                "category": [category],
+                "type": [item_type],
+                "tags": item_tags
+            })
             
-            for tag in item_tags:
-                self.research_data["tag_index"][tag].append(research_id)
+            # Add to the sorted range indexes (merged in batches)
+            self.index_ranges(doc_number, item)
             
-            # Add to rating index (sorted list for binary search)
-            bisect.insort(self.research_data["rating_index"], (item["rating"], research_id))
+            # Full-text index (restored from snapshot when already present)
+            if research_id not in search_index:
+                search_index.add_document(
+                    research_id,
+                    title=item["title"],
+                    abstract=item["abstract"],
+                    text=" ".join(item_tags),
+                    metadata={
+                        "title": item["title"],
+                        "content": item["abstract"],
+                        "url": item["url"],
+                        "type": "research",
+                        "source": item["source"],
+                        "date": item["publication_date"].date().isoformat()
+                    }
+                )
+        
+        for index in self.research_data["ranges"].values():
+            index.flush()
+    
+    def index_vectors(self) -> int:
+        """Queue research items missing from the vector index (run after vector_index.load)"""
+        added = 0
+        for research_id, item in self.research_data["items"].items():
+            if research_id not in vector_index:
+                vector_index.add_document(research_id, f"{item['title']}. {item['abstract']}")
+                added += 1
+        return added
+    
+    def index_ranges(self, doc_number: int, item: Dict[str, Any]):
+        """Queue an item's numeric fields for the range indexes"""
+        ranges = self.research_data["ranges"]
+        ranges["rating"].set(doc_number, item["rating"])
+        ranges["publication_date"].set(doc_number, to_timestamp(item["publication_date"]))
+        ranges["view_count"].set(doc_number, item["view_count"])
+        ranges["download_count"].set(doc_number, item["download_count"])
+        ranges["popularity"].set(doc_number, item["view_count"] + item["rating"] * 100)
+        ranges["trending"].set(doc_number, 0.0)
+    
+    def _trending_weight(self) -> float:
+        """Current weight of one event; older events shrink relative to it by half per half-life
+
+        Caller holds counts_lock, so a rebase never races another rebase or an
+        apply_counts still using the old weight.
+        """
+        exponent = (time.time() - self.trending_epoch) / settings.RESEARCH_TRENDING_HALF_LIFE
+        if exponent > TRENDING_MAX_EXPONENT:
+            # Rebase so stored scores stay within float range
+            shift = math.floor(exponent)
+            self.research_data["ranges"]["trending"].scale(2.0 ** -shift)
+            self.trending_epoch += shift * settings.RESEARCH_TRENDING_HALF_LIFE
+            exponent -= shift
+        return 2.0 ** exponent
+    
+    def apply_counts(self, deltas: Dict[str, List[int]], live: bool = True):
+        """Fold flushed view/download deltas into items and the range indexes"""
+        items = self.research_data["items"]
+        doc_numbers = self.research_data["doc_numbers"]
+        ranges = self.research_data["ranges"]
+        trending = ranges["trending"]
+        
+        with self.counts_lock:
+            weight = self._trending_weight()
+            for research_id, (views, downloads) in deltas.items():
+                item = items.get(research_id)
+                if item is None:
+                    continue
+                doc_number = doc_numbers[research_id]
+                item["view_count"] += views
+                item["download_count"] += downloads
+                ranges["view_count"].set(doc_number, item["view_count"])
+                ranges["download_count"].set(doc_number, item["download_count"])
+                ranges["popularity"].set(doc_number, item["view_count"] + item["rating"] * 100)
+                if live:
+                    activity = views + downloads * TRENDING_DOWNLOAD_WEIGHT
+                    trending.set(doc_number, (trending.value(doc_number) or 0.0) + activity * weight)
+            
+            # One merge per index for the whole batch
+            for index in ranges.values():
+                index.flush()
+    
+    def trending(self, limit: int) -> Dict[str, Any]:
+        """Most active research items and topics by decayed recent views and downloads"""
+        doc_ids = self.research_data["doc_ids"]
+        facets = self.research_data["facets"]
+        trending = self.research_data["ranges"]["trending"]
+        with self.counts_lock:
+            weight = self._trending_weight()
+            ranked = [
+                (doc_number, trending.value(doc_number) or 0.0)
+                for doc_number in trending.top(facets.all(), len(doc_ids), max(limit, TRENDING_SAMPLE))
+            ]
+        
+        top_items = []
+        topic_activity = {}
+        for doc_number, score in ranked:
+            activity = score / weight
+            if activity <= 0:
+                break
+            item = self.research_data["items"][doc_ids[doc_number]]
+            topic_activity[item["category"]] = topic_activity.get(item["category"], 0.0) + activity
+            if len(top_items) < limit:
+                top_items.append({
+                    "research_id": item["research_id"],
+                    "title": item["title"],
+                    "category": item["category"],
+                    "view_count": item["view_count"],
+                    "download_count": item["download_count"],
+                    "activity": round(activity, 2)
+                })
+        
+        total_activity = sum(topic_activity.values()) or 1.0
+        category_bitmaps = facets.bitmaps["category"]
+        topics = sorted(topic_activity.items(), key=lambda topic: (-topic[1], topic[0]))[:limit]
+        return {
+            "trending_topics": [
+                {
+                    "topic": topic,
+                    "growth": round(activity * 100 / total_activity),  # share of recent activity (%)
+                    "articles": bitmap_count(category_bitmaps[topic])
+                }
+                for topic, activity in topics
+            ],
+            "trending_research": top_items
+        }
 
 # Global optimized data store
 data_store = OptimizedDataStore()
 data_store.initialize_sample_data()
+research_counters.add_sink(data_store.apply_counts)
 
 @router.get("/user-data/profile", response_model=UserProfile)
 @cache_response(ttl=180)  # 3 minute cache
@@ -290,14 +458,32 @@ async def get_leaderboard(
             detail=f"Failed to retrieve leaderboard: {str(e)}"
         )
 
-@router.get("/research", response_model=List[ResearchItem])
-@cache_response(ttl=300)  # 5 minute cache
+def research_page(ranking: Dict[str, Any], offset: int, limit: int) -> ResearchItemsResponse:
+    """Build the response for one page of a ranked id list"""
+    items = data_store.research_data["items"]
+    return ResearchItemsResponse(
+        items=[ResearchItem(**items[research_id]) for research_id in ranking["ranked_ids"][offset:offset + limit]],
+        total_items=ranking["total"],
+        facets=ranking["facets"]
+    )
+
+@router.get("/research", response_model=ResearchItemsResponse)
 async def get_research_items(
     category: Optional[str] = Query(None),
     type: Optional[str] = Query(None),
     tags: Optional[str] = Query(None),
     search_query: Optional[str] = Query(None),
+    search_mode: str = Query("hybrid", regex="^(keyword|semantic|hybrid)$"),
     min_rating: Optional[float] = Query(None),
+    max_rating: Optional[float] = Query(None),
+    published_after: Optional[datetime] = Query(None),
+    published_before: Optional[datetime] = Query(None),
+    min_views: Optional[int] = Query(None),
+    max_views: Optional[int] = Query(None),
+    min_downloads: Optional[int] = Query(None),
+    max_downloads: Optional[int] = Query(None),
+    sort_by: Optional[str] = Query(None, regex="^(popularity|trending|rating|publication_date|view_count|download_count)$"),
+    sort_order: str = Query("desc", regex="^(asc|desc)$"),
     limit: int = Query(20, le=100),
     offset: int = Query(0, ge=0),
     current_user: User = Depends(get_current_user),
@@ -308,66 +494,85 @@ async def get_research_items(
     try:
         # Build cache key for this specific filter combination
         cache_key = CACHE_KEYS['RESEARCH_ITEMS'].format(
-            filters=f"{category}:{type}:{tags}:{search_query}:{min_rating}"
+            filters=(
+                f"{category}:{type}:{tags}:{search_query}:{search_mode}:"
+                f"{min_rating}-{max_rating}:{published_after}-{published_before}:"
+                f"{min_views}-{max_views}:{min_downloads}-{max_downloads}:{sort_by}:{sort_order}"
+            )
         )
         
-        # Check cache first
-        cached_results = cache.get(cache_key)
-        if cached_results:
-            return cached_results[offset:offset + limit]
+        # Cached rankings hold ids only; serve from them when deep enough for this page
+        depth = offset + limit
+        cached_ranking = cache.get(cache_key)
+        if cached_ranking and (
+            depth <= len(cached_ranking["ranked_ids"]) or len(cached_ranking["ranked_ids"]) == cached_ranking["total"]
+        ):
+            return research_page(cached_ranking, offset, limit)
         
-        # Start with all items
-        result_ids = set(data_store.research_data["items"].keys())
+        facets = data_store.research_data["facets"]
+        doc_ids = data_store.research_data["doc_ids"]
+        doc_numbers = data_store.research_data["doc_numbers"]
         
-        # Apply filters using indexes for O(1) lookups
+        # Facet filters are bitwise ANDs of per-value bitmaps
+        filters = {}
         if category:
-            category_ids = set(data_store.research_data["category_index"].get(category, []))
-            result_ids &= category_ids
-        
+            filters["category"] = [category]
         if type:
-            type_ids = set(data_store.research_data["type_index"].get(type, []))
-            result_ids &= type_ids
-        
+            filters["type"] = [type]
         if tags:
-            tags_list = tags.split(',')
-            for tag in tags_list:
-                tag_ids = set(data_store.research_data["tag_index"].get(tag, []))
-                result_ids &= tag_ids
-        
-        if min_rating is not None:
-            # Use binary search on sorted rating index
-            rating_index = data_store.research_data["rating_index"]
-            # Find first item with rating >= min_rating
-            min_pos = bisect.bisect_left(rating_index, (min_rating, ""))
-            high_rated_ids = {item_id for _, item_id in rating_index[min_pos:]}
-            result_ids &= high_rated_ids
-        
-        # Apply search query (this is O(n) but only on filtered results)
+            filters["tags"] = tags.split(',')
+        mask = facets.filter(filters)
+        
+        # Range filters: each bound pair is one contiguous slice of a value-sorted index
+        ranges = data_store.research_data["ranges"]
+        range_filters = [
+            ("rating", min_rating, max_rating, True, True),
+            ("publication_date",
+             to_timestamp(published_after) if published_after else None,
+             to_timestamp(published_before) if published_before else None,
+             False, False),
+            ("view_count", min_views, max_views, True, True),
+            ("download_count", min_downloads, max_downloads, True, True)
+        ]
+        for field, low, high, low_inclusive, high_inclusive in range_filters:
+            if low is None and high is None:
+                continue
+            in_range = ranges[field].between(low, high, low_inclusive, high_inclusive)
+            np.bitwise_and(mask, bitmap_from(in_range, facets.nbytes), out=mask)
+        
+        # Rank a few pages ahead so the next requests hit the cached ranking
+        rank_depth = max(depth, RESEARCH_RANK_DEPTH)
+        
         if search_query:
-            query_lower = search_query.lower()
-            filtered_ids = set()
-            for research_id in result_ids:
-                item = data_store.research_data["items"][research_id]
-                if (query_lower in item["title"].lower() or 
-                    query_lower in item["abstract"].lower()):
-                    filtered_ids.add(research_id)
-            result_ids = filtered_ids
-        
-        # Convert to list and sort by relevance (view count + rating)
-        result_items = []
-        for research_id in result_ids:
-            item = data_store.research_data["items"][research_id]
-            result_items.append(item)
-        
-        # Sort by combined score (view_count + rating * 100)
-        result_items.sort(key=lambda x: x["view_count"] + x["rating"] * 100, reverse=True)
-        
-        # Cache the full result set
-        research_items = [ResearchItem(**item) for item in result_items]
-        cache.set(cache_key, research_items)
-        
-        # Return paginated results
-        return research_items[offset:offset + limit]
+            # Search query (BM25, vector or fused ranking), restricted to the filtered ids
+            result_ids = {doc_ids[doc] for doc in bitmap_members(mask)}
+            hits = await asyncio.to_thread(
+                hybrid_search, search_query, max(1, len(result_ids)), result_ids.__contains__, search_mode
+            )
+            total = len(hits)
+            mask = bitmap_from((doc_numbers[research_id] for research_id, _ in hits), facets.nbytes)
+            if not sort_by:
+                # Hits come back best text match first
+                ranked_ids = [research_id for research_id, _ in hits[:rank_depth]]
+        else:
+            total = bitmap_count(mask)
+            sort_by = sort_by or "popularity"
+        
+        if sort_by:
+            # Top-k in field order from the sorted range index, no full sort
+            ranked = ranges[sort_by].top(mask, total, rank_depth, descending=sort_order == "desc")
+            ranked_ids = [doc_ids[doc] for doc in ranked]
+        
+        ranking = {
+            "ranked_ids": ranked_ids,
+            "total": total,
+            # Per-value counts within the result set, for the UI filters
+            "facets": facets.counts(mask)
+        }
+        cache.set(cache_key, ranking)
+        
+        # Response models only for the requested page
+        return research_page(ranking, offset, limit)
         
     except Exception as e:
         raise HTTPException(
@@ -376,13 +581,12 @@ async def get_research_items(
         )
 
 @router.get("/research/{research_id}", response_model=ResearchItem)
-@cache_response(ttl=600)  # 10 minute cache
 async def get_research_item(
     research_id: str,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get specific research item with caching"""
+    """Get specific research item and count the view"""
     
     try:
         if research_id not in data_store.research_data["items"]:
@@ -391,15 +595,15 @@ async def get_research_item(
                 detail="Research item not found"
             )
         
-        research_data = data_store.research_data["items"][research_id].copy()
+        # In-memory increment; the store and database see it on the next batched flush
+        research_counters.record_view(research_id)
         
-        # Increment view count
-        research_data["view_count"] += 1
+        research_data = data_store.research_data["items"][research_id].copy()
+        views, downloads = research_counters.unflushed(research_id)
+        research_data["view_count"] += views
+        research_data["download_count"] += downloads
         research_data["is_viewed"] = True
         
-        # Clear related caches
-        cache.delete(CACHE_KEYS['RESEARCH_ITEMS'].format(filters="*"))
-        
         return ResearchItem(**research_data)
         
     except HTTPException:
@@ -410,6 +614,39 @@ async def get_research_item(
             detail=f"Failed to retrieve research item: {str(e)}"
         )
 
+@router.post("/research/{research_id}/download")
+async def download_research_item(
+    research_id: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Count a research download and return its URL"""
+    
+    try:
+        item = data_store.research_data["items"].get(research_id)
+        if item is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Research item not found"
+            )
+        
+        research_counters.record_download(research_id)
+        _, downloads = research_counters.unflushed(research_id)
+        
+        return {
+            "research_id": research_id,
+            "url": item["url"],
+            "download_count": item["download_count"] + downloads
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to record research download: {str(e)}"
+        )
+
 @router.get("/user-data/research-activity", response_model=UserResearchActivity)
 @cache_response(ttl=120)  # 2 minute cache
 async def get_user_research_activity(
@@ -8,10 +8,15 @@ from typing import List, Optional
 from datetime import datetime, timedelta
 from app.core.database import get_db
 from app.models import (
-    User, Achievement, UserAchievement, Level, PowerUp, UserPowerUp,
+    User, UserInventory, Achievement, UserAchievement, Level, PowerUp, UserPowerUp,
     DailyChallenge, UserDailyChallenge, Streak, StreakReward, StreakFreeze, StreakType, StreakStatus
 )
 from app.api.v1.endpoints.auth import get_current_user
+from app.services.achievement_engine import achievement_engine
+from app.services.power_up_quota import power_up_quota
+from app.services.daily_challenges import daily_challenge_service
+from app.services.shop_catalog import shop_catalog
+from app.core.cache import cache, CACHE_KEYS, CACHE_TAGS
 from pydantic import BaseModel
 from sqlalchemy import and_, or_
 
@@ -180,7 +185,13 @@ async def add_xp(
             if "gems" in rewards:
                 current_user.gems += rewards["gems"]
     
+    # Evaluate only the achievement rules listening on these events
+    achievement_engine.process_events(
+        db, current_user, achievement_engine.events_for_activity(activity_type)
+    )
+    
     db.commit()
+    daily_challenge_service.record_activity(current_user.id, activity_type)
     
     # Calculate progress to next level
     next_level = db.query(Level).filter(Level.level == new_level + 1).first()
@@ -208,37 +219,43 @@ async def get_achievements(
     db: Session = Depends(get_db)
 ):
     """Get user achievements"""
-    query = db.query(Achievement)
+    cache_key = CACHE_KEYS['ACHIEVEMENT_LIST'].format(user_id=current_user.id, category=category)
+    cached_result = cache.get(cache_key)
+    if cached_result is not None:
+        return cached_result
+    
+    # Single outer join: every achievement paired with this user's unlock row, if any
+    query = db.query(Achievement, UserAchievement).outerjoin(
+        UserAchievement,
+        and_(
+            UserAchievement.achievement_id == Achievement.id,
+            UserAchievement.user_id == current_user.id
+        )
+    )
     if category:
         query = query.filter(Achievement.category == category)
     
-    achievements = query.all()
-    
-    # Get user's unlocked achievements
-    user_achievements = db.query(UserAchievement).filter(
-        UserAchievement.user_id == current_user.id
-    ).all()
-    
-    unlocked_achievement_ids = {ua.achievement_id for ua in user_achievements}
-    
-    result = []
-    for achievement in achievements:
-        user_achievement = next(
-            (ua for ua in user_achievements if ua.achievement_id == achievement.id),
-            None
-        )
-        
-        result.append(AchievementResponse(
+    result = [
+        AchievementResponse(
             id=achievement.id,
             name=achievement.name,
             description=achievement.description,
             icon=achievement.icon,
             category=achievement.category,
             rarity=achievement.rarity,
-            unlocked=achievement.id in unlocked_achievement_ids,
+            unlocked=user_achievement is not None,
             unlocked_at=user_achievement.unlocked_at if user_achievement else None,
             progress=user_achievement.progress if user_achievement else 0.0
-        ))
+        )
+        for achievement, user_achievement in query.all()
+    ]
+    
+    # Dropped by the achievement engine whenever this user unlocks something
+    cache.set(
+        cache_key,
+        result,
+        tags=[CACHE_TAGS['USER_ACHIEVEMENTS'].format(user_id=current_user.id)]
+    )
     
     return result
 
@@ -255,27 +272,14 @@ async def get_power_ups(
     
     power_ups = query.all()
     
-    # Get user's power-up usage
-    user_power_ups = db.query(UserPowerUp).filter(
-        UserPowerUp.user_id == current_user.id
-    ).all()
-    
-    user_power_up_dict = {upu.power_up_id: upu for upu in user_power_ups}
+    # Seed today's counters for any power-up the cache has not seen yet
+    power_up_quota.load_counters(db, current_user.id, [power_up.id for power_up in power_ups])
     
     result = []
     for power_up in power_ups:
-        user_power_up = user_power_up_dict.get(power_up.id)
-        
-        # Check if user can use this power-up
-        can_use = True
-        uses_today = 0
-        
-        if user_power_up:
-            # Check if it's a new day
-            if user_power_up.last_used.date() == datetime.now().date():
-                uses_today = user_power_up.uses_today
-                if uses_today >= power_up.max_uses_per_day:
-                    can_use = False
+        # Counters expire at midnight, so no per-row date comparison is needed
+        uses_today = power_up_quota.peek_uses(current_user.id, power_up.id)
+        can_use = uses_today < power_up.max_uses_per_day
         
         # Check if user has enough currency
         if (current_user.coins < power_up.cost_coins or 
@@ -321,38 +325,26 @@ async def use_power_up(
             detail="Insufficient currency"
         )
     
-    # Get or create user power-up record
-    user_power_up = db.query(UserPowerUp).filter(
-        UserPowerUp.user_id == current_user.id,
-        UserPowerUp.power_up_id == power_up_id
-    ).first()
-    
-    if not user_power_up:
-        user_power_up = UserPowerUp(
-            user_id=current_user.id,
-            power_up_id=power_up_id,
-            uses_today=0
+    # Conditional UPDATE on UserPowerUp; exhausted power-ups are rejected from the cache
+    uses_today = power_up_quota.try_consume(
+        db, current_user.id, power_up_id, power_up.max_uses_per_day
+    )
+    if uses_today is None:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Daily usage limit exceeded"
         )
-        db.add(user_power_up)
-    
-    # Check usage limits
-    if user_power_up.last_used.date() == datetime.now().date():
-        if user_power_up.uses_today >= power_up.max_uses_per_day:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Daily usage limit exceeded"
-            )
-        user_power_up.uses_today += 1
-    else:
-        user_power_up.uses_today = 1
     
-    # Deduct currency
+    # The use and the currency deduction commit together
     current_user.coins -= power_up.cost_coins
     current_user.gems -= power_up.cost_gems
-    
-    user_power_up.last_used = datetime.now()
-    
-    db.commit()
+    try:
+        db.commit()
+    except Exception:
+        db.rollback()
+        power_up_quota.release(current_user.id, power_up_id)
+        raise
     
     return {
         "message": f"Power-up '{power_up.name}' used successfully",
@@ -361,7 +353,7 @@ async def use_power_up(
             "value": power_up.effect_value,
             "duration": power_up.duration
         },
-        "remaining_uses": power_up.max_uses_per_day - user_power_up.uses_today,
+        "remaining_uses": power_up.max_uses_per_day - uses_today,
         "user_currency": {
             "coins": current_user.coins,
             "gems": current_user.gems
@@ -374,50 +366,17 @@ async def get_daily_challenges(
     db: Session = Depends(get_db)
 ):
     """Get daily challenges"""
-    today = datetime.now().date()
-    
-    # Get today's challenges
-    challenges = db.query(DailyChallenge).filter(
-        DailyChallenge.challenge_date == today,
-        DailyChallenge.is_active == True
-    ).all()
-    
-    # Get user's progress
-    user_challenges = db.query(UserDailyChallenge).filter(
-        UserDailyChallenge.user_id == current_user.id,
-        UserDailyChallenge.challenge_id.in_([c.id for c in challenges])
-    ).all()
-    
-    user_challenge_dict = {uc.challenge_id: uc for uc in user_challenges}
+    # Challenges are materialized once per day and shared by every user
+    challenges = daily_challenge_service.get_challenges(db)
+    user_progress = daily_challenge_service.get_user_progress(db, current_user.id, challenges)
     
     result = []
     for challenge in challenges:
-        user_challenge = user_challenge_dict.get(challenge.id)
-        
-        if not user_challenge:
-            # Create user challenge record
-            user_challenge = UserDailyChallenge(
-                user_id=current_user.id,
-                challenge_id=challenge.id,
-                progress=0.0,
-                is_completed=False
-            )
-            db.add(user_challenge)
-            db.commit()
-            db.refresh(user_challenge)
-        
+        progress = user_progress.get(challenge["id"], {})
         result.append(DailyChallengeResponse(
-            id=challenge.id,
-            title=challenge.title,
-            description=challenge.description,
-            challenge_type=challenge.challenge_type,
-            difficulty=challenge.difficulty,
-            target_value=challenge.target_value,
-            xp_reward=challenge.xp_reward,
-            coin_reward=challenge.coin_reward,
-            gem_reward=challenge.gem_reward,
-            progress=user_challenge.progress,
-            is_completed=user_challenge.is_completed
+            **challenge,
+            progress=progress.get("progress", 0.0),
+            is_completed=progress.get("is_completed", False)
         ))
     
     return result
@@ -451,6 +410,7 @@ async def update_daily_streak(
             streak_bonus = current_user.daily_streak * 10  # 10 XP per day streak
             current_user.xp += streak_bonus
             current_user.coins += current_user.daily_streak * 5  # 5 coins per day streak
+            achievement_engine.process_events(db, current_user, ["streak_updated", "xp_gained"])
     
     current_user.last_login = datetime.now()
     db.commit()
@@ -948,52 +908,7 @@ async def get_shop_categories(
     db: Session = Depends(get_db)
 ):
     """Get all shop categories"""
-    return {
-        "categories": [
-            {
-                "id": "avatars",
-                "name": "Avatars",
-                "description": "Custom profile pictures and representations",
-                "icon": "👤",
-                "item_count": 15
-            },
-            {
-                "id": "themes",
-                "name": "Themes",
-                "description": "UI themes and color schemes",
-                "icon": "🎨",
-                "item_count": 8
-            },
-            {
-                "id": "badges",
-                "name": "Badges",
-                "description": "Achievement badges and titles",
-                "icon": "🏆",
-                "item_count": 25
-            },
-            {
-                "id": "effects",
-                "name": "Effects",
-                "description": "Visual effects and animations",
-                "icon": "✨",
-                "item_count": 6
-            },
-            {
-                "id": "power_ups",
-                "name": "Power-ups",
-                "description": "Gameplay enhancements and boosts",
-                "icon": "⚡",
-                "item_count": 12
-            },
-            {
-                "id": "bundles",
-                "name": "Bundles",
-                "description": "Special value packs and collections",
-                "icon": "📦",
-                "item_count": 4
-            }
-        ]
-    }
+    return {"categories": shop_catalog.get_categories(db)}
 
 @router.get("/economy/shop/featured")
 async def get_featured_items(
@@ -1001,81 +916,7 @@ async def get_featured_items(
     db: Session = Depends(get_db)
 ):
     """Get featured shop items"""
-    # Mock featured items data
-    featured_items = [
-        {
-            "id": "bundle_starter_pack",
-            "name": "Starter Pack",
-            "description": "Perfect for new users! Includes coins, gems, and a special avatar",
-            "type": "bundle",
-            "cost": {"coins": 0, "gems": 10},
-            "original_cost": {"coins": 0, "gems": 15},
-            "discount": 0.33,
-            "rarity": "special",
-            "category": "bundles",
-            "items_included": ["avatar_rookie", "coins_1000", "gems_5"],
-            "is_limited": True,
-            "ends_at": datetime.now() + timedelta(days=7)
-        },
-        {
-            "id": "avatar_dragon_lord",
-            "name": "Dragon Lord",
-            "description": "Majestic dragon-themed avatar with animated effects",
-            "type": "avatar",
-            "cost": {"coins": 2000, "gems": 20},
-            "rarity": "legendary",
-            "category": "avatars",
-            "is_new": True,
-            "popularity": 95
-        },
-        {
-            "id": "theme_neon_dreams",
-            "name": "Neon Dreams",
-            "description": "Cyberpunk-inspired theme with animated neon lights",
-            "type": "theme",
-            "cost": {"coins": 800, "gems": 5},
-            "original_cost": {"coins": 1000, "gems": 8},
-            "discount": 0.20,
-            "rarity": "epic",
-            "category": "themes",
-            "is_featured": True
-        }
-    ]
-    
-    # Daily special (rotates every 24 hours)
-    day_of_year = datetime.now().timetuple().tm_yday
-    daily_specials = [
-        {
-            "id": "power_up_double_xp",
-            "name": "Double XP Boost",
-            "description": "2x XP for all activities for 24 hours",
-            "type": "power_up",
-            "cost": {"coins": 500, "gems": 3},
-            "original_cost": {"coins": 750, "gems": 5},
-            "discount": 0.33,
-            "rarity": "rare",
-            "category": "power_ups",
-            "duration": 86400  # 24 hours in seconds
-        },
-        {
-            "id": "avatar_seasonal_special",
-            "name": "Seasonal Special Avatar",
-            "description": "Limited edition seasonal avatar",
-            "type": "avatar",
-            "cost": {"coins": 1200, "gems": 8},
-            "rarity": "epic",
-            "category": "avatars",
-            "is_seasonal": True
-        }
-    ]
-    
-    daily_special = daily_specials[day_of_year % len(daily_specials)]
-    
-    return {
-        "featured_items": featured_items,
-        "daily_special": daily_special,
-        "refresh_time": (datetime.now() + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
-    }
+    return shop_catalog.get_featured(db)
 
 @router.post("/economy/purchase/{item_id}")
 async def purchase_item(
@@ -1084,43 +925,19 @@ async def purchase_item(
     db: Session = Depends(get_db)
 ):
     """Purchase an item from the shop"""
-    # Mock shop items database
-    shop_items = {
-        "avatar_cyber_ninja": {
-            "name": "Cyber Ninja",
-            "type": "avatar",
-            "cost": {"coins": 500, "gems": 0},
-            "rarity": "rare"
-        },
-        "theme_neon_cyberpunk": {
-            "name": "Neon Cyberpunk",
-            "type": "theme",
-            "cost": {"coins": 300, "gems": 0},
-            "rarity": "common"
-        },
-        "power_up_double_xp": {
-            "name": "Double XP Boost",
-            "type": "power_up",
-            "cost": {"coins": 500, "gems": 3},
-            "rarity": "rare",
-            "duration": 86400
-        },
-        "bundle_starter_pack": {
-            "name": "Starter Pack",
-            "type": "bundle",
-            "cost": {"coins": 0, "gems": 10},
-            "rarity": "special",
-            "contents": ["coins_1000", "gems_5", "avatar_rookie"]
-        }
-    }
-    
-    item = shop_items.get(item_id)
+    item = shop_catalog.get(db, item_id)
     if not item:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Item not found"
         )
     
+    if item.get("ends_at") and item["ends_at"] <= datetime.now():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="This offer has ended"
+        )
+    
     # Check if user can afford it
     if current_user.coins < item["cost"]["coins"] or current_user.gems < item["cost"]["gems"]:
         raise HTTPException(
@@ -1132,8 +949,20 @@ async def purchase_item(
     current_user.coins -= item["cost"]["coins"]
     current_user.gems -= item["cost"]["gems"]
     
-    # Add item to user inventory (mock implementation)
-    # In a real implementation, this would add to an Inventory table
+    # Add item to user inventory
+    inventory_item = db.query(UserInventory).filter(
+        UserInventory.user_id == current_user.id,
+        UserInventory.item_id == item["catalog_id"]
+    ).first()
+    
+    if inventory_item:
+        inventory_item.quantity += 1
+    else:
+        db.add(UserInventory(
+            user_id=current_user.id,
+            item_id=item["catalog_id"],
+            quantity=1
+        ))
     
     db.commit()
     
@@ -1246,7 +1075,7 @@ async def add_xp(
     if activity_type == "search":
         current_user.total_searches += 1
     elif activity_type == "quiz":
-        current_user.total_quizzes += 1
+        current_user.total_quizzes_taken += 1
     elif activity_type == "innovation":
         current_user.total_innovations += 1
     
@@ -1286,7 +1115,13 @@ async def add_xp(
                             streak.freeze_count += amount
                         level_up_rewards[reward_type] = level_up_rewards.get(reward_type, 0) + amount
     
+    # Evaluate only the achievement rules listening on these events
+    achievement_engine.process_events(
+        db, current_user, achievement_engine.events_for_activity(activity_type)
+    )
+    
     db.commit()
+    daily_challenge_service.record_activity(current_user.id, activity_type)
     
     # Calculate progress to next level
     next_level_data = db.query(Level).filter(Level.level == new_level + 1).first()
@@ -3,6 +3,7 @@ Quiz and learning endpoints for HANU-YOUTH platform
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import and_
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime
@@ -13,6 +14,13 @@ from app.models import (
 )
 from app.api.v1.endpoints.auth import get_current_user
 from app.api.v1.endpoints.gamification import add_xp
+from app.services.achievement_engine import achievement_engine
+from app.services.daily_challenges import daily_challenge_service
+from app.services.quiz_sessions import quiz_sessions
+from app.services.quiz_payloads import quiz_payloads
+from app.services.learning_progress import learning_progress
+from app.services.question_analytics import question_analytics
+from app.core.error_handling import APIError, ErrorHandler
 from pydantic import BaseModel
 import json
 
@@ -56,6 +64,10 @@ class AnswerSubmission(BaseModel):
     answer: str
     time_spent: int
 
+class BatchAnswerSubmission(BaseModel):
+    """Batch answer submission model"""
+    answers: List[AnswerSubmission]
+
 class QuizResultResponse(BaseModel):
     """Quiz result response model"""
     attempt_id: int
@@ -83,6 +95,12 @@ class LearningPathResponse(BaseModel):
     is_started: bool
     is_completed: bool
 
+class ModuleProgressUpdate(BaseModel):
+    """Module progress update model"""
+    progress_percentage: float
+    score: Optional[float] = None
+    time_spent_minutes: int = 0
+
 @router.get("/quizzes", response_model=List[QuizResponse])
 async def get_quizzes(
     category: Optional[str] = None,
@@ -155,49 +173,32 @@ async def start_quiz(
             detail="Quiz not found"
         )
     
+    # Questions, answer key and max score are compiled once per quiz version
+    payload = quiz_payloads.get(db, quiz)
+    
     # Create quiz attempt
     attempt = QuizAttempt(
         user_id=current_user.id,
         quiz_id=quiz.id,
-        max_score=sum(q.points for q in quiz.questions)
+        max_score=payload["max_score"]
     )
     
     db.add(attempt)
-    db.commit()
-    db.refresh(attempt)
+    db.flush()
     
-    # Get questions
-    questions = db.query(Question).filter(Question.quiz_id == quiz.id).all()
+    # Answers are graded against the cached session until the attempt completes
+    session = quiz_sessions.create(attempt, payload["answer_key"], payload["quiz"])
+    db.commit()
     
     return QuizStartResponse(
-        attempt_id=attempt.id,
-        quiz=QuizResponse(
-            id=quiz.id,
-            title=quiz.title,
-            description=quiz.description,
-            category=quiz.category,
-            difficulty=quiz.difficulty,
-            time_limit=quiz.time_limit,
-            question_count=quiz.question_count,
-            xp_reward=quiz.xp_reward,
-            coin_reward=quiz.coin_reward
-        ),
+        attempt_id=session["attempt_id"],
+        quiz=QuizResponse(**payload["quiz"]),
         questions=[
-            QuestionResponse(
-                id=q.id,
-                question_text=q.question_text,
-                question_type=q.question_type,
-                difficulty=q.difficulty,
-                points=q.points,
-                options=q.options if q.question_type == "multiple_choice" else None,
-                explanation=q.explanation,
-                image_url=q.image_url,
-                audio_url=q.audio_url
-            )
-            for q in questions
+            QuestionResponse(**question)
+            for question in quiz_payloads.shuffle_for_attempt(payload, session["attempt_id"])
         ],
-        time_limit=quiz.time_limit,
-        max_score=attempt.max_score
+        time_limit=payload["time_limit"],
+        max_score=payload["max_score"]
     )
 
 @router.post("/quiz/{attempt_id}/submit-answer")
@@ -208,89 +209,50 @@ async def submit_answer(
     db: Session = Depends(get_db)
 ):
     """Submit an answer for a quiz"""
-    # Get attempt
-    attempt = db.query(QuizAttempt).filter(
-        QuizAttempt.id == attempt_id,
-        QuizAttempt.user_id == current_user.id
-    ).first()
-    
-    if not attempt:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Quiz attempt not found"
+    try:
+        session = quiz_sessions.get(db, attempt_id, current_user.id)
+        result = quiz_sessions.submit(
+            db, session, answer_data.question_id, answer_data.answer, answer_data.time_spent
         )
+    except APIError as e:
+        raise ErrorHandler.create_http_exception(e)
     
-    if attempt.is_completed:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Quiz attempt already completed"
-        )
-    
-    # Get question
-    question = db.query(Question).filter(Question.id == answer_data.question_id).first()
-    if not question:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Question not found"
-        )
-    
-    # Check if question belongs to quiz
-    if question.quiz_id != attempt.quiz_id:
+    return {
+        "message": "Answer submitted successfully",
+        **result
+    }
+
+@router.post("/quiz/{attempt_id}/submit-answers")
+async def submit_answers(
+    attempt_id: int,
+    batch: BatchAnswerSubmission,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Submit all answers for a quiz in one request"""
+    if not batch.answers:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Question does not belong to this quiz"
+            detail="No answers submitted"
         )
     
-    # Check if already answered
-    existing_answer = db.query(UserAnswer).filter(
-        UserAnswer.attempt_id == attempt_id,
-        UserAnswer.question_id == answer_data.question_id
-    ).first()
-    
-    if existing_answer:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Question already answered"
+    try:
+        session = quiz_sessions.get(db, attempt_id, current_user.id)
+        results = quiz_sessions.submit_many(
+            db, session, [answer.model_dump() for answer in batch.answers]
         )
+    except APIError as e:
+        raise ErrorHandler.create_http_exception(e)
     
-    # Determine if answer is correct
-    is_correct = False
-    if question.question_type == "multiple_choice":
-        is_correct = answer_data.answer.lower() == question.correct_answer.lower()
-    elif question.question_type == "true_false":
-        is_correct = answer_data.answer.lower() in ["true", "false"] and answer_data.answer.lower() == question.correct_answer.lower()
-    else:
-        # For short answer and code questions, simple string matching
-        is_correct = answer_data.answer.lower().strip() == question.correct_answer.lower().strip()
-    
-    points_earned = question.points if is_correct else 0
-    
-    # Create user answer
-    user_answer = UserAnswer(
-        attempt_id=attempt_id,
-        question_id=answer_data.question_id,
-        user_answer=answer_data.answer,
-        is_correct=is_correct,
-        points_earned=points_earned,
-        time_spent=answer_data.time_spent
-    )
-    
-    db.add(user_answer)
-    
-    # Update attempt score
-    attempt.score += points_earned
-    attempt.time_taken += answer_data.time_spent
-    
-    db.commit()
+    # Answers and the new score land in one transaction (retried by the checkpoint task on failure)
+    quiz_sessions.checkpoint_session(db, session)
     
     return {
-        "message": "Answer submitted successfully",
-        "is_correct": is_correct,
-        "points_earned": points_earned,
-        "correct_answer": question.correct_answer if not is_correct else None,
-        "explanation": question.explanation,
-        "current_score": attempt.score,
-        "max_score": attempt.max_score
+        "message": "Answers submitted successfully",
+        "results": results,
+        "correct_answers": sum(1 for result in results if result["is_correct"]),
+        "current_score": session["score"],
+        "max_score": session["max_score"]
     }
 
 @router.post("/quiz/{attempt_id}/complete", response_model=QuizResultResponse)
@@ -300,41 +262,30 @@ async def complete_quiz(
     db: Session = Depends(get_db)
 ):
     """Complete a quiz attempt"""
-    # Get attempt
-    attempt = db.query(QuizAttempt).filter(
-        QuizAttempt.id == attempt_id,
-        QuizAttempt.user_id == current_user.id
-    ).first()
-    
-    if not attempt:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Quiz attempt not found"
-        )
-    
-    if attempt.is_completed:
+    try:
+        session = quiz_sessions.get(db, attempt_id, current_user.id)
+    except APIError as e:
+        raise ErrorHandler.create_http_exception(e)
+    
+    # Remaining answers plus a single update that marks the attempt completed
+    attempt = quiz_sessions.complete(db, session)
+    if attempt is None:
+        db.rollback()
+        quiz_sessions.close(attempt_id)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Quiz attempt already completed"
         )
     
-    # Mark as completed
-    attempt.is_completed = True
-    attempt.completed_at = datetime.now()
-    attempt.percentage = (attempt.score / attempt.max_score) * 100 if attempt.max_score > 0 else 0
-    
-    # Get quiz for rewards
-    quiz = db.query(Quiz).filter(Quiz.id == attempt.quiz_id).first()
-    
     # Calculate rewards based on performance
-    xp_earned = quiz.xp_reward
-    coins_earned = quiz.coin_reward
+    xp_earned = session["xp_reward"]
+    coins_earned = session["coin_reward"]
     
     # Bonus for high scores
-    if attempt.percentage >= 90:
+    if attempt["percentage"] >= 90:
         xp_earned = int(xp_earned * 1.5)  # 50% bonus
         coins_earned = int(coins_earned * 1.5)
-    elif attempt.percentage >= 75:
+    elif attempt["percentage"] >= 75:
         xp_earned = int(xp_earned * 1.25)  # 25% bonus
         coins_earned = int(coins_earned * 1.25)
     
@@ -342,27 +293,34 @@ async def complete_quiz(
     current_user.xp += xp_earned
     current_user.coins += coins_earned
     current_user.total_quizzes_taken += 1
+    achievement_engine.process_events(db, current_user, ["quiz_completed", "xp_gained"])
     
     db.commit()
+    quiz_sessions.close(attempt_id)
+    daily_challenge_service.record_activity(current_user.id, "quiz")
     
     return QuizResultResponse(
-        attempt_id=attempt.id,
-        score=attempt.score,
-        max_score=attempt.max_score,
-        percentage=attempt.percentage,
-        time_taken=attempt.time_taken,
-        is_completed=attempt.is_completed,
-        correct_answers=db.query(UserAnswer).filter(
-            UserAnswer.attempt_id == attempt_id,
-            UserAnswer.is_correct == True
-        ).count(),
-        total_questions=db.query(UserAnswer).filter(
-            UserAnswer.attempt_id == attempt_id
-        ).count(),
+        attempt_id=attempt_id,
+        score=attempt["score"],
+        max_score=session["max_score"],
+        percentage=attempt["percentage"],
+        time_taken=attempt["time_taken"],
+        is_completed=True,
+        correct_answers=attempt["correct_count"],
+        total_questions=attempt["answered_count"],
         xp_earned=xp_earned,
         coins_earned=coins_earned
     )
 
+@router.get("/question/{question_id}/stats")
+async def get_question_stats(
+    question_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get answer statistics for a question"""
+    return question_analytics.get_stats(db, question_id)
+
 @router.get("/learning-paths", response_model=List[LearningPathResponse])
 async def get_learning_paths(
     category: Optional[str] = None,
@@ -371,37 +329,22 @@ async def get_learning_paths(
     db: Session = Depends(get_db)
 ):
     """Get available learning paths"""
-    query = db.query(LearningPath)
+    # Progress comes from the same query; paths without a row are simply not started
+    query = db.query(LearningPath, UserPathProgress).outerjoin(
+        UserPathProgress,
+        and_(
+            UserPathProgress.path_id == LearningPath.id,
+            UserPathProgress.user_id == current_user.id
+        )
+    )
     
     if category:
         query = query.filter(LearningPath.category == category)
     if difficulty:
         query = query.filter(LearningPath.difficulty == difficulty)
     
-    paths = query.all()
-    
     result = []
-    for path in paths:
-        # Get user progress
-        user_progress = db.query(UserPathProgress).filter(
-            UserPathProgress.user_id == current_user.id,
-            UserPathProgress.path_id == path.id
-        ).first()
-        
-        if not user_progress:
-            user_progress = UserPathProgress(
-                user_id=current_user.id,
-                path_id=path.id,
-                progress_percentage=0.0,
-                modules_completed=0,
-                total_modules=len(path.modules),
-                is_started=False,
-                is_completed=False
-            )
-            db.add(user_progress)
-            db.commit()
-            db.refresh(user_progress)
-        
+    for path, user_progress in query.all():
         result.append(LearningPathResponse(
             id=path.id,
             title=path.title,
@@ -411,9 +354,9 @@ async def get_learning_paths(
             estimated_hours=path.estimated_hours,
             xp_reward=path.xp_reward,
             coin_reward=path.coin_reward,
-            progress_percentage=user_progress.progress_percentage,
-            is_started=user_progress.is_started,
-            is_completed=user_progress.is_completed
+            progress_percentage=user_progress.progress_percentage if user_progress else 0.0,
+            is_started=user_progress.is_started if user_progress else False,
+            is_completed=user_progress.is_completed if user_progress else False
         ))
     
     return result
@@ -432,28 +375,14 @@ async def start_learning_path(
             detail="Learning path not found"
         )
     
-    # Get or create user progress
-    user_progress = db.query(UserPathProgress).filter(
-        UserPathProgress.user_id == current_user.id,
-        UserPathProgress.path_id == path_id
-    ).first()
-    
-    if not user_progress:
-        user_progress = UserPathProgress(
-            user_id=current_user.id,
-            path_id=path_id,
-            progress_percentage=0.0,
-            modules_completed=0,
-            total_modules=len(path.modules),
-            is_started=True,
-            is_completed=False,
-            started_at=datetime.now()
-        )
-        db.add(user_progress)
-    else:
-        user_progress.is_started = True
-        if not user_progress.started_at:
-            user_progress.started_at = datetime.now()
+    # Get or create user progress (insert-or-ignore, so concurrent starts share one row)
+    now = datetime.now()
+    user_progress = learning_progress.ensure_path_progress(
+        db, current_user.id, path_id, learning_progress.total_modules(db, path_id), now
+    )
+    user_progress.is_started = True
+    if not user_progress.started_at:
+        user_progress.started_at = now
     
     db.commit()
     
@@ -473,18 +402,18 @@ async def get_learning_path_modules(
             detail="Learning path not found"
         )
     
-    modules = db.query(LearningModule).filter(
+    rows = db.query(LearningModule, UserModuleProgress).outerjoin(
+        UserModuleProgress,
+        and_(
+            UserModuleProgress.module_id == LearningModule.id,
+            UserModuleProgress.user_id == current_user.id
+        )
+    ).filter(
         LearningModule.path_id == path_id
     ).order_by(LearningModule.order_in_path).all()
     
-    # Get user progress for each module
     result = []
-    for module in modules:
-        user_progress = db.query(UserModuleProgress).filter(
-            UserModuleProgress.user_id == current_user.id,
-            UserModuleProgress.module_id == module.id
-        ).first()
-        
+    for module, user_progress in rows:
         result.append({
             "id": module.id,
             "title": module.title,
@@ -498,4 +427,40 @@ async def get_learning_path_modules(
             "best_score": user_progress.best_score if user_progress else 0.0
         })
     
-    return result
\ No newline at end of file
+    return result
+
+@router.post("/learning-module/{module_id}/progress")
+async def update_module_progress(
+    module_id: int,
+    update: ModuleProgressUpdate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Record progress on a learning module"""
+    try:
+        progress = learning_progress.record_module_progress(
+            db, current_user, module_id, update.progress_percentage,
+            update.score, update.time_spent_minutes
+        )
+    except APIError as e:
+        raise ErrorHandler.create_http_exception(e)
+    
+    xp_earned = 0
+    coins_earned = 0
+    if progress["path_completed"]:
+        path = db.query(LearningPath).filter(LearningPath.id == progress["path_id"]).first()
+        xp_earned = path.xp_reward
+        coins_earned = path.coin_reward
+        current_user.xp += xp_earned
+        current_user.coins += coins_earned
+        achievement_engine.process_events(db, current_user, ["xp_gained"])
+    
+    db.commit()
+    if progress["module_just_completed"]:
+        daily_challenge_service.record_activity(current_user.id, "learning")
+    
+    return {
+        **progress,
+        "xp_earned": xp_earned,
+        "coins_earned": coins_earned
+    }
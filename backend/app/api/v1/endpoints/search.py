@@ -2,18 +2,22 @@
 Search and knowledge hub endpoints for HANU-YOUTH platform
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional, Dict, Any
-from datetime import datetime
 from app.core.database import get_db
 from app.models import User
 from app.api.v1.endpoints.auth import get_current_user
 from app.api.v1.endpoints.gamification import add_xp
+from app.api.v1.endpoints.database_optimized import data_store
+from app.services.extractive_summarizer import extractive_summarizer
+from app.services.research_ingestion import research_ingestion
+from app.services.search_index import search_index
+from app.services.vector_index import hybrid_search
+from app.core.error_handling import APIError, ErrorHandler
 from pydantic import BaseModel
+import asyncio
 import json
-import os
-import uuid
 
 router = APIRouter()
 
@@ -26,7 +30,7 @@ class SearchResult(BaseModel):
     type: str
     source: str
     date: str
-    relevance_score: float
+    relevance_score: float  # 0-1 in every mode (see normalize_scores)
 
 class SearchResponse(BaseModel):
     """Search response model"""
@@ -52,6 +56,7 @@ async def search_knowledge(
     query: str,
     category: Optional[str] = None,
     limit: int = 10,
+    mode: str = Query("hybrid", regex="^(keyword|semantic|hybrid)$"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -59,56 +64,26 @@ async def search_knowledge(
     import time
     start_time = time.time()
     
-    # Simulate search (in real implementation, this would use HANU AI SDK)
-    # For now, we'll return mock results
-    mock_results = [
-        {
-            "id": "1",
-            "title": f"Research on {query}",
-            "content": f"This is a comprehensive research paper about {query}. The study explores various aspects and provides valuable insights.",
-            "url": "https://example.com/research1",
-            "type": "research",
-            "source": "Research Journal",
-            "date": "2024-01-15",
-            "relevance_score": 0.95
-        },
-        {
-            "id": "2",
-            "title": f"UN Report on {query}",
-            "content": f"United Nations comprehensive report addressing global challenges related to {query}. Contains policy recommendations.",
-            "url": "https://example.com/un-report",
-            "type": "un_report",
-            "source": "United Nations",
-            "date": "2024-01-10",
-            "relevance_score": 0.88
-        },
-        {
-            "id": "3",
-            "title": f"Innovation in {query}",
-            "content": f"Latest innovations and breakthrough technologies in the field of {query}. Practical applications and future prospects.",
-            "url": "https://example.com/innovation",
-            "type": "innovation",
-            "source": "Innovation Hub",
-            "date": "2024-01-12",
-            "relevance_score": 0.82
-        }
-    ]
-    
-    # Filter by category if specified
+    # BM25, vector or fused ranking over indexed research; the index locks can be held by an upload being indexed
+    predicate = None
     if category and category != "all":
-        mock_results = [r for r in mock_results if r["type"] == category]
+        predicate = lambda doc_id: (search_index.get_metadata(doc_id) or {}).get("type") == category
+    hits = await asyncio.to_thread(hybrid_search, query, limit, predicate, mode, True)
     
-    # Limit results
-    mock_results = mock_results[:limit]
+    results = []
+    for doc_id, score in hits:
+        metadata = search_index.get_metadata(doc_id)
+        if metadata:
+            results.append({"id": doc_id, **metadata, "relevance_score": round(score, 4)})
     
     # Award XP for searching
-    await add_xp(10, "search", current_user, db)
+    await add_xp(10, "search", f"Searched for {query}", current_user, db)
     
     search_time = time.time() - start_time
     
     return SearchResponse(
-        results=[SearchResult(**result) for result in mock_results],
-        total_results=len(mock_results),
+        results=[SearchResult(**result) for result in results],
+        total_results=len(results),
         query=query,
         category=category,
         search_time=search_time
@@ -122,18 +97,10 @@ async def summarize_research(
     db: Session = Depends(get_db)
 ):
     """Summarize research text"""
-    # Simulate AI summarization (in real implementation, this would use HANU AI SDK)
-    
-    # Extract key points (mock implementation)
-    sentences = text.split('. ')
-    key_points = [
-        sentences[0] if sentences else "No content available",
-        sentences[1] if len(sentences) > 1 else "Important finding",
-        sentences[2] if len(sentences) > 2 else "Key insight"
-    ]
-    
-    # Generate summary (mock implementation)
-    summary = f"This research explores important aspects of the topic. Key findings include significant developments in the field, with implications for future research and practical applications."
+    # Extractive TF-IDF summary; CPU-bound, so keep it off the event loop
+    result = await asyncio.to_thread(extractive_summarizer.summarize, text)
+    summary = result["summary"]
+    key_points = result["key_points"]
     
     return ResearchSummary(
         title=title or "Untitled Research",
@@ -155,38 +122,43 @@ async def upload_research(
     db: Session = Depends(get_db)
 ):
     """Upload research paper"""
-    if not file.filename.endswith('.pdf'):
+    if not file.filename or not file.filename.endswith('.pdf'):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Only PDF files are supported"
         )
     
-    # Create uploads directory if it doesn't exist
-    upload_dir = "uploads/research"
-    os.makedirs(upload_dir, exist_ok=True)
-    
-    # Generate unique filename
-    filename = f"{uuid.uuid4()}_{file.filename}"
-    file_path = os.path.join(upload_dir, filename)
-    
-    # Save file
-    with open(file_path, "wb") as buffer:
-        content = await file.read()
-        buffer.write(content)
+    # Stream to disk and queue text extraction; rejected early if the queue is full
+    try:
+        job = await research_ingestion.save_upload(file, current_user.id, title, description)
+    except APIError as e:
+        raise ErrorHandler.create_http_exception(e)
     
     # Award XP for uploading research
-    await add_xp(25, "innovation", current_user, db)
+    await add_xp(25, "innovation", "Uploaded a research paper", current_user, db)
     
     return {
         "message": "Research paper uploaded successfully",
-        "file_id": filename,
-        "title": title or file.filename,
+        "file_id": job["file_id"],
+        "title": job["title"],
         "description": description,
-        "upload_date": datetime.now().isoformat(),
-        "file_size": len(content),
+        "upload_date": job["upload_date"],
+        "file_size": job["file_size"],
+        "status": job["status"],
         "xp_earned": 25
     }
 
+@router.get("/research/upload/{file_id}/status")
+async def get_upload_status(
+    file_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Get text extraction status for an uploaded research paper"""
+    try:
+        return research_ingestion.get_status(file_id, current_user.id)
+    except APIError as e:
+        raise ErrorHandler.create_http_exception(e)
+
 @router.get("/research/categories")
 async def get_research_categories():
     """Get available research categories"""
@@ -204,20 +176,9 @@ async def get_research_categories():
     }
 
 @router.get("/research/trending")
-async def get_trending_research():
-    """Get trending research topics"""
-    return {
-        "trending_topics": [
-            {"topic": "Generative AI", "growth": 45, "articles": 342},
-            {"topic": "Climate Change", "growth": 38, "articles": 289},
-            {"topic": "Quantum Computing", "growth": 32, "articles": 156},
-            {"topic": "Sustainable Development", "growth": 28, "articles": 234},
-            {"topic": "Digital Transformation", "growth": 25, "articles": 198},
-            {"topic": "Renewable Energy", "growth": 22, "articles": 167},
-            {"topic": "Space Technology", "growth": 18, "articles": 143},
-            {"topic": "Biotechnology", "growth": 15, "articles": 189}
-        ]
-    }
+async def get_trending_research(limit: int = Query(8, ge=1, le=50)):
+    """Get trending research topics and items from recent view/download activity"""
+    return data_store.trending(limit)
 
 @router.get("/events/upcoming")
 async def get_upcoming_events(
@@ -12,6 +12,7 @@ from app.models import (
     TeamCompetition, Leaderboard, LeaderboardEntry
 )
 from app.api.v1.endpoints.auth import get_current_user
+from app.services.achievement_engine import achievement_engine
 from pydantic import BaseModel
 
 router = APIRouter()
@@ -118,6 +119,7 @@ async def create_team(
     )
     
     db.add(team_member)
+    achievement_engine.process_event(db, current_user, "team_created")
     db.commit()
     
     return TeamResponse(
@@ -308,6 +310,8 @@ async def join_team(
         message = "Joined team successfully"
     
     db.add(team_member)
+    if team_member.role == "member":
+        achievement_engine.process_event(db, current_user, "team_joined")
     db.commit()
     
     return {"message": message}
@@ -2,17 +2,20 @@
 Simple caching system for optimizing API performance
 """
 
-from typing import Any, Dict, Optional, Callable
+from typing import Any, Dict, Optional, Callable, Iterable, Set
 import time
 from functools import wraps
 import asyncio
+import threading
 
 class SimpleCache:
     """Simple in-memory cache with TTL support"""
     
     def __init__(self, default_ttl: int = 300):  # 5 minutes default
         self.cache: Dict[str, Dict[str, Any]] = {}
+        self.tags: Dict[str, Set[str]] = {}  # tag -> keys carrying it
         self.default_ttl = default_ttl
+        self.counter_lock = threading.Lock()
         self.cleanup_task: Optional[asyncio.Task] = None
     
     def get(self, key: str) -> Optional[Any]:
@@ -26,13 +29,39 @@ class SimpleCache:
                 del self.cache[key]
         return None
     
-    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
-        """Set value in cache with TTL"""
+    def set(self, key: str, value: Any, ttl: Optional[int] = None, tags: Optional[Iterable[str]] = None) -> None:
+        """Set value in cache with TTL and optional invalidation tags"""
         expires = time.time() + (ttl or self.default_ttl)
         self.cache[key] = {
             'value': value,
             'expires': expires
         }
+        for tag in tags or ():
+            self.tags.setdefault(tag, set()).add(key)
+    
+    def incr(self, key: str, amount: int = 1, ttl: Optional[int] = None, limit: Optional[int] = None) -> Optional[int]:
+        """Atomically increment a counter, returning None if it would pass limit"""
+        with self.counter_lock:
+            current = self.get(key) or 0
+            if limit is not None and current + amount > limit:
+                return None
+            
+            item = self.cache.get(key)
+            if item is not None and ttl is None:
+                # Keep the original expiry so windowed counters still reset on time
+                item['value'] = current + amount
+            else:
+                self.set(key, current + amount, ttl)
+            return current + amount
+    
+    def invalidate_tag(self, tag: str) -> int:
+        """Delete every item stored with a tag"""
+        keys = self.tags.pop(tag, set())
+        removed = 0
+        for key in keys:
+            if self.delete(key):
+                removed += 1
+        return removed
     
     def delete(self, key: str) -> bool:
         """Delete item from cache"""
@@ -44,6 +73,7 @@ class SimpleCache:
     def clear(self) -> None:
         """Clear all cache items"""
         self.cache.clear()
+        self.tags.clear()
     
     def cleanup_expired(self) -> None:
         """Clean up expired items"""
@@ -54,6 +84,12 @@ class SimpleCache:
         ]
         for key in expired_keys:
             del self.cache[key]
+        
+        # Drop tag entries pointing at keys that no longer exist
+        for tag in list(self.tags):
+            self.tags[tag] &= self.cache.keys()
+            if not self.tags[tag]:
+                del self.tags[tag]
     
     async def start_cleanup_task(self, interval: int = 60) -> None:
         """Start background cleanup task"""
@@ -98,5 +134,21 @@ CACHE_KEYS = {
     'RESEARCH_ITEMS': 'research_items:{filters}',
     'USER_STATS': 'user_stats:{user_id}',
     'CONVERSATIONS': 'conversations:{user_id}',
-    'RECENT_RESEARCH': 'recent_research:{user_id}'
+    'RECENT_RESEARCH': 'recent_research:{user_id}',
+    'USER_ACHIEVEMENTS': 'user_achievements:{user_id}',
+    'ACHIEVEMENT_LIST': 'achievement_list:{user_id}:{category}',
+    'POWER_UP_USES': 'power_up_uses:{user_id}:{power_up_id}:{day}',
+    'DAILY_CHALLENGES': 'daily_challenges:{day}',
+    'USER_DAILY_CHALLENGES': 'user_daily_challenges:{user_id}:{day}',
+    'SHOP_CATALOG': 'shop_catalog:{version}:{view}',
+    'QUIZ_SESSION': 'quiz_session:{attempt_id}',
+    'QUIZ_PAYLOAD': 'quiz_payload:{quiz_id}:{version}',
+    'LEARNING_STRUCTURE': 'learning_structure'
+}
+
+# Cache tags
+CACHE_TAGS = {
+    'USER_ACHIEVEMENTS': 'tag:user_achievements:{user_id}',
+    'SHOP_CATALOG': 'tag:shop_catalog',
+    'QUIZ_PAYLOAD': 'tag:quiz_payload:{quiz_id}'
 }
\ No newline at end of file
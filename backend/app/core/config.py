@@ -32,10 +32,49 @@ class Settings(BaseSettings):
     # AI Service Settings
     OPENAI_API_KEY: Optional[str] = None
     HUGGINGFACE_API_KEY: Optional[str] = None
+    AI_MODEL_VERSION: str = "hanu-ai-v1"
+    AI_API_BASE_URL: str = "https://api.hanu-ai.org/v1"
+    AI_API_KEY: Optional[str] = None
+    AI_HTTP_MAX_CONNECTIONS: int = 100
+    AI_HTTP_MAX_KEEPALIVE: int = 20
+    AI_HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    AI_HTTP_CONNECT_TIMEOUT: float = 5.0
+    AI_HTTP_TIMEOUT: float = 30.0
+    AI_HTTP2: bool = True
+    LOCAL_INFERENCE_ENABLED: bool = False
+    LOCAL_INFERENCE_WORKERS: int = 2
+    LOCAL_INFERENCE_THREADS: int = 2
+    LOCAL_INFERENCE_MAX_PENDING: int = 32
+    LOCAL_SUMMARIZATION_MODEL: str = "sshleifer/distilbart-cnn-6-6"
+    LOCAL_TRANSLATION_MODEL: str = "Helsinki-NLP/opus-mt-{source}-{target}"
+    AI_CACHE_PATH: str = "ai_cache.db"  # relative to DATA_DIR
+    AI_CACHE_MEMORY_ITEMS: int = 1024
+    
+    # Local data files (indexes, caches); relative data paths below resolve against it
+    DATA_DIR: str = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "data")
     
     # File Upload Settings
     MAX_FILE_SIZE: int = 10 * 1024 * 1024  # 10MB
     UPLOAD_DIR: str = "uploads"
+    INGEST_WORKERS: int = 2
+    INGEST_QUEUE_SIZE: int = 16
+    INGEST_PAGE_BATCH: int = 16
+    INGEST_WORKER_MEMORY_MB: int = 1024
+    INGEST_JOB_TTL: int = 3600  # Seconds a finished upload's status stays queryable
+    
+    # Search Index Settings
+    SEARCH_INDEX_PATH: str = "search_index.npz"  # relative to DATA_DIR
+    SEARCH_SNAPSHOT_INTERVAL: int = 300  # seconds
+    EMBEDDING_MODEL: str = "sentence-transformers/all-MiniLM-L6-v2"
+    VECTOR_DIM: int = 256  # LSA fallback dimensions when torch/transformers are missing
+    VECTOR_EMBED_BATCH: int = 64
+    VECTOR_INDEX_DIR: str = "vector_index"  # relative to DATA_DIR
+    VECTOR_NPROBE: int = 16
+    VECTOR_MIN_SIMILARITY: float = 0.2
+    VECTOR_REBUILD_RATIO: float = 0.1  # rebuild once this share of documents changed
+    VECTOR_REFRESH_INTERVAL: int = 30  # seconds
+    RESEARCH_COUNTER_FLUSH_INTERVAL: int = 10  # seconds
+    RESEARCH_TRENDING_HALF_LIFE: int = 6 * 3600  # seconds
     
     # Gamification Settings
     XP_PER_SEARCH: int = 10
@@ -49,6 +88,12 @@ class Settings(BaseSettings):
     SMTP_USER: Optional[str] = None
     SMTP_PASSWORD: Optional[str] = None
     
+    def data_path(self, path: str) -> str:
+        """Resolve a data file setting against DATA_DIR (absolute paths and :memory: pass through)"""
+        if path == ":memory:" or os.path.isabs(path):
+            return path
+        return os.path.join(self.DATA_DIR, path)
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
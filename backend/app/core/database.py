@@ -2,7 +2,10 @@
 Database configuration and session management
 """
 
-from sqlalchemy import create_engine
+from typing import Any, Dict, List
+from sqlalchemy import create_engine, insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 from app.core.config import settings
@@ -29,6 +32,27 @@ def get_db() -> Session:
     finally:
         db.close()
 
+def insert_or_ignore(db: Session, model, row: Dict[str, Any], index_elements: List[Any]) -> bool:
+    """Insert a row unless it would violate the unique constraint on index_elements
+
+    Returns whether the row was inserted, so concurrent writers can tell
+    which of them created it.
+    """
+    # Core inserts on the table (not the ORM entity) so rowcount is reported
+    dialect = db.bind.dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        statement = (postgresql if dialect == "postgresql" else sqlite).insert(model.__table__)
+        result = db.execute(statement.on_conflict_do_nothing(index_elements=index_elements), row)
+        return result.rowcount == 1
+
+    # Other databases: let the unique constraint reject a duplicate inside a savepoint
+    try:
+        with db.begin_nested():
+            db.execute(insert(model.__table__), row)
+        return True
+    except IntegrityError:
+        return False
+
 def create_tables():
     """Create all database tables"""
     Base.metadata.create_all(bind=engine)
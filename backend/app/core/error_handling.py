@@ -67,7 +67,30 @@ class CircuitBreaker:
     
     def call(self, func: Callable, *args, **kwargs) -> Any:
         """Execute function with circuit breaker protection"""
+        self._before_call()
         
+        try:
+            result = func(*args, **kwargs)
+            self._on_success()
+            return result
+        except self.expected_exception as e:
+            self._on_failure()
+            raise e
+    
+    async def call_async(self, func: Callable, *args, **kwargs) -> Any:
+        """Await a coroutine function with circuit breaker protection"""
+        self._before_call()
+        
+        try:
+            result = await func(*args, **kwargs)
+            self._on_success()
+            return result
+        except self.expected_exception as e:
+            self._on_failure()
+            raise e
+    
+    def _before_call(self):
+        """Reject calls while OPEN, moving to HALF_OPEN once the timeout passes"""
         if self.state == "OPEN":
             if self._should_attempt_reset():
                 self.state = "HALF_OPEN"
@@ -78,14 +101,6 @@ class CircuitBreaker:
                     "CIRCUIT_BREAKER_OPEN",
                     status_code=503
                 )
-        
-        try:
-            result = func(*args, **kwargs)
-            self._on_success()
-            return result
-        except self.expected_exception as e:
-            self._on_failure()
-            raise e
     
     def _should_attempt_reset(self) -> bool:
         """Check if circuit breaker should attempt reset"""
@@ -5,10 +5,11 @@ Database models for HANU-YOUTH platform
 from .user import User, UserAchievement, UserInventory
 from .gamification import (
     Achievement, Level, PowerUp, UserPowerUp, DailyChallenge, UserDailyChallenge,
-    Streak, StreakReward, StreakFreeze, StreakType, StreakStatus
+    Streak, StreakReward, StreakFreeze, StreakType, StreakStatus, InventoryItem
 )
-from .quiz import Quiz, Question, QuizAttempt, UserAnswer, LearningPath, LearningModule, UserPathProgress, UserModuleProgress
+from .quiz import Quiz, Question, QuizAttempt, UserAnswer, QuestionStats, LearningPath, LearningModule, UserPathProgress, UserModuleProgress
 from .teams import Team, TeamMember, Competition, CompetitionParticipant, TeamCompetition, TeamAchievement, Leaderboard, LeaderboardEntry
+from .research import ResearchStats
 
 # Export all models
 __all__ = [
@@ -17,13 +18,16 @@ __all__ = [
     
     # Gamification models
     "Achievement", "Level", "PowerUp", "UserPowerUp", "DailyChallenge", "UserDailyChallenge",
-    "Streak", "StreakReward", "StreakFreeze", "StreakType", "StreakStatus",
+    "Streak", "StreakReward", "StreakFreeze", "StreakType", "StreakStatus", "InventoryItem",
     
     # Quiz models
-    "Quiz", "Question", "QuizAttempt", "UserAnswer", "LearningPath", "LearningModule", 
+    "Quiz", "Question", "QuizAttempt", "UserAnswer", "QuestionStats", "LearningPath", "LearningModule", 
     "UserPathProgress", "UserModuleProgress",
     
     # Team models
     "Team", "TeamMember", "Competition", "CompetitionParticipant", "TeamCompetition", 
-    "TeamAchievement", "Leaderboard", "LeaderboardEntry"
+    "TeamAchievement", "Leaderboard", "LeaderboardEntry",
+    
+    # Research models
+    "ResearchStats"
 ]
\ No newline at end of file
@@ -2,7 +2,7 @@
 Gamification models for HANU-YOUTH platform
 """
 
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, Float, JSON, Enum
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, Float, JSON, Enum, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -200,6 +200,7 @@ class UserPowerUp(Base):
     """User power-up usage tracking"""
     
     __tablename__ = "user_power_ups"
+    __table_args__ = (UniqueConstraint("user_id", "power_up_id", name="uq_user_power_ups_user_power_up"),)
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -218,8 +219,10 @@ class DailyChallenge(Base):
     """Daily challenge model"""
     
     __tablename__ = "daily_challenges"
+    __table_args__ = (UniqueConstraint("challenge_date", "challenge_key", name="uq_daily_challenges_date_key"),)
     
     id = Column(Integer, primary_key=True, index=True)
+    challenge_key = Column(String, nullable=True)  # Template id, e.g. daily_20240101_quiz
     title = Column(String, nullable=False)
     description = Column(Text, nullable=False)
     challenge_type = Column(String, nullable=False)  # quiz, search, innovation
@@ -256,4 +259,41 @@ class UserDailyChallenge(Base):
     challenge = relationship("DailyChallenge")
     
     def __repr__(self):
-        return f"<UserDailyChallenge(user_id={self.user_id}, challenge_id={self.challenge_id}, progress={self.progress})>"
\ No newline at end of file
+        return f"<UserDailyChallenge(user_id={self.user_id}, challenge_id={self.challenge_id}, progress={self.progress})>"
+
+
+class InventoryItem(Base):
+    """Shop catalog item"""
+    
+    __tablename__ = "inventory_items"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    slug = Column(String, unique=True, index=True, nullable=False)  # Public item id, e.g. avatar_dragon_lord
+    name = Column(String, nullable=False)
+    description = Column(Text, nullable=True)
+    category = Column(String, nullable=False, index=True)  # avatars, themes, badges, effects, power_ups, bundles
+    item_type = Column(String, nullable=False)  # avatar, theme, badge, effect, power_up, bundle
+    rarity = Column(String, default="common", index=True)  # common, rare, epic, legendary, special
+    
+    # Pricing
+    cost_coins = Column(Integer, default=0)
+    cost_gems = Column(Integer, default=0)
+    original_cost_coins = Column(Integer, nullable=True)  # Set when discounted
+    original_cost_gems = Column(Integer, nullable=True)
+    
+    # Merchandising
+    is_featured = Column(Boolean, default=False)
+    is_daily_special = Column(Boolean, default=False)  # In the daily special rotation
+    is_limited = Column(Boolean, default=False)
+    available_until = Column(DateTime, nullable=True)
+    duration = Column(Integer, nullable=True)  # Effect duration in seconds
+    contents = Column(JSON, default=list)  # Bundle contents
+    attributes = Column(JSON, default=dict)  # Display flags (is_new, popularity, ...)
+    is_active = Column(Boolean, default=True)
+    
+    # Timestamps
+    created_at = Column(DateTime, default=func.now())
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    
+    def __repr__(self):
+        return f"<InventoryItem(slug={self.slug}, category={self.category}, rarity={self.rarity})>"
@@ -2,7 +2,7 @@
 Quiz and learning models for HANU-YOUTH platform
 """
 
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, Float, JSON
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, Float, JSON, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -96,6 +96,10 @@ class QuizAttempt(Base):
     time_taken = Column(Integer, default=0)  # Time taken in seconds
     is_completed = Column(Boolean, default=False)
     
+    # Running answer tallies (maintained as answers are submitted)
+    correct_count = Column(Integer, default=0)
+    answered_count = Column(Integer, default=0)
+    
     # Power-ups used
     power_ups_used = Column(JSON, default=[])
     
@@ -136,6 +140,28 @@ class UserAnswer(Base):
     def __repr__(self):
         return f"<UserAnswer(id={self.id}, is_correct={self.is_correct}, points_earned={self.points_earned})>"
 
+class QuestionStats(Base):
+    """Aggregated answer statistics per question"""
+    
+    __tablename__ = "question_stats"
+    
+    question_id = Column(Integer, ForeignKey("questions.id"), primary_key=True)
+    
+    # Running totals
+    attempts = Column(Integer, default=0)
+    correct = Column(Integer, default=0)
+    time_spent_total = Column(Integer, default=0)  # Seconds
+    time_histogram = Column(JSON, default=[])  # Counts per TIME_BUCKETS bucket
+    
+    # Timestamps
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    
+    # Relationships
+    question = relationship("Question")
+    
+    def __repr__(self):
+        return f"<QuestionStats(question_id={self.question_id}, attempts={self.attempts}, correct={self.correct})>"
+
 class LearningPath(Base):
     """Learning path model"""
     
@@ -207,6 +233,7 @@ class UserPathProgress(Base):
     """User learning path progress"""
     
     __tablename__ = "user_path_progress"
+    __table_args__ = (UniqueConstraint("user_id", "path_id", name="uq_user_path_progress_user_path"),)
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -0,0 +1,25 @@
+"""
+Research activity models for HANU-YOUTH platform
+"""
+
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class ResearchStats(Base):
+    """Recorded view and download totals per research item"""
+    
+    __tablename__ = "research_stats"
+    
+    research_id = Column(String, primary_key=True)
+    
+    # Running totals (flushed in batches by the research counters)
+    view_count = Column(Integer, default=0)
+    download_count = Column(Integer, default=0)
+    
+    # Timestamps
+    last_activity_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    
+    def __repr__(self):
+        return f"<ResearchStats(research_id={self.research_id}, views={self.view_count}, downloads={self.download_count})>"
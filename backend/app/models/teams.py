@@ -245,7 +245,7 @@ class LeaderboardEntry(Base):
     value = Column(Float, default=0.0)  # The actual value being ranked (xp, coins, etc.)
     
     # Metadata
-    metadata = Column(JSON, default={})  # Additional data like country, team, etc.
+    entry_metadata = Column("metadata", JSON, default={})  # Additional data like country, team, etc. ("metadata" is reserved on models)
     
     # Timestamps
     created_at = Column(DateTime, default=func.now())
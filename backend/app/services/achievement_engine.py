@@ -0,0 +1,280 @@
+"""
+Achievement rule engine for HANU-YOUTH platform
+Compiles Achievement.criteria into per-counter indexes and evaluates
+only the rules affected by an incoming activity event
+"""
+
+from typing import Dict, List, Any, Optional, Set
+from datetime import datetime
+from collections import defaultdict
+import bisect
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.core.database import insert_or_ignore
+from app.models import User, Achievement, UserAchievement
+from app.core.cache import cache, CACHE_KEYS, CACHE_TAGS
+
+# Activity events and the counter each one moves
+EVENT_COUNTERS = {
+    "quiz_completed": "quiz",
+    "xp_gained": "xp",
+    "search_performed": "search",
+    "innovation_created": "innovation",
+    "streak_updated": "streak",
+    "team_joined": "team:join",
+    "team_created": "team:create"
+}
+
+# add_xp activity types and the event they imply
+ACTIVITY_EVENTS = {
+    "quiz": "quiz_completed",
+    "search": "search_performed",
+    "innovation": "innovation_created"
+}
+
+# User columns backing each counter (counters without a column take the event value)
+COUNTER_FIELDS = {
+    "quiz": "total_quizzes_taken",
+    "xp": "xp",
+    "search": "total_searches",
+    "innovation": "total_innovations",
+    "streak": "daily_streak"
+}
+
+# Keys used by GamificationService stats dicts
+COUNTER_STAT_KEYS = {
+    "quiz": "total_quizzes_taken",
+    "xp": "total_xp",
+    "search": "total_searches",
+    "innovation": "total_innovations",
+    "streak": "daily_streak"
+}
+
+# Criteria fields that may hold the threshold
+THRESHOLD_KEYS = ("count", "amount", "days")
+
+class AchievementRuleEngine:
+    """Indexes achievement rules by counter for incremental evaluation"""
+
+    def __init__(self):
+        self.rules: Dict[int, Dict[str, Any]] = {}  # achievement_id -> rule
+        self.counter_index: Dict[str, Dict[str, list]] = {}  # counter -> sorted thresholds/ids
+        self.is_loaded = False
+        self.version = 0
+
+    @staticmethod
+    def compile_criteria(criteria: Optional[Dict[str, Any]]) -> Optional[tuple]:
+        """Compile a criteria dict into a (counter, threshold) pair"""
+        if not criteria or "type" not in criteria:
+            return None
+
+        counter = criteria["type"]
+        if "action" in criteria:
+            # Action-based rules unlock on the first matching event
+            return f"{counter}:{criteria['action']}", 1
+
+        for key in THRESHOLD_KEYS:
+            if key in criteria:
+                return counter, criteria[key]
+
+        return None
+
+    def compile(self, achievements: List[Achievement]) -> None:
+        """Build the per-counter rule indexes"""
+        rules = {}
+        grouped = defaultdict(list)
+
+        for achievement in achievements:
+            compiled = self.compile_criteria(achievement.criteria)
+            if not compiled:
+                continue
+
+            counter, threshold = compiled
+            rules[achievement.id] = {
+                "achievement_id": achievement.id,
+                "counter": counter,
+                "threshold": threshold,
+                "name": achievement.name,
+                "description": achievement.description,
+                "icon": achievement.icon,
+                "category": achievement.category,
+                "rarity": achievement.rarity,
+                "xp_reward": achievement.xp_reward or 0,
+                "coin_reward": achievement.coin_reward or 0,
+                "gem_reward": achievement.gem_reward or 0
+            }
+            grouped[counter].append((threshold, achievement.id))
+
+        # Sorted thresholds let us bisect to the rules a value satisfies
+        counter_index = {}
+        for counter, entries in grouped.items():
+            entries.sort()
+            counter_index[counter] = {
+                "thresholds": [threshold for threshold, _ in entries],
+                "achievement_ids": [achievement_id for _, achievement_id in entries]
+            }
+
+        self.rules = rules
+        self.counter_index = counter_index
+        self.is_loaded = True
+        self.version += 1
+
+    def load(self, db: Session) -> None:
+        """Load and compile all achievements from the database"""
+        self.compile(db.query(Achievement).all())
+
+    def ensure_loaded(self, db: Session) -> None:
+        """Compile rules on first use"""
+        if not self.is_loaded:
+            self.load(db)
+
+    def invalidate(self) -> None:
+        """Force a recompile on next use (call after editing achievements)"""
+        self.is_loaded = False
+
+    def evaluate(self, counter: str, value: float, unlocked_ids: Set[int]) -> List[int]:
+        """Return achievement ids newly satisfied by a counter value"""
+        index = self.counter_index.get(counter)
+        if not index:
+            return []
+
+        end = bisect.bisect_right(index["thresholds"], value)
+        return [
+            achievement_id for achievement_id in index["achievement_ids"][:end]
+            if achievement_id not in unlocked_ids
+        ]
+
+    def evaluate_stats(self, user_stats: Dict[str, Any], unlocked_ids: Optional[Set[int]] = None) -> List[Dict[str, Any]]:
+        """Evaluate every indexed counter present in a stats dict"""
+        unlocked_ids = unlocked_ids or set()
+        results = []
+
+        for counter, stat_key in COUNTER_STAT_KEYS.items():
+            if stat_key not in user_stats:
+                continue
+            for achievement_id in self.evaluate(counter, user_stats[stat_key], unlocked_ids):
+                results.append(self.rules[achievement_id])
+
+        return results
+
+    def get_unlocked_ids(self, db: Session, user_id: int) -> Set[int]:
+        """Get a user's unlocked achievement ids with caching"""
+        cache_key = CACHE_KEYS['USER_ACHIEVEMENTS'].format(user_id=user_id)
+        unlocked_ids = cache.get(cache_key)
+        if unlocked_ids is None:
+            rows = db.query(UserAchievement.achievement_id).filter(
+                UserAchievement.user_id == user_id
+            ).all()
+            unlocked_ids = {row.achievement_id for row in rows}
+            cache.set(cache_key, unlocked_ids)
+        return unlocked_ids
+
+    def _resolve_value(self, user: User, counter: str, value: Optional[float]) -> Optional[float]:
+        """Read the current counter value for an event"""
+        if value is not None:
+            return value
+
+        field = COUNTER_FIELDS.get(counter)
+        if field:
+            return getattr(user, field) or 0
+        if ":" in counter:
+            return 1
+
+        # No backing column, so the caller must supply the running total
+        return None
+
+    def process_events(self, db: Session, user: User, event_types: List[str],
+                       values: Optional[Dict[str, float]] = None) -> List[Dict[str, Any]]:
+        """Evaluate the rules listening on a set of events and persist new unlocks
+
+        The caller owns the transaction; unlocks are inserted-or-ignored against
+        the unique (user_id, achievement_id) constraint and rewards for the rows
+        actually inserted are applied to the user object.
+        """
+        values = values or {}
+        candidates = []
+
+        for event_type in event_types:
+            counter = EVENT_COUNTERS.get(event_type)
+            if counter is None:
+                continue
+
+            self.ensure_loaded(db)
+            index = self.counter_index.get(counter)
+            if not index:
+                continue
+
+            value = self._resolve_value(user, counter, values.get(event_type))
+
+            # Cheap pre-check: nothing can unlock below the lowest threshold
+            if value is None or value < index["thresholds"][0]:
+                continue
+
+            candidates.append((counter, value))
+
+        if not candidates:
+            return []
+
+        unlocked_ids = self.get_unlocked_ids(db, user.id)
+        new_ids = []
+        for counter, value in candidates:
+            for achievement_id in self.evaluate(counter, value, unlocked_ids):
+                if achievement_id not in new_ids:
+                    new_ids.append(achievement_id)
+
+        if not new_ids:
+            return []
+
+        # Insert-or-ignore on (user_id, achievement_id): a concurrent request (or a
+        # stale unlocked-id cache) may already have granted some of these, and only
+        # the request whose row lands pays out the rewards
+        now = datetime.now()
+        new_ids = [
+            achievement_id for achievement_id in new_ids
+            if insert_or_ignore(db, UserAchievement, {
+                "user_id": user.id,
+                "achievement_id": achievement_id,
+                "unlocked_at": now,
+                "progress": 100.0
+            }, [UserAchievement.user_id, UserAchievement.achievement_id])
+        ]
+
+        self._invalidate_user(user.id)
+        if not new_ids:
+            return []
+
+        unlocked = [self.rules[achievement_id] for achievement_id in new_ids]
+        for rule in unlocked:
+            user.xp += rule["xp_reward"]
+            user.coins += rule["coin_reward"]
+            user.gems += rule["gem_reward"]
+
+        event.listen(db, "after_commit", lambda session: self._invalidate_user(user.id), once=True)
+
+        return unlocked
+
+    @staticmethod
+    def _invalidate_user(user_id: int) -> None:
+        """Drop cached achievement data so the next read reloads committed rows
+
+        Runs at unlock time (a rollback must not leave cached unlocks behind)
+        and again after commit (reads in between saw the old rows).
+        """
+        cache.delete(CACHE_KEYS['USER_ACHIEVEMENTS'].format(user_id=user_id))
+        cache.invalidate_tag(CACHE_TAGS['USER_ACHIEVEMENTS'].format(user_id=user_id))
+
+    def process_event(self, db: Session, user: User, event_type: str, value: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Evaluate the rules listening on a single event"""
+        values = {event_type: value} if value is not None else None
+        return self.process_events(db, user, [event_type], values)
+
+    @staticmethod
+    def events_for_activity(activity_type: str) -> List[str]:
+        """Events implied by an add_xp activity"""
+        events = ["xp_gained"]
+        if activity_type in ACTIVITY_EVENTS:
+            events.append(ACTIVITY_EVENTS[activity_type])
+        return events
+
+# Global achievement rule engine instance
+achievement_engine = AchievementRuleEngine()
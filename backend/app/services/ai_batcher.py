@@ -0,0 +1,86 @@
+"""
+Async micro-batching for HANU-YOUTH AI calls
+Collects concurrent requests for the same model operation for a few
+milliseconds and dispatches them as one batch call
+"""
+
+from typing import Dict, List, Any, Optional, Callable, Awaitable, Tuple
+import asyncio
+from app.core.error_handling import ErrorHandler
+
+# Latency budget (how long the first request may wait for company) and batch cap per operation
+AI_BATCH_OPERATIONS = {
+    "chat_response": {"max_wait_ms": 3, "max_batch_size": 16},  # Interactive; keep the wait tiny
+    "translate_text": {"max_wait_ms": 5, "max_batch_size": 32},
+    "fact_check": {"max_wait_ms": 10, "max_batch_size": 16},
+    "summarize_text": {"max_wait_ms": 20, "max_batch_size": 8}  # Long inputs; batches fill slowly
+}
+
+class MicroBatcher:
+    """Groups submissions into batches bounded by size and wait time"""
+
+    def __init__(self, name: str, handler: Callable[[List[Dict[str, Any]]], Awaitable[List[Any]]],
+                 max_batch_size: int = 16, max_wait_ms: float = 5):
+        self.name = name
+        self.handler = handler
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.queue: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.stats = {"requests": 0, "batches": 0}
+
+    async def submit(self, item: Dict[str, Any]) -> Any:
+        """Queue one request and wait for its slot in a batch result"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.queue.append((item, future))
+        self.stats["requests"] += 1
+
+        if len(self.queue) >= self.max_batch_size:
+            self._dispatch()
+        elif self.timer is None:
+            self.timer = loop.call_later(self.max_wait, self._dispatch)
+
+        return await future
+
+    def _dispatch(self) -> None:
+        """Send everything queued so far as one batch"""
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+        batch, self.queue = self.queue[:self.max_batch_size], self.queue[self.max_batch_size:]
+        if self.queue:
+            # Overflow starts its own wait window
+            self.timer = asyncio.get_running_loop().call_later(self.max_wait, self._dispatch)
+        if batch:
+            self.stats["batches"] += 1
+            asyncio.create_task(self._run(batch))
+
+    async def _run(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]) -> None:
+        """Call the batch handler and fan results back out"""
+        live = [(item, future) for item, future in batch if not future.cancelled()]
+        if not live:
+            return
+
+        try:
+            results = await self.handler([item for item, _ in live])
+            if len(results) != len(live):
+                raise ValueError(f"{self.name} batch returned {len(results)} results for {len(live)} inputs")
+        except Exception as e:
+            ErrorHandler.log_error(e, f"Batched {self.name}")
+            for _, future in live:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(live, results):
+            if not future.done():
+                future.set_result(result)
+
+def create_batchers(handlers: Dict[str, Callable[[List[Dict[str, Any]]], Awaitable[List[Any]]]]) -> Dict[str, MicroBatcher]:
+    """One MicroBatcher per operation using the configured budgets"""
+    return {
+        operation: MicroBatcher(operation, handler, **AI_BATCH_OPERATIONS[operation])
+        for operation, handler in handlers.items()
+    }
@@ -0,0 +1,208 @@
+"""
+AI result cache for HANU-YOUTH platform
+Content-addressed cache for deterministic model calls: an in-memory LRU in
+front of a SQLite tier, with per-operation TTLs and in-flight deduplication
+"""
+
+from typing import Dict, Any, Optional, Callable, Awaitable
+from collections import OrderedDict
+from functools import wraps
+import asyncio
+import hashlib
+import inspect
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from app.core.config import settings
+from app.core.error_handling import ErrorHandler
+
+# Per-operation TTL (seconds) and whether text inputs are case-insensitive
+AI_CACHE_OPERATIONS = {
+    "generate_quiz": {"ttl": 7 * 86400, "fold_case": True},
+    "adaptive_learning_path": {"ttl": 7 * 86400, "fold_case": True},
+    "summarize_text": {"ttl": 30 * 86400, "fold_case": False},
+    "translate_text": {"ttl": 30 * 86400, "fold_case": False},
+    "fact_check": {"ttl": 86400, "fold_case": False}  # Evidence moves; re-check daily
+}
+
+# Results carrying this flag are fallback output (mock or lower tier) and are never stored
+DEGRADED_KEY = "degraded"
+
+def normalize_input(value: Any, fold_case: bool) -> Any:
+    """Canonical form of a call argument for hashing"""
+    if isinstance(value, str):
+        value = " ".join(unicodedata.normalize("NFKC", value).split())
+        return value.casefold() if fold_case else value
+    if isinstance(value, dict):
+        return {str(k): normalize_input(v, fold_case) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [normalize_input(v, fold_case) for v in value]
+    return value
+
+class AIResultCache:
+    """Two-tier cache of model results keyed by SHA-256 of the request"""
+
+    def __init__(self, path: str = settings.data_path(settings.AI_CACHE_PATH), memory_items: int = settings.AI_CACHE_MEMORY_ITEMS,
+                 model_version: str = settings.AI_MODEL_VERSION):
+        self.path = path
+        self.memory_items = memory_items
+        self.model_version = model_version
+        self.memory: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, payload json)
+        self.inflight: Dict[str, asyncio.Future] = {}
+        self.connection: Optional[sqlite3.Connection] = None
+        self.lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "deduplicated": 0}
+
+    def make_key(self, operation: str, inputs: Dict[str, Any]) -> str:
+        """SHA-256 of (operation, normalised inputs, model version)"""
+        fold_case = AI_CACHE_OPERATIONS.get(operation, {}).get("fold_case", False)
+        material = json.dumps(
+            [operation, normalize_input(inputs, fold_case), self.model_version],
+            sort_keys=True, ensure_ascii=False, default=str
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the SQLite tier on first use"""
+        if self.connection is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self.connection = sqlite3.connect(self.path, check_same_thread=False)
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS ai_results ("
+                "key TEXT PRIMARY KEY, operation TEXT NOT NULL, payload TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self.connection.execute("CREATE INDEX IF NOT EXISTS ix_ai_results_expires ON ai_results (expires_at)")
+            self.connection.commit()
+        return self.connection
+
+    def _remember(self, key: str, expires_at: float, payload: str) -> None:
+        """Insert into the LRU, evicting the least recently used entry"""
+        self.memory[key] = (expires_at, payload)
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.memory_items:
+            self.memory.popitem(last=False)
+
+    def _disk_get(self, key: str) -> Optional[tuple]:
+        """Read a live entry from SQLite"""
+        with self.lock:
+            row = self._connect().execute(
+                "SELECT expires_at, payload FROM ai_results WHERE key = ? AND expires_at > ?",
+                (key, time.time())
+            ).fetchone()
+        return row
+
+    def _disk_set(self, key: str, operation: str, expires_at: float, payload: str) -> None:
+        """Write an entry to SQLite"""
+        with self.lock:
+            connection = self._connect()
+            connection.execute(
+                "INSERT OR REPLACE INTO ai_results (key, operation, payload, expires_at) VALUES (?, ?, ?, ?)",
+                (key, operation, payload, expires_at)
+            )
+            connection.commit()
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Look a key up in memory, then on disk"""
+        entry = self.memory.get(key)
+        if entry is not None:
+            if entry[0] > time.time():
+                self.memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return json.loads(entry[1])
+            del self.memory[key]
+
+        try:
+            row = await asyncio.to_thread(self._disk_get, key)
+        except sqlite3.Error as e:
+            ErrorHandler.log_error(e, "Reading AI result cache")
+            row = None
+        if row is None:
+            return None
+
+        self._remember(key, row[0], row[1])
+        self.stats["disk_hits"] += 1
+        return json.loads(row[1])
+
+    async def set(self, key: str, operation: str, value: Any) -> None:
+        """Store a result in both tiers"""
+        ttl = AI_CACHE_OPERATIONS.get(operation, {}).get("ttl", 86400)
+        expires_at = time.time() + ttl
+        payload = json.dumps(value, ensure_ascii=False)
+        self._remember(key, expires_at, payload)
+        try:
+            await asyncio.to_thread(self._disk_set, key, operation, expires_at, payload)
+        except sqlite3.Error as e:
+            ErrorHandler.log_error(e, "Writing AI result cache")
+
+    async def get_or_compute(self, operation: str, inputs: Dict[str, Any],
+                             compute: Callable[[], Awaitable[Any]]) -> Any:
+        """Return a cached result, joining an identical in-flight call if there is one"""
+        key = self.make_key(operation, inputs)
+        cached = await self.get(key)
+        if cached is not None:
+            return cached
+
+        pending = self.inflight.get(key)
+        if pending is not None:
+            self.stats["deduplicated"] += 1
+            # Shield so one impatient caller cannot cancel the shared computation
+            return json.loads(await asyncio.shield(pending))
+
+        self.stats["misses"] += 1
+        future = asyncio.get_running_loop().create_future()
+        self.inflight[key] = future
+        try:
+            result = await compute()
+            # Release waiters before the disk write
+            future.set_result(json.dumps(result, ensure_ascii=False))
+            if not (isinstance(result, dict) and result.get(DEGRADED_KEY)):
+                await self.set(key, operation, result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so a failure nobody else awaited is not reported as unhandled
+            future.exception()
+            raise
+        finally:
+            del self.inflight[key]
+
+    def cached(self, operation: str):
+        """Decorator caching an async method by its bound arguments"""
+        def decorator(func: Callable) -> Callable:
+            signature = inspect.signature(func)
+
+            @wraps(func)
+            async def wrapper(*args, **kwargs):
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                inputs = {name: value for name, value in bound.arguments.items() if name != "self"}
+                return await self.get_or_compute(operation, inputs, lambda: func(*args, **kwargs))
+
+            return wrapper
+        return decorator
+
+    def purge_expired(self) -> int:
+        """Delete expired rows from the SQLite tier"""
+        with self.lock:
+            connection = self._connect()
+            deleted = connection.execute("DELETE FROM ai_results WHERE expires_at <= ?", (time.time(),)).rowcount
+            connection.commit()
+        return deleted
+
+    def close(self) -> None:
+        """Close the SQLite tier"""
+        with self.lock:
+            if self.connection is not None:
+                self.connection.close()
+                self.connection = None
+
+# Global AI result cache instance
+ai_result_cache = AIResultCache()
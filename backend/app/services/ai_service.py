@@ -4,31 +4,132 @@ Handles AI-powered features using HANU AI SDK
 """
 
 import asyncio
+import importlib.util
 import json
-from typing import Dict, List, Any, Optional
+import logging
+from typing import Dict, List, Any, Optional, AsyncIterator
 from datetime import datetime
+from collections import defaultdict
 import httpx
+from app.core.config import settings
+from app.core.error_handling import retry_with_backoff, RETRY_CONFIGS, CIRCUIT_BREAKERS, ErrorHandler
+from app.services.answer_grader import answer_grader
+from app.services.ai_cache import ai_result_cache, DEGRADED_KEY
+from app.services.ai_batcher import create_batchers
+from app.services.local_inference import local_inference
+from app.services.extractive_summarizer import extractive_summarizer
+
+logger = logging.getLogger(__name__)
 
 class HAIService:
     """HANU AI Service for platform features"""
     
     def __init__(self):
-        self.base_url = "https://api.hanu-ai.org/v1"  # Mock API URL
-        self.api_key = None  # Would be loaded from config
+        self.base_url = settings.AI_API_BASE_URL
+        self.api_key = settings.AI_API_KEY
+        self.client: Optional[httpx.AsyncClient] = None
+        self.circuit_breaker = CIRCUIT_BREAKERS["ai_service"]
+        self.batchers = create_batchers({
+            "translate_text": self._translate_batch,
+            "fact_check": self._fact_check_batch,
+            "summarize_text": self._summarize_batch,
+            "chat_response": self._chat_batch
+        })
+    
+    def _create_client(self) -> httpx.AsyncClient:
+        """Build the pooled client shared by every model call"""
+        http2 = settings.AI_HTTP2 and importlib.util.find_spec("h2") is not None
+        if settings.AI_HTTP2 and not http2:
+            logger.warning("h2 is not installed; AI client falls back to HTTP/1.1 (pip install httpx[http2])")
         
-    async def generate_quiz(self, topic: str, difficulty: str, question_count: int) -> Dict[str, Any]:
-        """Generate quiz questions using AI"""
-        # Mock implementation - in real implementation, this would call HANU AI SDK
-        questions = []
+        headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+        return httpx.AsyncClient(
+            base_url=self.base_url,
+            headers=headers,
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=settings.AI_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.AI_HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=settings.AI_HTTP_KEEPALIVE_EXPIRY
+            ),
+            timeout=httpx.Timeout(settings.AI_HTTP_TIMEOUT, connect=settings.AI_HTTP_CONNECT_TIMEOUT)
+        )
+    
+    async def start(self) -> None:
+        """Open the pooled HTTP client (called from the app lifespan)"""
+        if self.client is None or self.client.is_closed:
+            self.client = self._create_client()
+    
+    async def close(self) -> None:
+        """Close the pooled HTTP client and its connections"""
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+    
+    @retry_with_backoff(RETRY_CONFIGS["ai_service"])
+    async def _post(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """POST to the model API over the shared client, behind the circuit breaker"""
+        if self.client is None:
+            # Scripts and workers outside the app lifespan still share one client
+            await self.start()
+        
+        async def send() -> Dict[str, Any]:
+            response = await self.client.post(path, json=payload)
+            response.raise_for_status()
+            return response.json()
+        
+        return await self.circuit_breaker.call_async(send)
+    
+    async def _post_batch(self, path: str, items: List[Dict[str, Any]], context: str) -> Optional[List[Dict[str, Any]]]:
+        """Send a batch to the model API; None (caller falls back) without a key or on failure"""
+        if not self.api_key or not items:
+            return None
+        
+        try:
+            # Round-trip through JSON so datetimes in chat history serialize
+            payload = json.loads(json.dumps({"items": items}, default=str))
+            results = (await self._post(path, payload))["results"]
+            if len(results) != len(items):
+                raise ValueError(f"Expected {len(items)} results, got {len(results)}")
+            return results
+        except Exception as e:
+            ErrorHandler.log_error(e, context)
+            return None
+    
+    async def stream_quiz_questions(self, topic: str, difficulty: str, question_count: int,
+                                    question_types: Optional[List[str]] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Yield generated quiz questions one at a time as the model produces them"""
+        question_types = question_types or ["multiple_choice"]
+        # Mock implementation - in real implementation, this would stream from HANU AI SDK
         for i in range(question_count):
-            questions.append({
-                "question_text": f"What is the main concept of {topic} in question {i+1}?",
-                "question_type": "multiple_choice",
-                "options": ["Option A", "Option B", "Option C", "Option D"],
-                "correct_answer": "Option A",
-                "explanation": f"This is the correct answer for question {i+1} about {topic}.",
-                "points": 10
-            })
+            if "multiple_choice" in question_types:
+                yield {
+                    "question_text": f"What is the main concept of {topic} in question {i+1}?",
+                    "question_type": "multiple_choice",
+                    "options": ["Option A", "Option B", "Option C", "Option D"],
+                    "correct_answer": "Option A",
+                    "explanation": f"This is the correct answer for question {i+1} about {topic}.",
+                    "points": 10
+                }
+            elif "true_false" in question_types:
+                yield {
+                    "question_text": f"{topic} is a fundamental concept in this field.",
+                    "question_type": "true_false",
+                    "options": None,
+                    "correct_answer": "True",
+                    "explanation": f"This statement about {topic} is true.",
+                    "points": 5
+                }
+            # Hand control back between questions, as a network stream would
+            await asyncio.sleep(0)
+    
+    @ai_result_cache.cached("generate_quiz")
+    async def generate_quiz(self, topic: str, difficulty: str, question_count: int,
+                            question_types: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Generate quiz questions using AI"""
+        questions = [
+            question async for question in self.stream_quiz_questions(topic, difficulty, question_count, question_types)
+        ]
         
         return {
             "questions": questions,
@@ -44,12 +145,40 @@ class HAIService:
         total_score = 0
         max_score = 0
         
-        for answer in answers:
+        # Decide locally first; only ambiguous answers need the model
+        grades = [
+            answer_grader.grade(
+                answer_grader.prepare(
+                    answer.get("correct_answer", ""),
+                    answer.get("question_type", "short_answer"),
+                    aliases=answer.get("accepted_answers")
+                ),
+                answer.get("user_answer", "")
+            )
+            for answer in answers
+        ]
+        review_indices = [i for i, grade in enumerate(grades) if grade["needs_review"]]
+        reviews = dict(zip(
+            review_indices,
+            await self._review_answers([answers[i] for i in review_indices]) if review_indices else []
+        ))
+        
+        for i, answer in enumerate(answers):
             user_answer = answer.get("user_answer", "")
             correct_answer = answer.get("correct_answer", "")
+            grade = grades[i]
             
-            # Simple evaluation logic
-            is_correct = user_answer.lower().strip() == correct_answer.lower().strip()
+            is_correct = grade["is_correct"]
+            grading_method = grade["method"]
+            needs_review = False
+            if grade["needs_review"]:
+                if reviews.get(i) is None:
+                    # No model verdict: withhold the points until someone reviews it
+                    grading_method = "pending_review"
+                    needs_review = True
+                else:
+                    is_correct = reviews[i]
+                    grading_method = "ai_review"
             points = answer.get("points", 10) if is_correct else 0
             
             evaluation_results.append({
@@ -58,6 +187,8 @@ class HAIService:
                 "correct_answer": correct_answer,
                 "is_correct": is_correct,
                 "points_earned": points,
+                "grading_method": grading_method,
+                "needs_review": needs_review,
                 "feedback": self._generate_feedback(is_correct, user_answer, correct_answer)
             })
             
@@ -74,6 +205,27 @@ class HAIService:
             "performance_feedback": self._get_performance_feedback(percentage)
         }
     
+    async def _review_answers(self, answers: List[Dict[str, Any]]) -> List[Optional[bool]]:
+        """Ask the model to grade answers the local grader could not decide (None = no verdict)"""
+        if not self.api_key:
+            return [None] * len(answers)
+        
+        try:
+            result = await self._post("/grade", {
+                "answers": [
+                    {
+                        "question": answer.get("question_text"),
+                        "correct_answer": answer.get("correct_answer", ""),
+                        "user_answer": answer.get("user_answer", "")
+                    }
+                    for answer in answers
+                ]
+            })
+            return [bool(verdict.get("is_correct")) for verdict in result["results"]][:len(answers)]
+        except Exception as e:
+            ErrorHandler.log_error(e, "AI answer review")
+            return [None] * len(answers)
+    
     def _generate_feedback(self, is_correct: bool, user_answer: str, correct_answer: str) -> str:
         """Generate feedback for quiz answers"""
         if is_correct:
@@ -94,27 +246,82 @@ class HAIService:
         else:
             return "Keep practicing! Focus on understanding the fundamental concepts."
     
+    @ai_result_cache.cached("translate_text")
     async def translate_text(self, text: str, target_language: str, source_language: str = "auto") -> Dict[str, Any]:
         """Translate text using AI"""
-        # Mock implementation
-        return {
-            "original_text": text,
-            "translated_text": f"[Translated to {target_language}]: {text}",
-            "source_language": source_language,
+        return await self.batchers["translate_text"].submit({
+            "text": text,
             "target_language": target_language,
-            "confidence": 0.95
-        }
+            "source_language": source_language
+        })
     
+    async def _translate_batch(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Translate a batch of texts in one model call"""
+        translations = {}
+        if local_inference.ready:
+            # One batched call per language pair
+            groups = defaultdict(list)
+            for i, item in enumerate(items):
+                source = "en" if item["source_language"] == "auto" else item["source_language"]
+                groups[(source, item["target_language"])].append(i)
+            
+            pairs = list(groups.items())
+            outputs = await asyncio.gather(*(
+                local_inference.translate([items[i]["text"] for i in indices], source, target)
+                for (source, target), indices in pairs
+            ), return_exceptions=True)
+            for ((source, target), indices), output in zip(pairs, outputs):
+                if isinstance(output, Exception):
+                    ErrorHandler.log_error(output, f"Local translation {source}->{target}")
+                    continue
+                translations.update(zip(indices, output))
+        
+        # Model API for what the local models did not cover
+        missing = [i for i in range(len(items)) if i not in translations]
+        remote = await self._post_batch("/translate", [items[i] for i in missing], "AI translation")
+        if remote:
+            translations.update(
+                (i, result["translated_text"]) for i, result in zip(missing, remote) if result.get("translated_text")
+            )
+        
+        # Mock implementation for anything still untranslated (flagged so it is not cached)
+        results = []
+        for i, item in enumerate(items):
+            result = {
+                "original_text": item["text"],
+                "translated_text": translations.get(i, f"[Translated to {item['target_language']}]: {item['text']}"),
+                "source_language": item["source_language"],
+                "target_language": item["target_language"],
+                "confidence": 0.95
+            }
+            if i not in translations:
+                result[DEGRADED_KEY] = True
+            results.append(result)
+        return results
+    
+    @ai_result_cache.cached("fact_check")
     async def fact_check(self, text: str, context: Optional[str] = None) -> Dict[str, Any]:
         """Fact check text using AI"""
-        # Mock implementation
-        return {
-            "text": text,
-            "is_factual": True,  # Mock result
-            "confidence": 0.85,
-            "sources": ["Source 1", "Source 2", "Source 3"],
-            "explanation": "This statement appears to be factual based on analysis of multiple sources."
-        }
+        return await self.batchers["fact_check"].submit({"text": text, "context": context})
+    
+    async def _fact_check_batch(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Fact check a batch of statements in one model call"""
+        remote = await self._post_batch("/fact-check", items, "AI fact check")
+        if remote:
+            return [{"text": item["text"], **result} for item, result in zip(items, remote)]
+        
+        # Mock implementation (flagged so it is not cached)
+        return [
+            {
+                "text": item["text"],
+                "is_factual": True,  # Mock result
+                "confidence": 0.85,
+                "sources": ["Source 1", "Source 2", "Source 3"],
+                "explanation": "This statement appears to be factual based on analysis of multiple sources.",
+                DEGRADED_KEY: True
+            }
+            for item in items
+        ]
     
     async def generate_ideas(self, materials: List[str], budget: float, skill_level: str) -> Dict[str, Any]:
         """Generate innovation ideas using AI"""
@@ -157,26 +364,44 @@ class HAIService:
             "required_skills": ["Creativity", "Problem-solving", "Basic crafting"]
         }
     
+    @ai_result_cache.cached("summarize_text")
     async def summarize_text(self, text: str, max_length: int = 500) -> Dict[str, Any]:
         """Summarize text using AI"""
-        # Extract key points (mock implementation)
-        sentences = text.split('. ')
-        key_points = [
-            sentences[0] if sentences else "No content available",
-            sentences[1] if len(sentences) > 1 else "Important finding",
-            sentences[2] if len(sentences) > 2 else "Key insight"
-        ]
+        return await self.batchers["summarize_text"].submit({"text": text, "max_length": max_length})
+    
+    async def _summarize_batch(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Summarize a batch of texts in one model call"""
+        # Extractive tier first: cheap, and supplies key points either way
+        results = await asyncio.to_thread(lambda: [
+            extractive_summarizer.summarize(item["text"], max_words=item["max_length"])
+            for item in items
+        ])
         
-        # Generate summary
-        summary = f"This research explores important aspects of the topic. Key findings include significant developments in the field, with implications for future research and practical applications."
+        if local_inference.ready:
+            try:
+                max_new_tokens = min(256, max(item["max_length"] for item in items))
+                summaries = await local_inference.summarize([item["text"] for item in items], max_new_tokens)
+                for result, summary in zip(results, summaries):
+                    result["summary"] = summary
+                    result["summary_length"] = len(summary.split())
+                    result["method"] = "local_model"
+            except Exception as e:
+                ErrorHandler.log_error(e, "Local summarization")
+        else:
+            remote = await self._post_batch("/summarize", items, "AI summarization")
+            for result, output in zip(results, remote or []):
+                if output.get("summary"):
+                    result["summary"] = output["summary"]
+                    result["summary_length"] = len(output["summary"].split())
+                    result["method"] = "model_api"
         
-        return {
-            "summary": summary,
-            "key_points": key_points,
-            "word_count": len(text.split()),
-            "summary_length": len(summary.split())
-        }
+        # Extractive-only summaries are the fallback tier; recompute rather than cache them
+        for result in results:
+            if result.get("method") not in ("local_model", "model_api"):
+                result[DEGRADED_KEY] = True
+        return results
     
+    @ai_result_cache.cached("adaptive_learning_path")
     async def adaptive_learning_path(self, user_history: Dict[str, Any], topic: str) -> Dict[str, Any]:
         """Generate adaptive learning path using AI"""
         return {
@@ -271,6 +496,25 @@ class HAIService:
     
     async def chat_response(self, message: str, context: Optional[Dict[str, Any]] = None, conversation_history: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
         """Generate chatbot response using AI"""
+        return await self.batchers["chat_response"].submit({
+            "message": message,
+            "context": context,
+            "conversation_history": conversation_history
+        })
+    
+    async def _chat_batch(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Generate replies for a batch of chat messages in one model call"""
+        remote = await self._post_batch("/chat", items, "AI chat")
+        if remote:
+            return [{**result, "timestamp": datetime.utcnow()} for result in remote]
+        
+        return [
+            self._chat_one(item["message"], item["context"], item["conversation_history"])
+            for item in items
+        ]
+    
+    def _chat_one(self, message: str, context: Optional[Dict[str, Any]], conversation_history: Optional[List[Dict[str, Any]]]) -> Dict[str, Any]:
+        """Reply to one chat message (mock model output)"""
         # Mock implementation - in production, this would use HANU AI SDK
         
         # Analyze the message to determine intent and context
@@ -0,0 +1,176 @@
+"""
+Local answer grading for HANU-YOUTH platform
+Grades short_answer and code questions with normalised comparison; fuzzy
+similarity only decides rejections, near misses go to review
+"""
+
+from typing import Dict, Any, Iterable, Optional, Tuple
+from difflib import SequenceMatcher
+import ast
+import math
+import re
+import unicodedata
+
+# Words that never change the meaning of a short answer
+STOPWORDS = frozenset({"a", "an", "the", "of", "is", "are", "it", "its"})
+
+# Punctuation that never changes meaning; any other symbol ("=", "+", "<") must match exactly
+IGNORED_SYMBOLS = frozenset(".,;:!?'\"()[]{}-_`\u2018\u2019\u201c\u201d")
+
+PUNCTUATION_RE = re.compile(r"[^\w\s.%/-]")
+WHITESPACE_RE = re.compile(r"\s+")
+NUMBER_RE = re.compile(r"^[-+]?(\d+(\.\d*)?|\.\d+)(e[-+]?\d+)?$")
+CODE_COMMENT_RE = re.compile(r"(#|//)[^\n]*")
+CODE_SPACING_RE = re.compile(r"\s*([^\w\s])\s*")
+
+class AnswerGrader:
+    """Normalising, fuzzy grader for free-text and code answers"""
+
+    def __init__(self, accept_threshold: float = 0.85, reject_threshold: float = 0.5,
+                 numeric_tolerance: float = 2e-3):
+        self.accept_threshold = accept_threshold
+        self.reject_threshold = reject_threshold
+        self.numeric_tolerance = numeric_tolerance
+
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        """Unicode-fold, lowercase and strip punctuation"""
+        text = unicodedata.normalize("NFKD", text)
+        text = "".join(char for char in text if not unicodedata.combining(char))
+        text = PUNCTUATION_RE.sub(" ", text.casefold())
+        return WHITESPACE_RE.sub(" ", text).strip(" .")
+
+    @staticmethod
+    def symbols(text: str) -> str:
+        """Meaningful symbols of an answer, in order"""
+        return "".join(
+            char for char in text
+            if not char.isalnum() and not char.isspace() and char not in IGNORED_SYMBOLS
+        )
+
+    @staticmethod
+    def tokenize(normalized: str) -> Tuple[str, ...]:
+        """Content tokens of a normalised answer, in order"""
+        return tuple(token for token in normalized.split() if token not in STOPWORDS)
+
+    @staticmethod
+    def parse_number(normalized: str) -> Optional[Tuple[float, bool]]:
+        """Read a plain number, percentage or simple fraction as (value, is_decimal)
+
+        Integers compare exactly ("1945" rejects 1945.4); only keys written with
+        decimals or as fractions get a relative tolerance.
+        """
+        text = normalized.replace(",", "").replace(" ", "")
+        scale = 1.0
+        if text.endswith("%"):
+            text, scale = text[:-1], 0.01
+
+        if "/" in text:
+            numerator, _, denominator = text.partition("/")
+            if NUMBER_RE.match(numerator) and NUMBER_RE.match(denominator) and float(denominator) != 0:
+                return float(numerator) / float(denominator) * scale, True
+            return None
+
+        if NUMBER_RE.match(text):
+            mantissa = text.lower().split("e")[0]
+            return float(text) * scale, "." in mantissa
+        return None
+
+    @staticmethod
+    def normalize_code(code: str) -> str:
+        """Canonical form of a code answer (AST dump for Python, else whitespace-folded)"""
+        try:
+            return ast.dump(ast.parse(code.strip()))
+        except (SyntaxError, ValueError):
+            code = CODE_COMMENT_RE.sub("", code)
+            code = CODE_SPACING_RE.sub(r"\1", code)
+            return WHITESPACE_RE.sub(" ", code).strip().rstrip(";")
+
+    def _prepare_text(self, answer: str) -> Dict[str, Any]:
+        """Normalised forms of one accepted text answer"""
+        normalized = self.normalize_text(answer)
+        return {
+            "text": normalized,
+            "tokens": self.tokenize(normalized),
+            "symbols": self.symbols(answer.casefold())
+        }
+
+    def prepare(self, correct_answer: str, question_type: str, aliases: Optional[Iterable[str]] = None,
+                tolerance: Optional[float] = None) -> Dict[str, Any]:
+        """Precompute everything needed to grade against an answer
+
+        aliases are other answers to accept outright; tolerance overrides the
+        relative tolerance for decimal keys.
+        """
+        if question_type == "code":
+            return {"question_type": question_type, "code": self.normalize_code(correct_answer)}
+
+        prepared = self._prepare_text(correct_answer)
+        prepared.update({
+            "question_type": question_type,
+            "number": self.parse_number(prepared["text"]),
+            "tolerance": self.numeric_tolerance if tolerance is None else tolerance,
+            "aliases": [self._prepare_text(alias) for alias in aliases or []]
+        })
+        return prepared
+
+    def _verdict(self, score: float, method: str) -> Dict[str, Any]:
+        """Turn a similarity score into a grading decision"""
+        if score >= self.accept_threshold:
+            return {"is_correct": True, "confidence": score, "method": method, "needs_review": False}
+        if score < self.reject_threshold:
+            return {"is_correct": False, "confidence": 1 - score, "method": method, "needs_review": False}
+        return {"is_correct": False, "confidence": score, "method": method, "needs_review": True}
+
+    def _review(self, score: float, method: str) -> Dict[str, Any]:
+        """Near miss: reject only if clearly different, never accept"""
+        return self._verdict(min(score, self.accept_threshold - 0.01), method)
+
+    def grade(self, prepared: Dict[str, Any], answer: str) -> Dict[str, Any]:
+        """Grade an answer against a prepared key"""
+        if prepared["question_type"] == "code":
+            code = self.normalize_code(answer)
+            if code == prepared["code"]:
+                return self._verdict(1.0, "code")
+            # Near-identical code can still behave differently, so never accept it fuzzily
+            return self._review(SequenceMatcher(None, code, prepared["code"]).ratio(), "code")
+
+        normalized = self.normalize_text(answer)
+        if prepared["number"] is not None:
+            number = self.parse_number(normalized)
+            if number is not None:
+                expected, is_decimal = prepared["number"]
+                if is_decimal:
+                    matched = math.isclose(number[0], expected, rel_tol=prepared["tolerance"])
+                else:
+                    matched = number[0] == expected
+                return self._verdict(1.0 if matched else 0.0, "numeric")
+
+        tokens = self.tokenize(normalized)
+        symbols = self.symbols(answer.casefold())
+        for key, method in [(prepared, "exact")] + [(alias, "alias") for alias in prepared["aliases"]]:
+            if symbols != key["symbols"]:
+                # "x = 1" and "x == 1" normalise alike but differ
+                continue
+            if normalized == key["text"]:
+                return self._verdict(1.0, method)
+            # Same words in the same order ("the Eiffel Tower" / "Eiffel Tower"); a
+            # reordered answer ("Smith John") can mean something else, so it goes to review
+            if tokens and tokens == key["tokens"]:
+                return self._verdict(1.0, "tokens" if method == "exact" else method)
+
+        # Token overlap catches reordering; character similarity catches typos, but also
+        # near-miss wrong answers (mitosis/meiosis), so neither can accept on its own
+        overlap = len(set(tokens) & set(prepared["tokens"]))
+        token_score = 2 * overlap / (len(tokens) + len(prepared["tokens"])) if tokens or prepared["tokens"] else 0.0
+        char_score = SequenceMatcher(
+            None, " ".join(sorted(tokens)), " ".join(sorted(prepared["tokens"]))
+        ).ratio()
+        return self._review(max(token_score, char_score), "fuzzy")
+
+    def grade_text(self, correct_answer: str, answer: str, question_type: str = "short_answer") -> Dict[str, Any]:
+        """Grade without a prepared key"""
+        return self.grade(self.prepare(correct_answer, question_type), answer)
+
+# Global answer grader instance
+answer_grader = AnswerGrader()
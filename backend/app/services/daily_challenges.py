@@ -0,0 +1,333 @@
+"""
+Daily challenge service for HANU-YOUTH platform
+Materializes each day's DailyChallenge rows once from a scheduler and
+applies activity progress to UserDailyChallenge in batches
+"""
+
+from typing import Dict, List, Any, Optional, Set, Tuple
+from datetime import datetime, date, timedelta
+from collections import defaultdict
+import asyncio
+from sqlalchemy.orm import Session
+from app.core.database import SessionLocal, insert_or_ignore
+from app.core.cache import cache, CACHE_KEYS
+from app.core.error_handling import ErrorHandler
+from app.models import DailyChallenge, UserDailyChallenge, User
+from app.services.gamification_service import gamification_service
+
+# Cache for a little over a day; keys are date-scoped so they never go stale
+DAY_TTL = 26 * 3600
+
+class DailyChallengeService:
+    """Shared daily challenges with batched per-user progress"""
+
+    def __init__(self, flush_interval: int = 15):
+        self.flush_interval = flush_interval
+        self.activity_stream: List[Tuple[int, str, int, date]] = []  # (user_id, activity_type, amount, day)
+        self.materialized_day: Optional[date] = None
+        self.scheduler_task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _day_bounds(day: date) -> Tuple[datetime, datetime]:
+        """Datetime range covering a calendar day"""
+        start = datetime.combine(day, datetime.min.time())
+        return start, start + timedelta(days=1)
+
+    @staticmethod
+    def _to_dict(challenge: DailyChallenge) -> Dict[str, Any]:
+        """Detach a challenge row into a cacheable dict"""
+        return {
+            "id": challenge.id,
+            "title": challenge.title,
+            "description": challenge.description,
+            "challenge_type": challenge.challenge_type,
+            "difficulty": challenge.difficulty,
+            "target_value": challenge.target_value,
+            "xp_reward": challenge.xp_reward,
+            "coin_reward": challenge.coin_reward,
+            "gem_reward": challenge.gem_reward
+        }
+
+    def _load_or_create(self, db: Session, day: date) -> List[Dict[str, Any]]:
+        """Read the day's DailyChallenge rows, inserting any missing template
+
+        Inserts are insert-or-ignore on (challenge_date, challenge_key), so
+        concurrent materializations cannot duplicate a day's challenges.
+        Touches only the database, so it is safe to run in a worker thread.
+        """
+        start, end = self._day_bounds(day)
+        query = db.query(DailyChallenge).filter(
+            DailyChallenge.challenge_date >= start,
+            DailyChallenge.challenge_date < end,
+            DailyChallenge.is_active == True
+        )
+
+        challenges = query.all()
+        if not challenges:
+            for template in gamification_service.generate_daily_challenges(day):
+                insert_or_ignore(db, DailyChallenge, {
+                    "challenge_key": template["id"],
+                    "title": template["title"],
+                    "description": template["description"],
+                    "challenge_type": template["type"],
+                    "difficulty": template["difficulty"],
+                    "target_value": template["target_value"],
+                    "xp_reward": template["xp_reward"],
+                    "coin_reward": template["coin_reward"],
+                    "gem_reward": template["gem_reward"],
+                    "challenge_date": start,
+                    "is_active": True
+                }, [DailyChallenge.challenge_date, DailyChallenge.challenge_key])
+            db.commit()
+            challenges = query.all()
+
+        return [self._to_dict(challenge) for challenge in challenges]
+
+    def _remember(self, day: date, challenges: List[Dict[str, Any]]) -> None:
+        """Cache a materialized day (called on the event loop thread)"""
+        cache.set(CACHE_KEYS['DAILY_CHALLENGES'].format(day=day.isoformat()), challenges, DAY_TTL)
+        self.materialized_day = day
+
+    def materialize(self, db: Session, day: Optional[date] = None) -> List[Dict[str, Any]]:
+        """Write the day's DailyChallenge rows if missing and cache them"""
+        day = day or datetime.now().date()
+        challenges = self._load_or_create(db, day)
+        self._remember(day, challenges)
+        return challenges
+
+    def get_challenges(self, db: Session, day: Optional[date] = None) -> List[Dict[str, Any]]:
+        """Get the day's challenges, shared by every user"""
+        day = day or datetime.now().date()
+        challenges = cache.get(CACHE_KEYS['DAILY_CHALLENGES'].format(day=day.isoformat()))
+        if challenges is None:
+            # Scheduler has not run yet (e.g. first request after midnight)
+            challenges = self.materialize(db, day)
+        return challenges
+
+    def get_user_progress(self, db: Session, user_id: int, challenges: List[Dict[str, Any]],
+                          day: Optional[date] = None) -> Dict[int, Dict[str, Any]]:
+        """Get a user's progress per challenge id with caching"""
+        day = day or datetime.now().date()
+        cache_key = CACHE_KEYS['USER_DAILY_CHALLENGES'].format(user_id=user_id, day=day.isoformat())
+        progress = cache.get(cache_key)
+        if progress is None:
+            rows = db.query(UserDailyChallenge).filter(
+                UserDailyChallenge.user_id == user_id,
+                UserDailyChallenge.challenge_id.in_([c["id"] for c in challenges])
+            ).all() if challenges else []
+            progress = {
+                row.challenge_id: {"progress": row.progress, "is_completed": row.is_completed}
+                for row in rows
+            }
+            cache.set(cache_key, progress, DAY_TTL)
+        return progress
+
+    def record_activity(self, user_id: int, activity_type: str, amount: int = 1) -> None:
+        """Append an activity to the stream; progress is applied on the next flush"""
+        day = datetime.now().date()
+        challenges = cache.get(CACHE_KEYS['DAILY_CHALLENGES'].format(day=day.isoformat()))
+        if challenges is not None and not any(c["challenge_type"] == activity_type for c in challenges):
+            return
+
+        self.activity_stream.append((user_id, activity_type, amount, day))
+
+        # Apply to a cached progress view right away so reads stay current
+        cache_key = CACHE_KEYS['USER_DAILY_CHALLENGES'].format(user_id=user_id, day=day.isoformat())
+        progress = cache.get(cache_key)
+        if progress is not None and challenges is not None:
+            for challenge in challenges:
+                if challenge["challenge_type"] == activity_type:
+                    entry = progress.setdefault(challenge["id"], {"progress": 0.0, "is_completed": False})
+                    entry["progress"] = min(100.0, entry["progress"] + amount * 100.0 / challenge["target_value"])
+                    entry["is_completed"] = entry["progress"] >= 100.0
+
+    def _take_stream(self) -> List[Tuple[int, str, int, date]]:
+        """Detach buffered activity (called on the event loop thread)"""
+        stream, self.activity_stream = self.activity_stream, []
+        return stream
+
+    def _apply_activity(self, stream: List[Tuple[int, str, int, date]],
+                        challenges_by_day: Dict[date, List[Dict[str, Any]]]) -> Tuple[int, Set[Tuple[int, date]], bool]:
+        """Fold buffered activity into UserDailyChallenge in one transaction
+
+        Returns (updates, (user_id, day) pairs written, success); runs off the
+        event loop, so challenges are resolved beforehand and cache and buffer
+        bookkeeping is left to _after_apply.
+        """
+        if not stream:
+            return 0, set(), True
+
+        # Aggregate deltas per (user, day, activity type) before touching the database
+        deltas = defaultdict(int)
+        for user_id, activity_type, amount, day in stream:
+            deltas[(user_id, day, activity_type)] += amount
+
+        db = SessionLocal()
+        try:
+            updates = 0
+            touched = set()
+            rewards = defaultdict(lambda: [0, 0, 0])  # user_id -> [xp, coins, gems] for newly completed challenges
+            for day in {day for _, day, _ in deltas}:
+                challenges = challenges_by_day[day]
+                by_type = defaultdict(list)
+                for challenge in challenges:
+                    by_type[challenge["challenge_type"]].append(challenge)
+
+                day_deltas = {
+                    (user_id, activity_type): amount
+                    for (user_id, delta_day, activity_type), amount in deltas.items()
+                    if delta_day == day and activity_type in by_type
+                }
+                if not day_deltas:
+                    continue
+
+                user_ids = {user_id for user_id, _ in day_deltas}
+                rows = db.query(UserDailyChallenge).filter(
+                    UserDailyChallenge.user_id.in_(user_ids),
+                    UserDailyChallenge.challenge_id.in_([c["id"] for c in challenges])
+                ).all()
+                row_index = {(row.user_id, row.challenge_id): row for row in rows}
+
+                now = datetime.now()
+                new_rows = []
+                for (user_id, activity_type), amount in day_deltas.items():
+                    touched.add((user_id, day))
+                    for challenge in by_type[activity_type]:
+                        step = amount * 100.0 / challenge["target_value"]
+                        row = row_index.get((user_id, challenge["id"]))
+                        if row:
+                            if row.is_completed:
+                                continue
+                            row.progress = min(100.0, (row.progress or 0.0) + step)
+                            if row.progress >= 100.0:
+                                row.is_completed = True
+                                row.completed_at = now
+                                self._add_rewards(rewards[user_id], challenge)
+                        else:
+                            progress = min(100.0, step)
+                            if progress >= 100.0:
+                                self._add_rewards(rewards[user_id], challenge)
+                            new_rows.append({
+                                "user_id": user_id,
+                                "challenge_id": challenge["id"],
+                                "progress": progress,
+                                "is_completed": progress >= 100.0,
+                                "completed_at": now if progress >= 100.0 else None
+                            })
+                        updates += 1
+
+                if new_rows:
+                    db.bulk_insert_mappings(UserDailyChallenge, new_rows)
+
+            # Completion rewards as SQL increments, in the same transaction as the completion
+            for user_id, (xp, coins, gems) in rewards.items():
+                db.query(User).filter(User.id == user_id).update({
+                    User.xp: User.xp + xp,
+                    User.coins: User.coins + coins,
+                    User.gems: User.gems + gems
+                }, synchronize_session=False)
+
+            db.commit()
+            return updates, touched, True
+        except Exception as e:
+            db.rollback()
+            ErrorHandler.log_error(e, "Applying daily challenge progress")
+            return 0, set(), False
+        finally:
+            db.close()
+
+    @staticmethod
+    def _add_rewards(totals: List[int], challenge: Dict[str, Any]) -> None:
+        """Add a completed challenge's rewards onto [xp, coins, gems]"""
+        totals[0] += challenge["xp_reward"] or 0
+        totals[1] += challenge["coin_reward"] or 0
+        totals[2] += challenge["gem_reward"] or 0
+
+    def _after_apply(self, stream: List[Tuple[int, str, int, date]],
+                     result: Tuple[int, Set[Tuple[int, date]], bool]) -> int:
+        """Event-loop side of a flush: drop stale progress views or requeue a failed batch"""
+        updates, touched, success = result
+        if not success:
+            self.activity_stream = stream + self.activity_stream
+            return 0
+        # Reads cached before the flush (possibly an empty view) must reload from the database
+        for user_id, day in touched:
+            cache.delete(CACHE_KEYS['USER_DAILY_CHALLENGES'].format(user_id=user_id, day=day.isoformat()))
+        return updates
+
+    def _materialize_job(self, day: date) -> Optional[List[Dict[str, Any]]]:
+        """Worker-thread job: load or create a day's challenges (None on failure)"""
+        db = SessionLocal()
+        try:
+            return self._load_or_create(db, day)
+        except Exception as e:
+            db.rollback()
+            ErrorHandler.log_error(e, "Materializing daily challenges")
+            return None
+        finally:
+            db.close()
+
+    @staticmethod
+    def _days(stream: List[Tuple[int, str, int, date]]) -> Set[date]:
+        """Days a batch of activity belongs to"""
+        return {day for _, _, _, day in stream}
+
+    def flush_sync(self) -> int:
+        """Apply buffered activity synchronously"""
+        stream = self._take_stream()
+        challenges_by_day = {}
+        for day in self._days(stream):
+            challenges = cache.get(CACHE_KEYS['DAILY_CHALLENGES'].format(day=day.isoformat()))
+            if challenges is None:
+                challenges = self._materialize_job(day)
+                if challenges is None:
+                    return self._after_apply(stream, (0, set(), False))
+                self._remember(day, challenges)
+            challenges_by_day[day] = challenges
+        return self._after_apply(stream, self._apply_activity(stream, challenges_by_day))
+
+    async def flush(self) -> int:
+        """Apply buffered activity without blocking the event loop
+
+        Challenges are resolved (and cached) on the loop, materializing
+        missing days in a worker thread, before the write is handed off.
+        """
+        stream = self._take_stream()
+        challenges_by_day = {}
+        for day in self._days(stream):
+            challenges = cache.get(CACHE_KEYS['DAILY_CHALLENGES'].format(day=day.isoformat()))
+            if challenges is None:
+                challenges = await asyncio.to_thread(self._materialize_job, day)
+                if challenges is None:
+                    return self._after_apply(stream, (0, set(), False))
+                self._remember(day, challenges)
+            challenges_by_day[day] = challenges
+        result = await asyncio.to_thread(self._apply_activity, stream, challenges_by_day)
+        return self._after_apply(stream, result)
+
+    async def start_scheduler(self) -> None:
+        """Start the daily materialization and progress flush task"""
+        if self.scheduler_task and not self.scheduler_task.done():
+            return
+
+        async def scheduler():
+            while True:
+                today = datetime.now().date()
+                if self.materialized_day != today:
+                    challenges = await asyncio.to_thread(self._materialize_job, today)
+                    if challenges is not None:
+                        self._remember(today, challenges)
+                await self.flush()
+                await asyncio.sleep(self.flush_interval)
+
+        self.scheduler_task = asyncio.create_task(scheduler())
+
+    async def stop_scheduler(self) -> None:
+        """Stop the scheduler and apply what is left"""
+        if self.scheduler_task:
+            self.scheduler_task.cancel()
+            self.scheduler_task = None
+        await self.flush()
+
+# Global daily challenge service
+daily_challenge_service = DailyChallengeService()
@@ -0,0 +1,137 @@
+"""
+Extractive summarisation for HANU-YOUTH platform
+Scores sentences against the document's TF-IDF centroid and picks a
+non-redundant top-k, as a cheap tier in front of any model summarisation
+"""
+
+from typing import Dict, List, Any, Iterator, Optional
+from itertools import islice
+import re
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+# Sentence ends at terminal punctuation followed by an uppercase/digit/quote start, or at a blank line
+SENTENCE_BOUNDARY_RE = re.compile(r"(?<=[.!?])[\"')\]]*\s+(?=[A-Z0-9\"'(\[])|\n\s*\n")
+WHITESPACE_RE = re.compile(r"\s+")
+
+# Tokens ending in a period that do not end a sentence
+ABBREVIATIONS = frozenset({
+    "e.g.", "i.e.", "al.", "etc.", "vs.", "fig.", "figs.", "eq.", "no.", "vol.", "pp.",
+    "dr.", "prof.", "mr.", "mrs.", "ms.", "st.", "jr.", "inc.", "ltd.", "u.s.", "u.n."
+})
+
+class ExtractiveSummarizer:
+    """TF-IDF centroid summariser with MMR redundancy control"""
+
+    def __init__(self, max_sentences: int = 5000, max_chars: int = 2_000_000,
+                 min_sentence_words: int = 5, max_sentence_words: int = 80,
+                 redundancy_penalty: float = 0.7):
+        self.max_sentences = max_sentences
+        self.max_chars = max_chars
+        self.min_sentence_words = min_sentence_words
+        self.max_sentence_words = max_sentence_words
+        self.redundancy_penalty = redundancy_penalty
+
+    def iter_sentences(self, text: str) -> Iterator[str]:
+        """Lazily split text into sentences (bounded by max_chars)"""
+        text = text[:self.max_chars]
+        start = 0
+        pending = ""
+        for match in SENTENCE_BOUNDARY_RE.finditer(text):
+            piece = text[start:match.start()]
+            start = match.end()
+            candidate = f"{pending} {piece}" if pending else piece
+            last_word = candidate.rsplit(None, 1)[-1].lower() if candidate.strip() else ""
+            if last_word in ABBREVIATIONS:
+                # "et al. Smith" is one sentence; keep accumulating
+                pending = candidate
+                continue
+            pending = ""
+            sentence = WHITESPACE_RE.sub(" ", candidate).strip()
+            if sentence:
+                yield sentence
+
+        tail = WHITESPACE_RE.sub(" ", f"{pending} {text[start:]}").strip()
+        if tail:
+            yield tail
+
+    def _candidates(self, text: str) -> List[str]:
+        """Sentences worth scoring, capped for long documents"""
+        sentences = []
+        for sentence in self.iter_sentences(text):
+            words = sentence.count(" ") + 1
+            if self.min_sentence_words <= words <= self.max_sentence_words:
+                sentences.append(sentence)
+                if len(sentences) >= self.max_sentences:
+                    break
+
+        if not sentences:
+            # Very short or oddly formatted input: score whatever sentences there are
+            sentences = list(islice(self.iter_sentences(text), self.max_sentences))
+        return sentences
+
+    def rank(self, sentences: List[str], k: int) -> List[int]:
+        """Indices of the k best sentences (best first)"""
+        if len(sentences) <= 1:
+            return list(range(len(sentences)))
+
+        vectorizer = TfidfVectorizer(stop_words="english", sublinear_tf=True, dtype=np.float32)
+        try:
+            matrix = vectorizer.fit_transform(sentences)
+        except ValueError:
+            # Every token was a stop word; fall back to document order
+            return list(range(min(k, len(sentences))))
+
+        # Centroid similarity; rows are L2-normalised so this is a single sparse mat-vec
+        centroid = np.asarray(matrix.mean(axis=0)).ravel()
+        scores = matrix @ centroid
+        # Mild lead bias: openings and abstracts tend to carry the thesis
+        scores *= 1.0 + 0.15 * (1.0 - np.arange(len(sentences), dtype=np.float32) / len(sentences))
+
+        pool = min(len(sentences), max(k * 4, k))
+        candidates = np.argpartition(-scores, pool - 1)[:pool]
+        candidates = candidates[np.argsort(-scores[candidates])]
+
+        # Maximal marginal relevance over the small candidate pool only
+        similarity = (matrix[candidates] @ matrix[candidates].T).toarray()
+        relevance = scores[candidates]
+        chosen: List[int] = []
+        max_overlap = np.zeros(len(candidates), dtype=np.float32)
+        available = np.ones(len(candidates), dtype=bool)
+        for _ in range(min(k, len(candidates))):
+            mmr = np.where(available, relevance - self.redundancy_penalty * max_overlap, -np.inf)
+            best = int(np.argmax(mmr))
+            chosen.append(best)
+            available[best] = False
+            max_overlap = np.maximum(max_overlap, similarity[best])
+
+        return [int(candidates[i]) for i in chosen]
+
+    def summarize(self, text: str, num_sentences: int = 5, max_words: Optional[int] = None,
+                  key_point_count: int = 3) -> Dict[str, Any]:
+        """Extractive summary, key points and counts for a document"""
+        sentences = self._candidates(text)
+        ranked = self.rank(sentences, max(num_sentences, key_point_count))
+
+        summary_ids = sorted(ranked[:num_sentences])
+        summary_sentences = []
+        words = 0
+        for i in summary_ids:
+            length = sentences[i].count(" ") + 1
+            if max_words and summary_sentences and words + length > max_words:
+                break
+            summary_sentences.append(sentences[i])
+            words += length
+
+        summary = " ".join(summary_sentences)
+        return {
+            "summary": summary,
+            "key_points": [sentences[i] for i in ranked[:key_point_count]],
+            "word_count": len(text.split()),
+            "summary_length": len(summary.split()),
+            "sentence_count": len(sentences),
+            "method": "extractive_tfidf"
+        }
+
+# Global extractive summarizer instance
+extractive_summarizer = ExtractiveSummarizer()
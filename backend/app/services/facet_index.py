@@ -0,0 +1,101 @@
+"""
+Bitmap facet indexes for HANU-YOUTH platform
+One packed bitset per facet value over dense document numbers, so filters are
+bitwise ANDs and facet counts are popcounts
+"""
+
+from typing import Dict, Iterable, Optional
+import numpy as np
+
+# Set bits per byte value (np.bitwise_count needs numpy 2)
+POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+def bitmap_count(bitmap: np.ndarray) -> int:
+    """Number of set bits"""
+    return int(POPCOUNT[bitmap].sum(dtype=np.int64))
+
+def bitmap_members(bitmap: np.ndarray) -> np.ndarray:
+    """Document numbers whose bits are set, ascending"""
+    return np.flatnonzero(np.unpackbits(bitmap, bitorder="little"))
+
+def bitmap_from(docs: Iterable[int], nbytes: int) -> np.ndarray:
+    """Bitmap with the given document numbers set"""
+    bits = np.zeros(nbytes * 8, dtype=bool)
+    bits[np.fromiter(docs, dtype=np.int64)] = True
+    return np.packbits(bits, bitorder="little")
+
+class FacetIndex:
+    """Packed bitsets per (field, value) plus a live-documents bitset"""
+
+    def __init__(self, fields: Iterable[str], capacity: int = 1024):
+        self.fields = list(fields)
+        self.nbytes = max(1, capacity // 8)
+        self.live = np.zeros(self.nbytes, dtype=np.uint8)
+        self.bitmaps: Dict[str, Dict[str, np.ndarray]] = {field: {} for field in self.fields}
+
+    def _ensure(self, doc: int) -> None:
+        """Grow every bitmap (doubling) so doc fits"""
+        if doc // 8 < self.nbytes:
+            return
+        nbytes = self.nbytes
+        while doc // 8 >= nbytes:
+            nbytes *= 2
+        pad = nbytes - self.nbytes
+        self.live = np.concatenate([self.live, np.zeros(pad, dtype=np.uint8)])
+        for values in self.bitmaps.values():
+            for value, bitmap in values.items():
+                values[value] = np.concatenate([bitmap, np.zeros(pad, dtype=np.uint8)])
+        self.nbytes = nbytes
+
+    def add(self, doc: int, facets: Dict[str, Iterable[str]]) -> None:
+        """Mark doc live and set its bit under each facet value"""
+        self._ensure(doc)
+        byte, bit = divmod(doc, 8)
+        self.live[byte] |= 1 << bit
+        for field, values in facets.items():
+            bitmaps = self.bitmaps[field]
+            for value in values:
+                bitmap = bitmaps.get(value)
+                if bitmap is None:
+                    bitmap = bitmaps[value] = np.zeros(self.nbytes, dtype=np.uint8)
+                bitmap[byte] |= 1 << bit
+
+    def remove(self, doc: int) -> None:
+        """Clear doc everywhere"""
+        if doc // 8 >= self.nbytes:
+            return
+        byte, bit = divmod(doc, 8)
+        keep = np.uint8(0xFF ^ (1 << bit))
+        self.live[byte] &= keep
+        for values in self.bitmaps.values():
+            for bitmap in values.values():
+                bitmap[byte] &= keep
+
+    def all(self) -> np.ndarray:
+        """Bitmap of every live document (a copy, safe to modify)"""
+        return self.live.copy()
+
+    def filter(self, filters: Dict[str, Iterable[str]]) -> np.ndarray:
+        """Live documents having every listed value of every listed field"""
+        mask = self.live.copy()
+        for field, values in filters.items():
+            for value in values:
+                bitmap = self.bitmaps[field].get(value)
+                if bitmap is None:
+                    return np.zeros(self.nbytes, dtype=np.uint8)
+                np.bitwise_and(mask, bitmap, out=mask)
+        return mask
+
+    def counts(self, mask: np.ndarray, fields: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, int]]:
+        """Per-value document counts within mask (values with no matches omitted)"""
+        counts: Dict[str, Dict[str, int]] = {}
+        scratch = np.empty(self.nbytes, dtype=np.uint8)
+        for field in fields or self.fields:
+            field_counts = {}
+            for value, bitmap in self.bitmaps[field].items():
+                count = bitmap_count(np.bitwise_and(bitmap, mask, out=scratch))
+                if count:
+                    field_counts[value] = count
+            counts[field] = dict(sorted(field_counts.items(), key=lambda item: (-item[1], item[0])))
+        return counts
+
@@ -3,9 +3,10 @@ Gamification Service for HANU-YOUTH platform
 Handles XP, levels, achievements, and rewards
 """
 
-from typing import Dict, List, Any, Optional
-from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional, Set
+from datetime import datetime, date, timedelta
 import random
+from app.services.achievement_engine import achievement_engine
 
 class GamificationService:
     """Service for managing gamification features"""
@@ -72,87 +73,24 @@ class GamificationService:
             "activity_type": activity_type
         }
     
-    def check_achievements(self, user_stats: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def check_achievements(self, user_stats: Dict[str, Any], unlocked_ids: Optional[Set[int]] = None) -> List[Dict[str, Any]]:
         """Check for new achievements based on user stats"""
-        achievements = []
-        
-        # XP-based achievements
-        if user_stats.get("total_xp", 0) >= 1000:
-            achievements.append({
-                "id": "xp_1000",
-                "name": "Knowledge Seeker",
-                "description": "Earn 1000 XP",
-                "icon": "📚",
-                "category": "learning",
-                "rarity": "common"
-            })
-        
-        if user_stats.get("total_xp", 0) >= 5000:
-            achievements.append({
-                "id": "xp_5000",
-                "name": "Knowledge Master",
-                "description": "Earn 5000 XP",
-                "icon": "🎓",
-                "category": "learning",
-                "rarity": "rare"
-            })
-        
-        # Streak-based achievements
-        if user_stats.get("daily_streak", 0) >= 7:
-            achievements.append({
-                "id": "streak_7",
-                "name": "Week Warrior",
-                "description": "Maintain a 7-day streak",
-                "icon": "🔥",
-                "category": "consistency",
-                "rarity": "rare"
-            })
-        
-        if user_stats.get("daily_streak", 0) >= 30:
-            achievements.append({
-                "id": "streak_30",
-                "name": "Monthly Champion",
-                "description": "Maintain a 30-day streak",
-                "icon": "🏆",
-                "category": "consistency",
-                "rarity": "epic"
-            })
-        
-        # Activity-based achievements
-        if user_stats.get("total_quizzes_taken", 0) >= 10:
-            achievements.append({
-                "id": "quiz_10",
-                "name": "Quiz Enthusiast",
-                "description": "Complete 10 quizzes",
-                "icon": "📝",
-                "category": "quiz",
-                "rarity": "common"
-            })
-        
-        if user_stats.get("total_searches", 0) >= 50:
-            achievements.append({
-                "id": "search_50",
-                "name": "Research Explorer",
-                "description": "Perform 50 searches",
-                "icon": "🔍",
-                "category": "research",
-                "rarity": "common"
-            })
-        
-        if user_stats.get("total_innovations", 0) >= 5:
-            achievements.append({
-                "id": "innovation_5",
-                "name": "Innovation Pioneer",
-                "description": "Create 5 innovations",
-                "icon": "💡",
-                "category": "innovation",
-                "rarity": "rare"
-            })
-        
-        return achievements
+        # Thresholds come from Achievement.criteria via the compiled rule engine
+        return [
+            {
+                "id": rule["achievement_id"],
+                "name": rule["name"],
+                "description": rule["description"],
+                "icon": rule["icon"],
+                "category": rule["category"],
+                "rarity": rule["rarity"]
+            }
+            for rule in achievement_engine.evaluate_stats(user_stats, unlocked_ids)
+        ]
     
-    def generate_daily_challenges(self) -> List[Dict[str, Any]]:
-        """Generate daily challenges"""
+    def generate_daily_challenges(self, day: Optional[date] = None) -> List[Dict[str, Any]]:
+        """Generate daily challenges (deterministic for a given day)"""
+        day = day or datetime.now().date()
         challenge_templates = [
             {
                 "type": "quiz",
@@ -196,12 +134,13 @@ class GamificationService:
             }
         ]
         
-        # Select 3 random challenges for today
-        daily_challenges = random.sample(challenge_templates, min(3, len(challenge_templates)))
+        # Seed by date so every caller gets the same challenges for a day
+        rng = random.Random(day.toordinal())
+        daily_challenges = rng.sample(challenge_templates, min(3, len(challenge_templates)))
         
         for challenge in daily_challenges:
-            challenge["id"] = f"daily_{datetime.now().strftime('%Y%m%d')}_{challenge['type']}"
-            challenge["challenge_date"] = datetime.now().date()
+            challenge["id"] = f"daily_{day.strftime('%Y%m%d')}_{challenge['type']}"
+            challenge["challenge_date"] = day
             challenge["is_active"] = True
         
         return daily_challenges
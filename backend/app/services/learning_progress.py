@@ -0,0 +1,312 @@
+"""
+Learning path progress engine for HANU-YOUTH platform
+Applies module completion events to path rollups incrementally and
+periodically reconciles rollups against module progress in bulk
+"""
+
+from typing import Dict, Any, Optional, Set, Tuple
+from datetime import datetime
+from collections import defaultdict
+import asyncio
+from sqlalchemy import func, and_, or_, case
+from sqlalchemy.orm import Session
+from app.core.database import SessionLocal, insert_or_ignore
+from app.core.cache import cache, CACHE_KEYS
+from app.core.error_handling import APIError, ErrorHandler
+from app.models import User, LearningPath, LearningModule, UserPathProgress, UserModuleProgress
+from app.services.achievement_engine import achievement_engine
+
+# Module structure changes rarely; reconcile() also refreshes it
+STRUCTURE_TTL = 3600
+
+class LearningProgressEngine:
+    """Incremental path rollups over module completion events"""
+
+    def __init__(self, reconcile_interval: int = 3600):
+        self.reconcile_interval = reconcile_interval
+        self.reconcile_task: Optional[asyncio.Task] = None
+
+    def load_structure(self, db: Session) -> Dict[str, Any]:
+        """Load module -> path mapping and per-path module totals (one query)"""
+        rows = db.query(
+            LearningModule.id, LearningModule.path_id, LearningModule.min_score_to_pass
+        ).all()
+
+        modules = {}
+        totals = {}
+        for row in rows:
+            modules[row.id] = {"path_id": row.path_id, "min_score_to_pass": row.min_score_to_pass}
+            totals[row.path_id] = totals.get(row.path_id, 0) + 1
+
+        structure = {"modules": modules, "totals": totals}
+        cache.set(CACHE_KEYS['LEARNING_STRUCTURE'], structure, STRUCTURE_TTL)
+        return structure
+
+    def get_structure(self, db: Session) -> Dict[str, Any]:
+        """Cached learning structure"""
+        structure = cache.get(CACHE_KEYS['LEARNING_STRUCTURE'])
+        if structure is None:
+            structure = self.load_structure(db)
+        return structure
+
+    def invalidate(self) -> None:
+        """Drop the cached structure (call after adding or removing modules)"""
+        cache.delete(CACHE_KEYS['LEARNING_STRUCTURE'])
+
+    def total_modules(self, db: Session, path_id: int) -> int:
+        """Cached module count for a path"""
+        return self.get_structure(db)["totals"].get(path_id, 0)
+
+    @staticmethod
+    def ensure_path_progress(db: Session, user_id: int, path_id: int, total: int, now: datetime) -> UserPathProgress:
+        """Get the user's row for a path, inserting it if missing (insert-or-ignore on (user_id, path_id))"""
+        insert_or_ignore(db, UserPathProgress, {
+            "user_id": user_id,
+            "path_id": path_id,
+            "progress_percentage": 0.0,
+            "modules_completed": 0,
+            "total_modules": total,
+            "is_started": True,
+            "is_completed": False,
+            "started_at": now,
+            "last_accessed": now
+        }, [UserPathProgress.user_id, UserPathProgress.path_id])
+        return db.query(UserPathProgress).filter(
+            UserPathProgress.user_id == user_id,
+            UserPathProgress.path_id == path_id
+        ).one()
+
+    @staticmethod
+    def _apply_rollup(db: Session, path_progress: UserPathProgress, total: int, completed_delta: int, now: datetime) -> bool:
+        """O(1) rollup update; returns True when the path just became complete"""
+        # Increment in SQL so concurrent completions on the same path both count;
+        # only rows still short of the total move, so completion fires once
+        reached = UserPathProgress.modules_completed + completed_delta >= total
+        completed = case((reached, total), else_=UserPathProgress.modules_completed + completed_delta)
+        updated = db.query(UserPathProgress).filter(
+            UserPathProgress.id == path_progress.id,
+            func.coalesce(UserPathProgress.modules_completed, 0) < total
+        ).update({
+            UserPathProgress.total_modules: total,
+            UserPathProgress.modules_completed: completed,
+            UserPathProgress.progress_percentage: completed * 100.0 / total,
+            UserPathProgress.is_started: True,
+            UserPathProgress.started_at: func.coalesce(UserPathProgress.started_at, now),
+            UserPathProgress.is_completed: case((reached, True), else_=UserPathProgress.is_completed),
+            UserPathProgress.completed_at: case((reached, now), else_=UserPathProgress.completed_at),
+            UserPathProgress.last_accessed: now
+        }, synchronize_session=False)
+        db.refresh(path_progress)
+        return bool(updated) and path_progress.modules_completed >= total
+
+    @staticmethod
+    def _complete_module(db: Session, module_progress: UserModuleProgress, now: datetime) -> bool:
+        """Flip a module to completed with a conditional UPDATE; True only for the request that flipped it"""
+        if module_progress.id is None:
+            db.flush()
+        updated = db.query(UserModuleProgress).filter(
+            UserModuleProgress.id == module_progress.id,
+            or_(UserModuleProgress.is_completed == False, UserModuleProgress.is_completed.is_(None))
+        ).update({
+            UserModuleProgress.is_completed: True,
+            UserModuleProgress.completed_at: now
+        }, synchronize_session=False)
+        if updated:
+            module_progress.is_completed = True
+            module_progress.completed_at = now
+        return bool(updated)
+
+    def record_module_progress(self, db: Session, user: User, module_id: int, progress_percentage: float,
+                               score: Optional[float] = None, time_spent_minutes: int = 0) -> Dict[str, Any]:
+        """Apply a module progress event and roll completion up to the path (caller commits)"""
+        structure = self.get_structure(db)
+        module = structure["modules"].get(module_id)
+        if module is None:
+            raise APIError("Learning module not found", "MODULE_NOT_FOUND", status_code=404)
+
+        now = datetime.now()
+        module_progress = db.query(UserModuleProgress).filter(
+            UserModuleProgress.user_id == user.id,
+            UserModuleProgress.module_id == module_id
+        ).first()
+        if not module_progress:
+            module_progress = UserModuleProgress(
+                user_id=user.id,
+                module_id=module_id,
+                progress_percentage=0.0,
+                time_spent_minutes=0,
+                best_score=0.0,
+                is_started=True,
+                is_completed=False,
+                started_at=now
+            )
+            db.add(module_progress)
+
+        module_progress.progress_percentage = max(module_progress.progress_percentage or 0.0, min(100.0, progress_percentage))
+        module_progress.time_spent_minutes = (module_progress.time_spent_minutes or 0) + time_spent_minutes
+        module_progress.last_accessed = now
+        if score is not None:
+            module_progress.best_score = max(module_progress.best_score or 0.0, score)
+
+        passed = score is None or (module_progress.best_score or 0.0) >= (module["min_score_to_pass"] or 0.0)
+        # Concurrent requests may both see the module unfinished; only the one
+        # whose conditional UPDATE flips it rolls completion up to the path
+        just_completed = (
+            not module_progress.is_completed
+            and module_progress.progress_percentage >= 100.0
+            and passed
+            and self._complete_module(db, module_progress, now)
+        )
+
+        path_completed = False
+        path_progress = None
+        if just_completed:
+            total = structure["totals"].get(module["path_id"], 0)
+            path_progress = self.ensure_path_progress(db, user.id, module["path_id"], total, now)
+            path_completed = self._apply_rollup(db, path_progress, total, 1, now)
+
+        return {
+            "module_id": module_id,
+            "path_id": module["path_id"],
+            "progress_percentage": module_progress.progress_percentage,
+            "best_score": module_progress.best_score,
+            "is_completed": module_progress.is_completed,
+            "module_just_completed": just_completed,
+            "path_progress_percentage": path_progress.progress_percentage if path_progress else None,
+            "path_completed": path_completed
+        }
+
+    def reconcile(self, db: Session) -> Tuple[int, Set[int]]:
+        """Recompute every path rollup and completion flag from module progress
+
+        Paths that reconciliation completes get the same xp/coin rewards as a
+        live completion; each row is flipped with a conditional UPDATE so a
+        path is rewarded once whichever side completes it. Returns (rows
+        updated, ids of rewarded users) so the caller can run achievements.
+        """
+        self.load_structure(db)
+
+        completed = db.query(func.count(UserModuleProgress.id)).join(
+            LearningModule, LearningModule.id == UserModuleProgress.module_id
+        ).filter(
+            and_(
+                UserModuleProgress.user_id == UserPathProgress.user_id,
+                LearningModule.path_id == UserPathProgress.path_id,
+                UserModuleProgress.is_completed == True
+            )
+        ).correlate(UserPathProgress).scalar_subquery()
+
+        total = db.query(func.count(LearningModule.id)).filter(
+            LearningModule.path_id == UserPathProgress.path_id
+        ).correlate(UserPathProgress).scalar_subquery()
+
+        finished = and_(total > 0, completed >= total)
+        now = datetime.now()
+
+        # Completions the live path missed (e.g. a crash between module and path writes)
+        newly_finished = db.query(UserPathProgress.id, UserPathProgress.user_id, UserPathProgress.path_id).filter(
+            finished,
+            or_(UserPathProgress.is_completed == False, UserPathProgress.is_completed.is_(None))
+        ).all()
+        rewards = self._path_rewards(db, {row.path_id for row in newly_finished})
+        rewarded = defaultdict(lambda: [0, 0])  # user_id -> [xp, coins]
+        for row in newly_finished:
+            flipped = db.query(UserPathProgress).filter(
+                UserPathProgress.id == row.id,
+                or_(UserPathProgress.is_completed == False, UserPathProgress.is_completed.is_(None))
+            ).update({
+                UserPathProgress.is_completed: True,
+                UserPathProgress.completed_at: now
+            }, synchronize_session=False)
+            if flipped:
+                xp, coins = rewards.get(row.path_id, (0, 0))
+                rewarded[row.user_id][0] += xp
+                rewarded[row.user_id][1] += coins
+
+        for user_id, (xp, coins) in rewarded.items():
+            db.query(User).filter(User.id == user_id).update({
+                User.xp: User.xp + xp,
+                User.coins: User.coins + coins
+            }, synchronize_session=False)
+
+        updated = db.query(UserPathProgress).update({
+            UserPathProgress.modules_completed: completed,
+            UserPathProgress.total_modules: total,
+            UserPathProgress.progress_percentage: case(
+                (total > 0, completed * 100.0 / total),
+                else_=0.0
+            ),
+            UserPathProgress.is_completed: finished,
+            UserPathProgress.completed_at: case(
+                (finished, func.coalesce(UserPathProgress.completed_at, now)),
+                else_=None
+            )
+        }, synchronize_session=False)
+
+        db.commit()
+        return updated, set(rewarded)
+
+    @staticmethod
+    def _path_rewards(db: Session, path_ids: Set[int]) -> Dict[int, Tuple[int, int]]:
+        """(xp, coins) reward per learning path"""
+        if not path_ids:
+            return {}
+        rows = db.query(LearningPath.id, LearningPath.xp_reward, LearningPath.coin_reward).filter(
+            LearningPath.id.in_(path_ids)
+        ).all()
+        return {row.id: (row.xp_reward or 0, row.coin_reward or 0) for row in rows}
+
+    @staticmethod
+    def award_achievements(db: Session, user_ids: Set[int]) -> None:
+        """Run the xp achievements a live path completion would trigger"""
+        if not user_ids:
+            return
+        for user in db.query(User).filter(User.id.in_(user_ids)).all():
+            achievement_engine.process_events(db, user, ["xp_gained"])
+        db.commit()
+
+    def _reconcile_job(self) -> Set[int]:
+        """Background reconciliation in its own session; returns rewarded user ids"""
+        db = SessionLocal()
+        try:
+            return self.reconcile(db)[1]
+        except Exception as e:
+            db.rollback()
+            ErrorHandler.log_error(e, "Reconciling learning path progress")
+            return set()
+        finally:
+            db.close()
+
+    def _award_job(self, user_ids: Set[int]) -> None:
+        """Award achievements for reconciled completions in its own session"""
+        db = SessionLocal()
+        try:
+            self.award_achievements(db, user_ids)
+        except Exception as e:
+            db.rollback()
+            ErrorHandler.log_error(e, "Awarding reconciled path achievements")
+        finally:
+            db.close()
+
+    async def start_reconcile_task(self) -> None:
+        """Start periodic drift repair"""
+        if self.reconcile_task and not self.reconcile_task.done():
+            return
+
+        async def reconcile_loop():
+            while True:
+                await asyncio.sleep(self.reconcile_interval)
+                rewarded = await asyncio.to_thread(self._reconcile_job)
+                # Achievements touch the shared cache, so they run on the loop
+                self._award_job(rewarded)
+
+        self.reconcile_task = asyncio.create_task(reconcile_loop())
+
+    async def stop_reconcile_task(self) -> None:
+        """Stop the reconciliation task"""
+        if self.reconcile_task:
+            self.reconcile_task.cancel()
+            self.reconcile_task = None
+
+# Global learning progress engine
+learning_progress = LearningProgressEngine()
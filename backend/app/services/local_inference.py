@@ -0,0 +1,152 @@
+"""
+Local CPU inference for HANU-YOUTH platform
+Runs small summarisation and translation models in a dedicated process pool;
+each worker loads its models once and tokenises whole batches at a time
+"""
+
+from typing import Dict, List, Any, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+import asyncio
+import importlib.util
+import logging
+import time
+from app.core.config import settings
+from app.core.error_handling import APIError
+
+logger = logging.getLogger(__name__)
+
+# Per-process model registry, filled by the pool initializer
+_WORKER_MODELS: Dict[str, Tuple[Any, Any]] = {}
+_WORKER_SETTINGS: Dict[str, Any] = {}
+
+def _init_worker(summarization_model: str, translation_model: str, threads: int) -> None:
+    """Pool initializer: pin CPU threads and load the summarisation model once"""
+    import torch
+
+    torch.set_num_threads(threads)
+    _WORKER_SETTINGS["translation_model"] = translation_model
+    _load_model(summarization_model)
+
+def _load_model(name: str) -> Tuple[Any, Any]:
+    """Load (tokenizer, model) once per worker process"""
+    if name not in _WORKER_MODELS:
+        from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+
+        tokenizer = AutoTokenizer.from_pretrained(name)
+        model = AutoModelForSeq2SeqLM.from_pretrained(name)
+        model.eval()
+        _WORKER_MODELS[name] = (tokenizer, model)
+    return _WORKER_MODELS[name]
+
+def _generate(name: str, texts: List[str], max_new_tokens: int, **generate_kwargs) -> List[str]:
+    """Tokenise a batch in one call and decode the generated outputs"""
+    import torch
+
+    tokenizer, model = _load_model(name)
+    inputs = tokenizer(texts, padding=True, truncation=True, return_tensors="pt")
+    with torch.inference_mode():
+        outputs = model.generate(**inputs, max_new_tokens=max_new_tokens, **generate_kwargs)
+    return tokenizer.batch_decode(outputs, skip_special_tokens=True)
+
+def _summarize_worker(name: str, texts: List[str], max_new_tokens: int) -> List[str]:
+    """Worker entry point for summarisation"""
+    return _generate(name, texts, max_new_tokens, num_beams=2, early_stopping=True)
+
+def _translate_worker(texts: List[str], source_language: str, target_language: str) -> List[str]:
+    """Worker entry point for translation"""
+    name = _WORKER_SETTINGS["translation_model"].format(source=source_language, target=target_language)
+    return _generate(name, texts, 512)
+
+def _warmup_worker(name: str) -> float:
+    """Run one tiny inference so the first real request is warm; returns its duration"""
+    start = time.perf_counter()
+    _generate(name, ["Warm up the model."], 8)
+    return time.perf_counter() - start
+
+class LocalInferenceBackend:
+    """Process-pool model runner with a bounded request queue"""
+
+    def __init__(self, workers: int = settings.LOCAL_INFERENCE_WORKERS,
+                 threads_per_worker: int = settings.LOCAL_INFERENCE_THREADS,
+                 max_pending: int = settings.LOCAL_INFERENCE_MAX_PENDING,
+                 summarization_model: str = settings.LOCAL_SUMMARIZATION_MODEL,
+                 translation_model: str = settings.LOCAL_TRANSLATION_MODEL):
+        self.workers = workers
+        self.threads_per_worker = threads_per_worker
+        self.max_pending = max_pending
+        self.summarization_model = summarization_model
+        self.translation_model = translation_model
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.pending = 0
+        self.stats: Dict[str, Any] = {"warm_start_seconds": None, "worker_warmup_seconds": [], "rejected": 0}
+
+    @staticmethod
+    def available() -> bool:
+        """Whether torch and transformers are installed"""
+        return all(importlib.util.find_spec(module) is not None for module in ("torch", "transformers"))
+
+    @property
+    def ready(self) -> bool:
+        """Whether the pool is running"""
+        return self.executor is not None
+
+    async def start(self) -> None:
+        """Spawn the workers, load models and record warm-start latency; stays disabled if warmup fails"""
+        if self.executor is not None:
+            return
+        if not self.available():
+            logger.warning("torch/transformers not installed; local inference disabled")
+            return
+
+        start = time.perf_counter()
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(self.summarization_model, self.translation_model, self.threads_per_worker)
+        )
+        loop = asyncio.get_running_loop()
+        try:
+            # One warmup per worker forces every process to spawn and load its model
+            durations = await asyncio.gather(*(
+                loop.run_in_executor(self.executor, _warmup_worker, self.summarization_model)
+                for _ in range(self.workers)
+            ))
+        except Exception as e:
+            # A model that fails to load leaves the backend disabled rather than aborting startup
+            logger.error(f"Local inference warmup failed; local inference disabled: {e!r}")
+            await self.shutdown()
+            return
+        self.stats["worker_warmup_seconds"] = list(durations)
+        self.stats["warm_start_seconds"] = time.perf_counter() - start
+        logger.info(f"Local inference ready: {self.workers} workers in {self.stats['warm_start_seconds']:.2f}s")
+
+    async def shutdown(self) -> None:
+        """Stop the worker processes"""
+        if self.executor is not None:
+            executor, self.executor = self.executor, None
+            await asyncio.to_thread(executor.shutdown, True, cancel_futures=True)
+
+    async def _run(self, func, *args) -> List[str]:
+        """Run a worker function, rejecting work once the queue is full"""
+        if self.executor is None:
+            raise APIError("Local inference is not running", "LOCAL_INFERENCE_UNAVAILABLE", status_code=503)
+        if self.pending >= self.max_pending:
+            self.stats["rejected"] += 1
+            raise APIError("Local inference queue is full", "LOCAL_INFERENCE_BUSY", status_code=503)
+
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+        finally:
+            self.pending -= 1
+
+    async def summarize(self, texts: List[str], max_new_tokens: int = 128) -> List[str]:
+        """Summarise a batch of texts"""
+        return await self._run(_summarize_worker, self.summarization_model, texts, max_new_tokens)
+
+    async def translate(self, texts: List[str], source_language: str, target_language: str) -> List[str]:
+        """Translate a batch of texts between one language pair"""
+        return await self._run(_translate_worker, texts, source_language, target_language)
+
+# Global local inference backend
+local_inference = LocalInferenceBackend()
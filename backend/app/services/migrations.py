@@ -0,0 +1,122 @@
+"""
+Schema upgrades for HANU-YOUTH platform
+Adds columns introduced after create_tables() was first run and backfills them
+"""
+
+from typing import List
+from sqlalchemy import inspect, text, func, and_
+from sqlalchemy.orm import Session
+from app.core.database import SessionLocal, engine
+from app.models import QuizAttempt, UserAnswer
+from app.services.learning_progress import learning_progress
+
+def add_daily_challenge_key() -> bool:
+    """Add challenge_key to daily_challenges if missing"""
+    existing = {column["name"] for column in inspect(engine).get_columns("daily_challenges")}
+    if "challenge_key" in existing:
+        return False
+
+    with engine.begin() as connection:
+        connection.execute(text("ALTER TABLE daily_challenges ADD COLUMN challenge_key VARCHAR"))
+    return True
+
+def add_quiz_attempt_counters() -> List[str]:
+    """Add correct_count/answered_count to quiz_attempts if missing"""
+    existing = {column["name"] for column in inspect(engine).get_columns("quiz_attempts")}
+    added = []
+
+    with engine.begin() as connection:
+        for column in ("correct_count", "answered_count"):
+            if column not in existing:
+                connection.execute(text(f"ALTER TABLE quiz_attempts ADD COLUMN {column} INTEGER DEFAULT 0"))
+                added.append(column)
+
+    return added
+
+# (index name, table, columns) for unique constraints added after create_tables()
+UNIQUE_INDEXES = [
+    ("uq_user_power_ups_user_power_up", "user_power_ups", ("user_id", "power_up_id")),
+    ("uq_daily_challenges_date_key", "daily_challenges", ("challenge_date", "challenge_key")),
+    ("uq_user_path_progress_user_path", "user_path_progress", ("user_id", "path_id")),
+    ("uq_user_achievements_user_achievement", "user_achievements", ("user_id", "achievement_id")),
+]
+
+def add_unique_indexes() -> List[str]:
+    """Drop duplicate rows (keeping the newest) and add missing unique indexes"""
+    inspector = inspect(engine)
+    added = []
+
+    with engine.begin() as connection:
+        for name, table, columns in UNIQUE_INDEXES:
+            existing = {index["name"] for index in inspector.get_indexes(table)}
+            existing |= {constraint["name"] for constraint in inspector.get_unique_constraints(table)}
+            if name in existing:
+                continue
+
+            # Unique indexes ignore NULLs, so rows with a NULL column are never duplicates
+            column_list = ", ".join(columns)
+            not_null = " AND ".join(f"{column} IS NOT NULL" for column in columns)
+            connection.execute(text(
+                f"DELETE FROM {table} WHERE {not_null} AND id NOT IN "
+                f"(SELECT MAX(id) FROM {table} WHERE {not_null} GROUP BY {column_list})"
+            ))
+            connection.execute(text(f"CREATE UNIQUE INDEX {name} ON {table} ({column_list})"))
+            added.append(name)
+
+    return added
+
+def backfill_quiz_attempt_counters(db: Session) -> int:
+    """Recompute attempt counters from UserAnswer in one UPDATE"""
+    answered = db.query(func.count(UserAnswer.id)).filter(
+        UserAnswer.attempt_id == QuizAttempt.id
+    ).correlate(QuizAttempt).scalar_subquery()
+
+    correct = db.query(func.count(UserAnswer.id)).filter(
+        and_(UserAnswer.attempt_id == QuizAttempt.id, UserAnswer.is_correct == True)
+    ).correlate(QuizAttempt).scalar_subquery()
+
+    updated = db.query(QuizAttempt).update({
+        QuizAttempt.answered_count: answered,
+        QuizAttempt.correct_count: correct
+    }, synchronize_session=False)
+
+    db.commit()
+    return updated
+
+def main():
+    """Main function to run all upgrades"""
+    db = SessionLocal()
+
+    try:
+        print("🔧 Upgrading database...")
+
+        print("  Adding quiz attempt counters...")
+        added = add_quiz_attempt_counters()
+        print(f"    Added columns: {', '.join(added) if added else 'none'}")
+
+        print("  Adding daily challenge keys...")
+        print(f"    Added challenge_key: {'yes' if add_daily_challenge_key() else 'no'}")
+
+        print("  Adding unique indexes...")
+        added = add_unique_indexes()
+        print(f"    Added indexes: {', '.join(added) if added else 'none'}")
+
+        print("  Backfilling quiz attempt counters...")
+        updated = backfill_quiz_attempt_counters(db)
+        print(f"    Updated {updated} attempts")
+
+        print("  Reconciling learning path progress...")
+        updated, rewarded = learning_progress.reconcile(db)
+        learning_progress.award_achievements(db, rewarded)
+        print(f"    Updated {updated} path progress rows, rewarded {len(rewarded)} users")
+
+        print("✅ Database upgraded successfully!")
+
+    except Exception as e:
+        print(f"❌ Error upgrading database: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Power-up daily quota tracking for HANU-YOUTH platform
+Enforces the daily limit with a conditional UPDATE on UserPowerUp and keeps
+per-day usage in cache-backed counters so exhausted power-ups are rejected
+without a query
+"""
+
+from typing import List, Optional
+from datetime import datetime, date, timedelta
+from sqlalchemy import case, or_, update
+from sqlalchemy.orm import Session
+from app.core.database import insert_or_ignore
+from app.core.cache import cache, CACHE_KEYS
+from app.models import UserPowerUp
+
+class PowerUpQuotaStore:
+    """Database-enforced per-(user, power-up, day) usage with cached counters"""
+
+    @staticmethod
+    def _seconds_until_midnight(now: datetime) -> int:
+        """TTL that expires a counter when the day rolls over"""
+        midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+        return max(1, int((midnight - now).total_seconds()) + 1)
+
+    @staticmethod
+    def _key(user_id: int, power_up_id: int, day: date) -> str:
+        """Counter key for one user's power-up on one day"""
+        return CACHE_KEYS['POWER_UP_USES'].format(
+            user_id=user_id, power_up_id=power_up_id, day=day.isoformat()
+        )
+
+    def load_counters(self, db: Session, user_id: int, power_up_ids: List[int]) -> None:
+        """Seed today's counters for power-ups the cache has not seen yet (one query)"""
+        now = datetime.now()
+        today = now.date()
+        missing = [
+            power_up_id for power_up_id in power_up_ids
+            if cache.get(self._key(user_id, power_up_id, today)) is None
+        ]
+        if not missing:
+            return
+
+        rows = db.query(UserPowerUp).filter(
+            UserPowerUp.user_id == user_id,
+            UserPowerUp.power_up_id.in_(missing)
+        ).all()
+        uses_by_power_up = {
+            row.power_up_id: row.uses_today or 0
+            for row in rows
+            if row.last_used and row.last_used.date() == today
+        }
+
+        ttl = self._seconds_until_midnight(now)
+        for power_up_id in missing:
+            cache.set(self._key(user_id, power_up_id, today), uses_by_power_up.get(power_up_id, 0), ttl)
+
+    def _ensure_counter(self, db: Session, user_id: int, power_up_id: int, now: datetime) -> str:
+        """Load a counter from the database on a cache miss"""
+        self.load_counters(db, user_id, [power_up_id])
+        return self._key(user_id, power_up_id, now.date())
+
+    def peek_uses(self, user_id: int, power_up_id: int) -> int:
+        """Get today's usage count from the cache only (0 if not primed)"""
+        return cache.get(self._key(user_id, power_up_id, datetime.now().date())) or 0
+
+    def _consume_row(self, db: Session, user_id: int, power_up_id: int, max_uses: int,
+                     now: datetime) -> Optional[int]:
+        """Count one use in UserPowerUp with a conditional UPDATE, or None at the limit
+
+        The limit check and the increment are one statement, so concurrent
+        requests in any process cannot pass max_uses between them.
+        """
+        day_start = datetime.combine(now.date(), datetime.min.time())
+        new_day = or_(UserPowerUp.last_used.is_(None), UserPowerUp.last_used < day_start)
+        statement = (
+            update(UserPowerUp)
+            .where(
+                UserPowerUp.user_id == user_id,
+                UserPowerUp.power_up_id == power_up_id,
+                or_(new_day, UserPowerUp.uses_today < max_uses)
+            )
+            .values(
+                uses_today=case((new_day, 1), else_=UserPowerUp.uses_today + 1),
+                last_used=now
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+        if db.execute(statement).rowcount == 0:
+            exists = db.query(UserPowerUp.id).filter(
+                UserPowerUp.user_id == user_id,
+                UserPowerUp.power_up_id == power_up_id
+            ).first()
+            if exists:
+                return None
+            insert_or_ignore(db, UserPowerUp, {
+                "user_id": user_id, "power_up_id": power_up_id, "uses_today": 0, "last_used": None
+            }, [UserPowerUp.user_id, UserPowerUp.power_up_id])
+            if db.execute(statement).rowcount == 0:
+                return None
+
+        return db.query(UserPowerUp.uses_today).filter(
+            UserPowerUp.user_id == user_id,
+            UserPowerUp.power_up_id == power_up_id
+        ).scalar()
+
+    def try_consume(self, db: Session, user_id: int, power_up_id: int, max_uses: int) -> Optional[int]:
+        """Record one use, returning the new count or None at the limit
+
+        The cache counter rejects exhausted power-ups without touching the
+        database; otherwise the use is counted in UserPowerUp in the caller's
+        transaction, which must commit it (or roll back and release()).
+        """
+        now = datetime.now()
+        key = self._ensure_counter(db, user_id, power_up_id, now)
+        ttl = self._seconds_until_midnight(now)
+        if cache.incr(key, 1, ttl=ttl, limit=max_uses) is None:
+            return None
+
+        try:
+            uses = self._consume_row(db, user_id, power_up_id, max_uses, now)
+        except Exception:
+            cache.incr(key, -1, ttl=ttl)
+            raise
+        # Re-align the counter with the database, which also sees other processes
+        cache.set(key, max_uses if uses is None else uses, ttl)
+        return uses
+
+    def release(self, user_id: int, power_up_id: int) -> None:
+        """Give back a use whose transaction was rolled back"""
+        now = datetime.now()
+        key = self._key(user_id, power_up_id, now.date())
+        if not cache.get(key):
+            # Counter expired or already at zero (e.g. the day rolled over): nothing to give back
+            return
+        cache.incr(key, -1, ttl=self._seconds_until_midnight(now))
+
+# Global power-up quota store
+power_up_quota = PowerUpQuotaStore()
@@ -0,0 +1,327 @@
+"""
+Per-question answer analytics for HANU-YOUTH platform
+Folds answer events into running totals and a fixed-bucket time histogram,
+flushes them to QuestionStats in batches and recalibrates question difficulty
+"""
+
+from typing import Dict, List, Any, Optional, Tuple
+from datetime import datetime
+from bisect import bisect_right
+from collections import defaultdict, OrderedDict
+import asyncio
+import time
+from sqlalchemy import update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from app.core.database import SessionLocal
+from app.core.cache import cache, CACHE_TAGS
+from app.core.error_handling import ErrorHandler
+from app.models import Question, QuestionStats
+
+# Upper bounds (seconds) of the time_spent histogram buckets; the last bucket is open-ended
+TIME_BUCKETS = [1, 2, 3, 5, 8, 13, 20, 30, 45, 60, 90, 120, 180, 300, 600]
+
+# Persisted totals kept per process for get_stats (least recently used dropped first)
+MAX_CACHED_TOTALS = 10_000
+
+# Correct-rate bands used to recalibrate difficulty
+DIFFICULTY_BANDS = [(0.8, "easy"), (0.5, "medium"), (0.0, "hard")]
+
+def _empty() -> Dict[str, Any]:
+    """Zeroed totals for one question"""
+    return {
+        "attempts": 0,
+        "correct": 0,
+        "time_spent_total": 0,
+        "time_histogram": [0] * (len(TIME_BUCKETS) + 1)
+    }
+
+class QuestionAnalytics:
+    """Streaming per-question attempts, correct rate and answer-time distribution"""
+
+    def __init__(self, flush_interval: int = 30, recalibrate_interval: int = 6 * 3600,
+                 min_attempts: int = 30, max_cached_totals: int = MAX_CACHED_TOTALS):
+        self.flush_interval = flush_interval
+        self.recalibrate_interval = recalibrate_interval
+        self.min_attempts = min_attempts
+        self.max_cached_totals = max_cached_totals
+        # question_id -> (read at, persisted totals); re-read after flush_interval since
+        # other workers write the same rows
+        self.totals: "OrderedDict[int, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self.pending: Dict[int, Dict[str, Any]] = defaultdict(_empty)  # question_id -> unflushed deltas
+        self.recalibrated_at = time.time()
+        self.flush_task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _bucket(time_spent: int) -> int:
+        """Histogram bucket index for an answer time"""
+        return bisect_right(TIME_BUCKETS, max(0, time_spent) - 1)
+
+    @staticmethod
+    def _merge(into: Dict[str, Any], delta: Dict[str, Any]) -> Dict[str, Any]:
+        """Add one set of totals onto another"""
+        into["attempts"] += delta["attempts"]
+        into["correct"] += delta["correct"]
+        into["time_spent_total"] += delta["time_spent_total"]
+        histogram = into["time_histogram"]
+        for i, count in enumerate(delta["time_histogram"]):
+            histogram[i] += count
+        return into
+
+    def record(self, question_id: int, is_correct: bool, time_spent: int) -> None:
+        """Fold one answer event into the pending deltas (O(1))"""
+        delta = self.pending[question_id]
+        delta["attempts"] += 1
+        delta["correct"] += 1 if is_correct else 0
+        delta["time_spent_total"] += max(0, time_spent)
+        delta["time_histogram"][self._bucket(time_spent)] += 1
+
+    @staticmethod
+    def _row_totals(row: Optional[QuestionStats]) -> Dict[str, Any]:
+        """Totals held by a QuestionStats row"""
+        totals = _empty()
+        if row is not None:
+            totals["attempts"] = row.attempts or 0
+            totals["correct"] = row.correct or 0
+            totals["time_spent_total"] = row.time_spent_total or 0
+            for i, count in enumerate((row.time_histogram or [])[:len(totals["time_histogram"])]):
+                totals["time_histogram"][i] = count
+        return totals
+
+    @staticmethod
+    def percentile(histogram: List[int], fraction: float) -> float:
+        """Approximate answer-time percentile by interpolating inside a bucket"""
+        count = sum(histogram)
+        if count == 0:
+            return 0.0
+
+        rank = fraction * count
+        seen = 0
+        for i, bucket_count in enumerate(histogram):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = TIME_BUCKETS[i - 1] if i > 0 else 0
+                upper = TIME_BUCKETS[i] if i < len(TIME_BUCKETS) else TIME_BUCKETS[-1] * 2
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return float(TIME_BUCKETS[-1])
+
+    @staticmethod
+    def difficulty_for(correct_rate: float) -> str:
+        """Difficulty label for an observed correct rate"""
+        for threshold, difficulty in DIFFICULTY_BANDS:
+            if correct_rate >= threshold:
+                return difficulty
+        return DIFFICULTY_BANDS[-1][1]
+
+    def _remember(self, question_id: int, totals: Dict[str, Any]) -> None:
+        """Cache persisted totals, evicting the least recently used beyond the cap"""
+        self.totals[question_id] = (time.time(), totals)
+        self.totals.move_to_end(question_id)
+        while len(self.totals) > self.max_cached_totals:
+            self.totals.popitem(last=False)
+
+    def get_stats(self, db: Session, question_id: int) -> Dict[str, Any]:
+        """Current statistics for a question (persisted totals plus pending deltas)"""
+        entry = self.totals.get(question_id)
+        if entry is None or time.time() - entry[0] >= self.flush_interval:
+            row = db.query(QuestionStats).filter(QuestionStats.question_id == question_id).first()
+            totals = self._row_totals(row)
+            self._remember(question_id, totals)
+        else:
+            totals = entry[1]
+            self.totals.move_to_end(question_id)
+
+        stats = self._merge(self._merge(_empty(), totals), self.pending.get(question_id) or _empty())
+        attempts = stats["attempts"]
+        correct_rate = stats["correct"] / attempts if attempts else 0.0
+
+        return {
+            "question_id": question_id,
+            "attempts": attempts,
+            "correct": stats["correct"],
+            "correct_rate": correct_rate,
+            "time_spent_mean": stats["time_spent_total"] / attempts if attempts else 0.0,
+            "time_spent_p50": self.percentile(stats["time_histogram"], 0.5),
+            "time_spent_p90": self.percentile(stats["time_histogram"], 0.9),
+            "suggested_difficulty": self.difficulty_for(correct_rate) if attempts >= self.min_attempts else None
+        }
+
+    def _take_pending(self) -> Dict[int, Dict[str, Any]]:
+        """Detach pending deltas (called on the event loop thread)"""
+        pending, self.pending = self.pending, defaultdict(_empty)
+        return dict(pending)
+
+    def _write(self, pending: Dict[int, Dict[str, Any]]) -> Tuple[Dict[int, Dict[str, Any]], Dict[int, Dict[str, Any]]]:
+        """Add detached deltas onto QuestionStats in one transaction
+
+        Returns (totals written, deltas to retry); may run in a worker thread,
+        so self.pending and self.totals are updated by _after_write instead.
+        """
+        if not pending:
+            return {}, {}
+
+        db = SessionLocal()
+        try:
+            # Counters as SQL increments; this also locks the rows until commit
+            self._upsert(db, pending, datetime.now())
+
+            # The histogram is JSON, so merge it under that row lock
+            written = {}
+            rows = db.query(QuestionStats).filter(
+                QuestionStats.question_id.in_(list(pending))
+            ).with_for_update().all()
+            for row in rows:
+                totals = self._row_totals(row)
+                histogram = totals["time_histogram"]
+                for i, count in enumerate(pending[row.question_id]["time_histogram"]):
+                    histogram[i] += count
+                row.time_histogram = histogram
+                written[row.question_id] = totals
+
+            db.commit()
+            return written, {}
+        except Exception as e:
+            db.rollback()
+            ErrorHandler.log_error(e, "Flushing question analytics")
+            return {}, pending
+        finally:
+            db.close()
+
+    @staticmethod
+    def _upsert(db: Session, pending: Dict[int, Dict[str, Any]], now: datetime) -> None:
+        """Add counter deltas onto QuestionStats with SQL increments (safe with concurrent writers)"""
+        rows = [
+            {
+                "question_id": question_id,
+                "attempts": delta["attempts"],
+                "correct": delta["correct"],
+                "time_spent_total": delta["time_spent_total"],
+                "time_histogram": _empty()["time_histogram"],
+                "updated_at": now
+            }
+            for question_id, delta in pending.items()
+        ]
+        dialect = db.bind.dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            insert = (postgresql if dialect == "postgresql" else sqlite).insert(QuestionStats)
+            db.execute(insert.on_conflict_do_update(
+                index_elements=[QuestionStats.question_id],
+                set_={
+                    "attempts": QuestionStats.attempts + insert.excluded.attempts,
+                    "correct": QuestionStats.correct + insert.excluded.correct,
+                    "time_spent_total": QuestionStats.time_spent_total + insert.excluded.time_spent_total,
+                    "updated_at": insert.excluded.updated_at
+                }
+            ), rows)
+            return
+
+        # Other databases: increment in place, insert the questions that have no row yet
+        missing = []
+        for row in rows:
+            result = db.execute(
+                update(QuestionStats)
+                .where(QuestionStats.question_id == row["question_id"])
+                .values(
+                    attempts=QuestionStats.attempts + row["attempts"],
+                    correct=QuestionStats.correct + row["correct"],
+                    time_spent_total=QuestionStats.time_spent_total + row["time_spent_total"],
+                    updated_at=now
+                )
+            )
+            if result.rowcount == 0:
+                missing.append(row)
+        if missing:
+            db.bulk_insert_mappings(QuestionStats, missing)
+
+    def _after_write(self, written: Dict[int, Dict[str, Any]], failed: Dict[int, Dict[str, Any]]) -> int:
+        """Adopt written totals as the baseline and re-queue failed deltas (event loop thread)"""
+        for question_id, totals in written.items():
+            self._remember(question_id, totals)
+        for question_id, delta in failed.items():
+            self._merge(self.pending[question_id], delta)
+        return len(written)
+
+    def flush_sync(self) -> int:
+        """Flush pending deltas synchronously"""
+        return self._after_write(*self._write(self._take_pending()))
+
+    async def flush(self) -> int:
+        """Flush pending deltas without blocking the event loop"""
+        pending = self._take_pending()
+        written, failed = await asyncio.to_thread(self._write, pending)
+        return self._after_write(written, failed)
+
+    def recalibrate(self, db: Session) -> List[Dict[str, Any]]:
+        """Move question difficulty to match observed correct rates
+
+        The caller commits, then passes the changes to invalidate_quizzes.
+        """
+        rows = db.query(
+            Question.id, Question.quiz_id, Question.difficulty,
+            QuestionStats.attempts, QuestionStats.correct
+        ).join(
+            QuestionStats, QuestionStats.question_id == Question.id
+        ).filter(
+            QuestionStats.attempts >= self.min_attempts
+        ).all()
+
+        changes = []
+        for row in rows:
+            difficulty = self.difficulty_for(row.correct / row.attempts)
+            if difficulty != row.difficulty:
+                changes.append({
+                    "id": row.id,
+                    "quiz_id": row.quiz_id,
+                    "difficulty": difficulty,
+                    "previous_difficulty": row.difficulty
+                })
+
+        if changes:
+            db.bulk_update_mappings(Question, [{"id": c["id"], "difficulty": c["difficulty"]} for c in changes])
+
+        return changes
+
+    @staticmethod
+    def invalidate_quizzes(changes: List[Dict[str, Any]]) -> None:
+        """Drop compiled quiz payloads, which embed question difficulty (event loop thread)"""
+        for quiz_id in {c["quiz_id"] for c in changes}:
+            cache.invalidate_tag(CACHE_TAGS['QUIZ_PAYLOAD'].format(quiz_id=quiz_id))
+
+    def _recalibrate_job(self) -> List[Dict[str, Any]]:
+        """Background recalibration in its own session; returns the committed changes"""
+        db = SessionLocal()
+        try:
+            changes = self.recalibrate(db)
+            db.commit()
+            return changes
+        except Exception as e:
+            db.rollback()
+            ErrorHandler.log_error(e, "Recalibrating question difficulty")
+            return []
+        finally:
+            db.close()
+
+    async def start_flush_task(self) -> None:
+        """Start periodic flushing and difficulty recalibration"""
+        if self.flush_task and not self.flush_task.done():
+            return
+
+        async def flush_loop():
+            while True:
+                await asyncio.sleep(self.flush_interval)
+                await self.flush()
+                if time.time() - self.recalibrated_at >= self.recalibrate_interval:
+                    self.recalibrated_at = time.time()
+                    self.invalidate_quizzes(await asyncio.to_thread(self._recalibrate_job))
+
+        self.flush_task = asyncio.create_task(flush_loop())
+
+    async def stop_flush_task(self) -> None:
+        """Stop the task and flush what is left"""
+        if self.flush_task:
+            self.flush_task.cancel()
+            self.flush_task = None
+        await self.flush()
+
+# Global question analytics instance
+question_analytics = QuestionAnalytics()
@@ -0,0 +1,90 @@
+"""
+Generated quiz persistence for HANU-YOUTH platform
+Writes streamed AI questions into Quiz/Question in batches; the quiz stays
+private until the stream finishes so nobody starts a half-written quiz
+"""
+
+from typing import Dict, List, Any, Optional
+from datetime import datetime
+from app.core.database import SessionLocal
+from app.models import Quiz, Question
+
+class QuizBatchWriter:
+    """Batched Question inserts for one streamed quiz (blocking; run via to_thread)"""
+
+    def __init__(self, batch_size: int = 5):
+        self.batch_size = batch_size
+        self.quiz_id: Optional[int] = None
+        self.buffer: List[Dict[str, Any]] = []
+        self.written = 0
+
+    def open(self, quiz_values: Dict[str, Any]) -> int:
+        """Create the private draft quiz and return its id"""
+        db = SessionLocal()
+        try:
+            quiz = Quiz(**quiz_values, is_public=False, is_ai_generated=True)
+            db.add(quiz)
+            db.commit()
+            self.quiz_id = quiz.id
+            return self.quiz_id
+        finally:
+            db.close()
+
+    def add(self, question: Dict[str, Any]) -> bool:
+        """Buffer a question; returns True when a batch is ready to flush"""
+        self.buffer.append({
+            "quiz_id": self.quiz_id,
+            "question_text": question["question_text"],
+            "question_type": question["question_type"],
+            "options": question.get("options"),
+            "correct_answer": question["correct_answer"],
+            "explanation": question.get("explanation"),
+            "points": question.get("points", 10),
+            "question_order": self.written + len(self.buffer),
+            "created_at": datetime.now()
+        })
+        return len(self.buffer) >= self.batch_size
+
+    def _write_buffer(self, db) -> None:
+        """Stage buffered questions as one bulk insert"""
+        buffer, self.buffer = self.buffer, []
+        if buffer:
+            db.bulk_insert_mappings(Question, buffer)
+            self.written += len(buffer)
+
+    def flush(self) -> int:
+        """Insert the buffered batch"""
+        db = SessionLocal()
+        try:
+            self._write_buffer(db)
+            db.commit()
+            return self.written
+        finally:
+            db.close()
+
+    def finish(self) -> int:
+        """Write the last batch and publish the quiz"""
+        db = SessionLocal()
+        try:
+            self._write_buffer(db)
+            db.query(Quiz).filter(Quiz.id == self.quiz_id).update({
+                Quiz.question_count: self.written,
+                Quiz.is_public: True
+            }, synchronize_session=False)
+            db.commit()
+            return self.written
+        finally:
+            db.close()
+
+    def discard(self) -> None:
+        """Remove a draft whose stream was abandoned"""
+        if self.quiz_id is None:
+            return
+
+        db = SessionLocal()
+        try:
+            db.query(Question).filter(Question.quiz_id == self.quiz_id).delete(synchronize_session=False)
+            db.query(Quiz).filter(Quiz.id == self.quiz_id).delete(synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
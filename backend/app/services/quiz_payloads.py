@@ -0,0 +1,110 @@
+"""
+Compiled quiz payloads for HANU-YOUTH platform
+Builds the answer-free question list, answer key and max score once per
+quiz version so starting an attempt is a cache hit plus one insert
+"""
+
+from typing import Dict, List, Any, Optional
+from datetime import datetime
+import random
+import zlib
+from sqlalchemy.orm import Session
+from app.core.cache import cache, CACHE_KEYS, CACHE_TAGS
+from app.models import Quiz, Question
+from app.services.quiz_sessions import quiz_sessions
+
+# Compiled payloads are keyed by version, so they can live long
+PAYLOAD_TTL = 6 * 3600
+
+class QuizPayloadCompiler:
+    """Per-quiz compiled start payloads with per-attempt shuffling"""
+
+    @staticmethod
+    def _version(updated_at: Optional[datetime]) -> str:
+        """Cache version for a quiz row"""
+        return updated_at.isoformat() if updated_at else "0"
+
+    def compile(self, db: Session, quiz: Quiz) -> Dict[str, Any]:
+        """Compile a quiz into its cached start payload"""
+        questions = db.query(Question).filter(
+            Question.quiz_id == quiz.id
+        ).order_by(Question.question_order, Question.id).all()
+
+        version = self._version(quiz.updated_at)
+        return {
+            "quiz": {
+                "id": quiz.id,
+                "title": quiz.title,
+                "description": quiz.description,
+                "category": quiz.category,
+                "difficulty": quiz.difficulty,
+                "time_limit": quiz.time_limit,
+                "question_count": quiz.question_count,
+                "xp_reward": quiz.xp_reward,
+                "coin_reward": quiz.coin_reward
+            },
+            "questions": [
+                {
+                    "id": q.id,
+                    "question_text": q.question_text,
+                    "question_type": q.question_type,
+                    "difficulty": q.difficulty,
+                    "points": q.points,
+                    "options": q.options if q.question_type == "multiple_choice" else None,
+                    "explanation": q.explanation,
+                    "image_url": q.image_url,
+                    "audio_url": q.audio_url
+                }
+                for q in questions
+            ],
+            "answer_key": quiz_sessions.build_answer_key(questions),
+            "max_score": float(sum(q.points for q in questions)),
+            "time_limit": quiz.time_limit,
+            "shuffle_questions": bool(quiz.shuffle_questions),
+            "shuffle_answers": bool(quiz.shuffle_answers),
+            # Stable per quiz version; each attempt mixes in its own id
+            "shuffle_seed": zlib.crc32(f"{quiz.id}:{version}".encode())
+        }
+
+    def get(self, db: Session, quiz: Quiz) -> Dict[str, Any]:
+        """Get the compiled payload for the quiz's current version"""
+        cache_key = CACHE_KEYS['QUIZ_PAYLOAD'].format(
+            quiz_id=quiz.id, version=self._version(quiz.updated_at)
+        )
+        payload = cache.get(cache_key)
+        if payload is None:
+            payload = self.compile(db, quiz)
+            cache.set(cache_key, payload, PAYLOAD_TTL,
+                      tags=[CACHE_TAGS['QUIZ_PAYLOAD'].format(quiz_id=quiz.id)])
+        return payload
+
+    def invalidate(self, quiz_id: int) -> None:
+        """Drop compiled payloads (call after editing questions without touching the quiz)"""
+        cache.invalidate_tag(CACHE_TAGS['QUIZ_PAYLOAD'].format(quiz_id=quiz_id))
+
+    @staticmethod
+    def shuffle_for_attempt(payload: Dict[str, Any], attempt_id: int) -> List[Dict[str, Any]]:
+        """Apply the attempt's question and option order without touching the cached payload"""
+        questions = payload["questions"]
+        if not payload["shuffle_questions"] and not payload["shuffle_answers"]:
+            return questions
+
+        rng = random.Random(payload["shuffle_seed"] ^ attempt_id)
+        questions = list(questions)
+        if payload["shuffle_questions"]:
+            rng.shuffle(questions)
+
+        if payload["shuffle_answers"]:
+            shuffled = []
+            for question in questions:
+                if question["options"]:
+                    options = list(question["options"])
+                    rng.shuffle(options)
+                    question = {**question, "options": options}
+                shuffled.append(question)
+            questions = shuffled
+
+        return questions
+
+# Global quiz payload compiler
+quiz_payloads = QuizPayloadCompiler()
@@ -0,0 +1,394 @@
+"""
+Quiz session cache for HANU-YOUTH platform
+Keeps active attempt state and the answer key in the cache so answers are
+validated and graded in memory, then persisted in bulk
+"""
+
+from typing import Dict, List, Any, Optional, Set, Tuple
+from datetime import datetime
+import asyncio
+import time
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from app.core.database import SessionLocal
+from app.core.cache import cache, CACHE_KEYS
+from app.core.error_handling import APIError, ErrorHandler
+from app.models import Quiz, Question, QuizAttempt, UserAnswer
+from app.services.answer_grader import answer_grader
+from app.services.question_analytics import question_analytics
+
+# Keep sessions well past any quiz time limit; every access refreshes the TTL
+SESSION_TTL = 2 * 3600
+
+def grade_answer(key: Dict[str, Any], answer: str) -> bool:
+    """Grade an answer against an answer key entry"""
+    if key["question_type"] == "multiple_choice":
+        return answer.lower() == key["normalized_answer"]
+    elif key["question_type"] == "true_false":
+        return answer.lower() in ["true", "false"] and answer.lower() == key["normalized_answer"]
+    else:
+        # Short answer and code questions go through the normalising local grader
+        return answer_grader.grade(key["prepared"], answer)["is_correct"]
+
+class QuizSessionStore:
+    """Cache-resident quiz attempts with checkpointed answer persistence"""
+
+    def __init__(self, checkpoint_size: int = 10, checkpoint_interval: int = 15):
+        self.checkpoint_size = checkpoint_size
+        self.checkpoint_interval = checkpoint_interval
+        self.dirty: Set[int] = set()  # attempt ids with unpersisted answers
+        self.orphans: List[Dict[str, Any]] = []  # failed checkpoints of sessions closed meanwhile
+        self.checkpoint_task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _key(attempt_id: int) -> str:
+        """Cache key for an attempt session"""
+        return CACHE_KEYS['QUIZ_SESSION'].format(attempt_id=attempt_id)
+
+    @staticmethod
+    def build_answer_key(questions: List[Question]) -> Dict[int, Dict[str, Any]]:
+        """Precompute the grading data for a quiz's questions"""
+        return {
+            question.id: {
+                "question_type": question.question_type,
+                "correct_answer": question.correct_answer,
+                "normalized_answer": question.correct_answer.lower(),
+                "prepared": answer_grader.prepare(question.correct_answer, question.question_type),
+                "points": question.points,
+                "explanation": question.explanation
+            }
+            for question in questions
+        }
+
+    def _save(self, session: Dict[str, Any]) -> None:
+        """Write a session back to the cache, refreshing its TTL"""
+        cache.set(self._key(session["attempt_id"]), session, SESSION_TTL)
+
+    def create(self, attempt: QuizAttempt, answer_key: Dict[int, Dict[str, Any]],
+               rewards: Dict[str, int]) -> Dict[str, Any]:
+        """Open a session for a freshly started attempt"""
+        session = {
+            "attempt_id": attempt.id,
+            "user_id": attempt.user_id,
+            "quiz_id": attempt.quiz_id,
+            "score": attempt.score or 0.0,
+            "max_score": attempt.max_score or 0.0,
+            "time_taken": attempt.time_taken or 0,
+            "correct_count": attempt.correct_count or 0,
+            "answered_count": attempt.answered_count or 0,
+            "xp_reward": rewards["xp_reward"],
+            "coin_reward": rewards["coin_reward"],
+            "answer_key": answer_key,
+            "answered": {},  # question_id -> is_correct
+            "pending": [],  # UserAnswer rows not yet written
+            "checkpointed_at": time.time()
+        }
+        self._save(session)
+        return session
+
+    def _restore(self, db: Session, attempt: QuizAttempt) -> Dict[str, Any]:
+        """Rebuild a session from the database after a cache miss"""
+        quiz = db.query(Quiz.xp_reward, Quiz.coin_reward).filter(Quiz.id == attempt.quiz_id).first()
+        questions = db.query(Question).filter(Question.quiz_id == attempt.quiz_id).all()
+        session = self.create(attempt, self.build_answer_key(questions), {
+            "xp_reward": quiz.xp_reward,
+            "coin_reward": quiz.coin_reward
+        })
+
+        answers = db.query(UserAnswer.question_id, UserAnswer.is_correct).filter(
+            UserAnswer.attempt_id == attempt.id
+        ).all()
+        session["answered"] = {answer.question_id: answer.is_correct for answer in answers}
+        session["answered_count"] = len(answers)
+        session["correct_count"] = sum(1 for answer in answers if answer.is_correct)
+        return session
+
+    def get(self, db: Session, attempt_id: int, user_id: int) -> Dict[str, Any]:
+        """Get an open session for a user's attempt"""
+        session = cache.get(self._key(attempt_id))
+        if session is None:
+            attempt = db.query(QuizAttempt).filter(
+                QuizAttempt.id == attempt_id,
+                QuizAttempt.user_id == user_id
+            ).first()
+            if not attempt:
+                raise APIError("Quiz attempt not found", "ATTEMPT_NOT_FOUND", status_code=404)
+            if attempt.is_completed:
+                raise APIError("Quiz attempt already completed", "ATTEMPT_COMPLETED", status_code=400)
+            session = self._restore(db, attempt)
+
+        if session["user_id"] != user_id:
+            raise APIError("Quiz attempt not found", "ATTEMPT_NOT_FOUND", status_code=404)
+
+        return session
+
+    def _check_question(self, db: Session, session: Dict[str, Any], question_id: int) -> Dict[str, Any]:
+        """Validate a question id against the session's answer key"""
+        key = session["answer_key"].get(question_id)
+        if key is None:
+            # Only the error path touches the database, to tell the two cases apart
+            exists = db.query(Question.id).filter(Question.id == question_id).first()
+            if not exists:
+                raise APIError("Question not found", "QUESTION_NOT_FOUND", status_code=404)
+            raise APIError("Question does not belong to this quiz", "QUESTION_MISMATCH", status_code=400)
+
+        if question_id in session["answered"]:
+            raise APIError("Question already answered", "ALREADY_ANSWERED", status_code=400)
+
+        return key
+
+    def _record(self, session: Dict[str, Any], key: Dict[str, Any], question_id: int,
+                answer: str, time_spent: int) -> Dict[str, Any]:
+        """Grade an answer and fold it into the session tallies"""
+        is_correct = grade_answer(key, answer)
+        points_earned = key["points"] if is_correct else 0
+
+        session["answered"][question_id] = is_correct
+        session["pending"].append({
+            "attempt_id": session["attempt_id"],
+            "question_id": question_id,
+            "user_answer": answer,
+            "is_correct": is_correct,
+            "points_earned": points_earned,
+            "time_spent": time_spent,
+            "answered_at": datetime.now()
+        })
+        session["score"] += points_earned
+        session["time_taken"] += time_spent
+        session["answered_count"] += 1
+        if is_correct:
+            session["correct_count"] += 1
+        question_analytics.record(question_id, is_correct, time_spent)
+
+        return {
+            "is_correct": is_correct,
+            "points_earned": points_earned,
+            "correct_answer": key["correct_answer"] if not is_correct else None,
+            "explanation": key["explanation"]
+        }
+
+    def submit(self, db: Session, session: Dict[str, Any], question_id: int,
+               answer: str, time_spent: int) -> Dict[str, Any]:
+        """Validate and grade one answer in memory"""
+        key = self._check_question(db, session, question_id)
+        result = self._record(session, key, question_id, answer, time_spent)
+        self._save(session)
+        self.dirty.add(session["attempt_id"])
+
+        if len(session["pending"]) >= self.checkpoint_size:
+            self.checkpoint_session(db, session)
+
+        return {
+            **result,
+            "current_score": session["score"],
+            "max_score": session["max_score"]
+        }
+
+    def submit_many(self, db: Session, session: Dict[str, Any],
+                    answers: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Validate a whole batch up front, then grade it in memory"""
+        seen = set()
+        for answer in answers:
+            self._check_question(db, session, answer["question_id"])
+            if answer["question_id"] in seen:
+                raise APIError("Question already answered", "ALREADY_ANSWERED", status_code=400)
+            seen.add(answer["question_id"])
+
+        # Checkpointing is left to the caller, which persists the batch at once
+        results = []
+        for answer in answers:
+            key = session["answer_key"][answer["question_id"]]
+            result = self._record(session, key, answer["question_id"], answer["answer"], answer["time_spent"])
+            results.append({"question_id": answer["question_id"], **result})
+
+        self._save(session)
+        self.dirty.add(session["attempt_id"])
+        return results
+
+    @staticmethod
+    def _attempt_values(session: Dict[str, Any]) -> Dict[Any, Any]:
+        """Attempt columns mirrored from the session"""
+        return {
+            QuizAttempt.score: session["score"],
+            QuizAttempt.time_taken: session["time_taken"],
+            QuizAttempt.correct_count: session["correct_count"],
+            QuizAttempt.answered_count: session["answered_count"]
+        }
+
+    @staticmethod
+    def _update_attempt(db: Session, attempt_id: int, values: Dict[Any, Any]) -> int:
+        """Mirror session tallies onto the attempt row
+
+        answered_count only grows, so it versions the tallies: a checkpoint taken
+        before a newer persist cannot overwrite it, and the final score written
+        by complete is never touched.
+        """
+        return db.query(QuizAttempt).filter(
+            QuizAttempt.id == attempt_id,
+            QuizAttempt.is_completed == False,
+            or_(
+                QuizAttempt.answered_count.is_(None),
+                QuizAttempt.answered_count <= values[QuizAttempt.answered_count]
+            )
+        ).update(values, synchronize_session=False)
+
+    def persist(self, db: Session, session: Dict[str, Any]) -> int:
+        """Stage pending answers and the running score on db
+
+        The answers stay pending until confirm() is called after the caller's
+        commit, so a failed commit loses nothing. Returns how many were staged.
+        """
+        pending = list(session["pending"])
+        if pending:
+            db.bulk_insert_mappings(UserAnswer, pending)
+        self._update_attempt(db, session["attempt_id"], self._attempt_values(session))
+        return len(pending)
+
+    def confirm(self, session: Dict[str, Any], staged: int) -> None:
+        """Drop the answers a committed persist() wrote"""
+        del session["pending"][:staged]
+        session["checkpointed_at"] = time.time()
+        self._save(session)
+        if not session["pending"]:
+            self.dirty.discard(session["attempt_id"])
+
+    def checkpoint_session(self, db: Session, session: Dict[str, Any]) -> int:
+        """Persist and commit one session now; on failure the answers stay queued for the next checkpoint"""
+        try:
+            staged = self.persist(db, session)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            ErrorHandler.log_error(e, "Checkpointing quiz session")
+            return 0
+        self.confirm(session, staged)
+        return staged
+
+    def complete(self, db: Session, session: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Write remaining answers and close the attempt in one row update (caller commits, then close())
+
+        Returns the final attempt values, or None if the attempt was already completed.
+        Answers stay pending until close(), so a failed commit leaves them for the checkpoint.
+        """
+        pending = list(session["pending"])
+        if pending:
+            db.bulk_insert_mappings(UserAnswer, pending)
+
+        max_score = session["max_score"]
+        final = {
+            **self._attempt_values(session),
+            QuizAttempt.percentage: (session["score"] / max_score) * 100 if max_score > 0 else 0,
+            QuizAttempt.is_completed: True,
+            QuizAttempt.completed_at: datetime.now()
+        }
+        updated = db.query(QuizAttempt).filter(
+            QuizAttempt.id == session["attempt_id"],
+            QuizAttempt.is_completed == False
+        ).update(final, synchronize_session=False)
+
+        if not updated:
+            return None
+        return {column.key: value for column, value in final.items()}
+
+    def close(self, attempt_id: int) -> None:
+        """Drop a finished attempt's session"""
+        cache.delete(self._key(attempt_id))
+        self.dirty.discard(attempt_id)
+
+    def _take_due(self, force: bool = False) -> List[Dict[str, Any]]:
+        """Detach pending answers of sessions due for a checkpoint (event loop thread)"""
+        now = time.time()
+        batches = []
+        for attempt_id in list(self.dirty):
+            session = cache.get(self._key(attempt_id))
+            if session is None:
+                self.dirty.discard(attempt_id)
+                continue
+            if not force and now - session["checkpointed_at"] < self.checkpoint_interval:
+                continue
+
+            pending, session["pending"] = session["pending"], []
+            session["checkpointed_at"] = now
+            self.dirty.discard(attempt_id)
+            batches.append({
+                "attempt_id": attempt_id,
+                "pending": pending,
+                "values": self._attempt_values(session)
+            })
+
+        # Answers of sessions that closed while their checkpoint was failing
+        batches.extend(self.orphans)
+        self.orphans = []
+        return batches
+
+    def _requeue(self, failed: List[Dict[str, Any]]) -> None:
+        """Put failed answers back in front of anything submitted meanwhile (event loop thread)"""
+        for batch in failed:
+            session = cache.get(self._key(batch["attempt_id"]))
+            if session is None:
+                # Closed (or evicted) since: retry the answers alone, the attempt row is final
+                self.orphans.append({**batch, "values": None})
+                continue
+            session["pending"] = batch["pending"] + session["pending"]
+            self.dirty.add(batch["attempt_id"])
+
+    def _write_checkpoints(self, batches: List[Dict[str, Any]]) -> Tuple[int, List[Dict[str, Any]]]:
+        """Write detached checkpoints in one transaction
+
+        Returns (answers written, batches to retry); may run in a worker
+        thread, so sessions and self.dirty are left alone.
+        """
+        if not batches:
+            return 0, []
+
+        db = SessionLocal()
+        try:
+            rows = [row for batch in batches for row in batch["pending"]]
+            if rows:
+                db.bulk_insert_mappings(UserAnswer, rows)
+            for batch in batches:
+                if batch["values"] is not None:
+                    self._update_attempt(db, batch["attempt_id"], batch["values"])
+            db.commit()
+            return len(rows), []
+        except Exception as e:
+            db.rollback()
+            ErrorHandler.log_error(e, "Checkpointing quiz sessions")
+            return 0, batches
+        finally:
+            db.close()
+
+    def checkpoint_sync(self, force: bool = True) -> int:
+        """Checkpoint sessions synchronously"""
+        written, failed = self._write_checkpoints(self._take_due(force))
+        self._requeue(failed)
+        return written
+
+    async def checkpoint(self, force: bool = False) -> int:
+        """Checkpoint due sessions without blocking the event loop"""
+        batches = self._take_due(force)
+        written, failed = await asyncio.to_thread(self._write_checkpoints, batches)
+        self._requeue(failed)
+        return written
+
+    async def start_checkpoint_task(self) -> None:
+        """Start periodic checkpointing of active sessions"""
+        if self.checkpoint_task and not self.checkpoint_task.done():
+            return
+
+        async def checkpoint_loop():
+            while True:
+                await asyncio.sleep(self.checkpoint_interval)
+                await self.checkpoint()
+
+        self.checkpoint_task = asyncio.create_task(checkpoint_loop())
+
+    async def stop_checkpoint_task(self) -> None:
+        """Stop checkpointing and persist everything still pending"""
+        if self.checkpoint_task:
+            self.checkpoint_task.cancel()
+            self.checkpoint_task = None
+        await self.checkpoint(force=True)
+
+# Global quiz session store
+quiz_sessions = QuizSessionStore()
@@ -0,0 +1,154 @@
+"""
+Sorted range indexes for HANU-YOUTH platform
+One value-sorted NumPy array per numeric field, so range filters are two binary
+searches returning a contiguous run of doc numbers and sort-by-field walks that
+order instead of sorting the matches
+"""
+
+import threading
+from typing import Dict, Optional, Tuple
+import numpy as np
+from app.services.facet_index import bitmap_members
+
+# Walk the sorted order (instead of selecting among the matches) when at least
+# 1/SCAN_RATIO of the documents match; the walk tests SCAN_CHUNK docs at a time
+SCAN_RATIO = 16
+SCAN_CHUNK = 4096
+
+class RangeIndex:
+    """Documents sorted by (value, doc number) for one field, updated in batches"""
+
+    def __init__(self, batch_size: int = 1024):
+        self.batch_size = batch_size
+        # (values ascending, doc at each position, value by doc number with NaN when absent),
+        # replaced as a whole on flush so readers never see a half-merged state
+        self.state: Tuple[np.ndarray, np.ndarray, np.ndarray] = (
+            np.empty(0, dtype=np.float64),
+            np.empty(0, dtype=np.int64),
+            np.empty(0, dtype=np.float64)
+        )
+        self.pending: Dict[int, float] = {}
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.state[1])
+
+    def set(self, doc: int, value: float) -> None:
+        """Queue a value for doc; merged once a batch is full or on flush"""
+        self.pending[doc] = float(value)
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def remove(self, doc: int) -> None:
+        """Queue doc for removal"""
+        self.pending[doc] = float("nan")
+
+    def value(self, doc: int) -> Optional[float]:
+        """Indexed value of doc (pending updates not included)"""
+        by_doc = self.state[2]
+        if doc >= len(by_doc) or np.isnan(by_doc[doc]):
+            return None
+        return float(by_doc[doc])
+
+    def flush(self) -> int:
+        """Merge queued updates into the sorted arrays; returns how many were applied"""
+        with self.lock:
+            if not self.pending:
+                return 0
+            pending, self.pending = self.pending, {}
+            changed = np.fromiter(pending.keys(), dtype=np.int64, count=len(pending))
+            new_values = np.fromiter(pending.values(), dtype=np.float64, count=len(pending))
+            values, docs, by_doc = self.state
+
+            # Copy-on-write so a concurrent reader keeps a consistent snapshot
+            size = max(len(by_doc), 1024)
+            while changed.max() >= size:
+                size *= 2
+            by_doc = np.concatenate([by_doc, np.full(size - len(by_doc), np.nan)])
+
+            # Drop the current entries of docs that changed
+            stale = changed[~np.isnan(by_doc[changed])]
+            if len(stale):
+                keep = ~np.isin(docs, stale)
+                values, docs = values[keep], docs[keep]
+            by_doc[changed] = new_values
+
+            # Insert the new entries in (value, doc) order
+            present = ~np.isnan(new_values)
+            changed, new_values = changed[present], new_values[present]
+            order = np.lexsort((changed, new_values))
+            changed, new_values = changed[order], new_values[order]
+            low = np.searchsorted(values, new_values, side="left")
+            high = np.searchsorted(values, new_values, side="right")
+            for i in np.flatnonzero(high > low):
+                # Equal values already indexed: place by doc number within the run
+                low[i] += np.searchsorted(docs[low[i]:high[i]], changed[i])
+            values = np.insert(values, low, new_values)
+            docs = np.insert(docs, low, changed)
+
+            self.state = (values, docs, by_doc)
+            return len(pending)
+
+    def scale(self, factor: float) -> None:
+        """Multiply every value by a positive factor (order is unchanged)"""
+        with self.lock:
+            values, docs, by_doc = self.state
+            self.state = (values * factor, docs, by_doc * factor)
+            self.pending = {doc: value * factor for doc, value in self.pending.items()}
+
+    def between(self, low: Optional[float] = None, high: Optional[float] = None,
+                low_inclusive: bool = True, high_inclusive: bool = True) -> np.ndarray:
+        """Doc numbers with low <= value <= high (bounds optional), as one contiguous slice"""
+        values, docs, _ = self.state
+        start = 0 if low is None else np.searchsorted(values, low, side="left" if low_inclusive else "right")
+        stop = len(values) if high is None else np.searchsorted(values, high, side="right" if high_inclusive else "left")
+        return docs[start:max(start, stop)]
+
+    def greater_than(self, value: float, inclusive: bool = False) -> np.ndarray:
+        """Doc numbers with value above the bound"""
+        return self.between(low=value, low_inclusive=inclusive)
+
+    def less_than(self, value: float, inclusive: bool = False) -> np.ndarray:
+        """Doc numbers with value below the bound"""
+        return self.between(high=value, high_inclusive=inclusive)
+
+    def top(self, mask: np.ndarray, matches: int, k: int, descending: bool = True) -> np.ndarray:
+        """First k documents of mask in value order (ties by doc number, in the same direction)"""
+        values, docs, by_doc = self.state
+        k = min(k, matches)
+        if k <= 0:
+            return np.empty(0, dtype=np.int64)
+
+        if matches * SCAN_RATIO >= len(docs):
+            # Broad filter: walk the sorted order and keep members of mask
+            picked = []
+            for start in range(0, len(docs), SCAN_CHUNK):
+                if descending:
+                    chunk = docs[max(0, len(docs) - start - SCAN_CHUNK):len(docs) - start][::-1]
+                else:
+                    chunk = docs[start:start + SCAN_CHUNK]
+                inside = chunk >> 3 < len(mask)
+                chunk = chunk[inside]
+                members = chunk[(mask[chunk >> 3] >> (chunk & 7)) & 1 == 1][:k]
+                picked.append(members)
+                k -= len(members)
+                if k == 0:
+                    break
+            return np.concatenate(picked)
+
+        # Narrow filter: partial selection over the matching documents only
+        candidates = bitmap_members(mask)
+        candidates = candidates[candidates < len(by_doc)]
+        scores = by_doc[candidates]
+        indexed = ~np.isnan(scores)
+        candidates, scores = candidates[indexed], scores[indexed]
+        if descending:
+            candidates, scores = candidates[::-1], -scores[::-1]
+        if len(candidates) > k:
+            # Everything before the k-th value, then the first of its ties in walk order
+            threshold = np.partition(scores, k - 1)[k - 1]
+            keep = scores < threshold
+            keep[np.flatnonzero(scores == threshold)[:k - np.count_nonzero(keep)]] = True
+            candidates, scores = candidates[keep], scores[keep]
+        order = np.lexsort((-candidates if descending else candidates, scores))
+        return candidates[order]
@@ -0,0 +1,229 @@
+"""
+Research view and download counters for HANU-YOUTH platform
+Increments land in an in-memory buffer and are flushed periodically as one
+batched upsert into ResearchStats; each flush pulls back every worker's
+recent totals so the research stores of all workers converge
+"""
+
+from typing import Callable, Dict, List, Optional, Tuple
+from collections import defaultdict
+from datetime import datetime, timedelta
+import asyncio
+from sqlalchemy import update
+from sqlalchemy.dialects import postgresql, sqlite
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.error_handling import ErrorHandler
+from app.models import ResearchStats
+
+# Receives {research_id: [views, downloads]} deltas; live is False for the totals loaded at startup
+CounterSink = Callable[[Dict[str, List[int]], bool], None]
+
+def _merge(into: Dict[str, List[int]], deltas: Dict[str, List[int]]) -> Dict[str, List[int]]:
+    """Add one set of [views, downloads] deltas onto another"""
+    for research_id, (views, downloads) in deltas.items():
+        counts = into.setdefault(research_id, [0, 0])
+        counts[0] += views
+        counts[1] += downloads
+    return into
+
+class ResearchCounters:
+    """Buffered view/download counters with periodic batched write-back
+
+    Handlers run on the event loop thread, so the buffer is a plain dict;
+    the database is the point where workers' counts meet.
+    """
+
+    def __init__(self, flush_interval: int = settings.RESEARCH_COUNTER_FLUSH_INTERVAL):
+        self.flush_interval = flush_interval
+        self.pending: Dict[str, List[int]] = defaultdict(lambda: [0, 0])  # unflushed deltas
+        self.in_flight: Dict[str, List[int]] = {}  # deltas being written by the current flush
+        self.totals: Dict[str, List[int]] = {}  # last ResearchStats totals seen, all workers
+        self.synced_at: Optional[datetime] = None
+        self.sinks: List[CounterSink] = []
+        self.flush_task: Optional[asyncio.Task] = None
+        self.flush_lock = asyncio.Lock()  # one async flush at a time, including the final one
+
+    def record_view(self, research_id: str, count: int = 1) -> None:
+        """Count a research view (O(1), no I/O)"""
+        self.pending[research_id][0] += count
+
+    def record_download(self, research_id: str, count: int = 1) -> None:
+        """Count a research download (O(1), no I/O)"""
+        self.pending[research_id][1] += count
+
+    def unflushed(self, research_id: str) -> Tuple[int, int]:
+        """This worker's (views, downloads) not yet reflected in the store"""
+        views = downloads = 0
+        for counts in (self.pending.get(research_id), self.in_flight.get(research_id)):
+            if counts:
+                views += counts[0]
+                downloads += counts[1]
+        return views, downloads
+
+    def add_sink(self, sink: CounterSink) -> None:
+        """Register a consumer of flushed deltas (e.g. the in-memory research store)"""
+        self.sinks.append(sink)
+
+    def _apply(self, deltas: Dict[str, List[int]], live: bool) -> None:
+        """Hand deltas to every sink"""
+        for sink in self.sinks:
+            try:
+                sink(deltas, live)
+            except Exception as e:
+                ErrorHandler.log_error(e, "Applying research counters")
+
+    @staticmethod
+    def _upsert(db, deltas: Dict[str, List[int]], now: datetime) -> None:
+        """Add deltas onto ResearchStats with SQL increments (safe with concurrent writers)"""
+        rows = [
+            {
+                "research_id": research_id,
+                "view_count": views,
+                "download_count": downloads,
+                "last_activity_at": now,
+                "updated_at": now
+            }
+            for research_id, (views, downloads) in deltas.items()
+        ]
+        dialect = db.bind.dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            insert = (postgresql if dialect == "postgresql" else sqlite).insert(ResearchStats)
+            db.execute(insert.on_conflict_do_update(
+                index_elements=[ResearchStats.research_id],
+                set_={
+                    "view_count": ResearchStats.view_count + insert.excluded.view_count,
+                    "download_count": ResearchStats.download_count + insert.excluded.download_count,
+                    "last_activity_at": insert.excluded.last_activity_at,
+                    "updated_at": insert.excluded.updated_at
+                }
+            ), rows)
+            return
+
+        # Other databases: increment in place, insert the ids that have no row yet
+        missing = []
+        for row in rows:
+            result = db.execute(
+                update(ResearchStats)
+                .where(ResearchStats.research_id == row["research_id"])
+                .values(
+                    view_count=ResearchStats.view_count + row["view_count"],
+                    download_count=ResearchStats.download_count + row["download_count"],
+                    last_activity_at=now,
+                    updated_at=now
+                )
+            )
+            if result.rowcount == 0:
+                missing.append(row)
+        if missing:
+            db.bulk_insert_mappings(ResearchStats, missing)
+
+    def _sync(self, deltas: Dict[str, List[int]]) -> Tuple[bool, Dict[str, List[int]]]:
+        """Write deltas and read back recently active totals (worker thread)
+
+        Returns (written, changes since the last sync across all workers).
+        """
+        db = SessionLocal()
+        try:
+            now = datetime.now()
+            if deltas:
+                self._upsert(db, deltas, now)
+                db.commit()
+
+            # Rows touched since the last sync (with slack for clock skew and slow commits)
+            query = db.query(ResearchStats)
+            if self.synced_at is not None:
+                since = self.synced_at - timedelta(seconds=2 * self.flush_interval)
+                query = query.filter(ResearchStats.last_activity_at >= since)
+            changes = {}
+            for row in query.all():
+                total = [row.view_count or 0, row.download_count or 0]
+                previous = self.totals.get(row.research_id, [0, 0])
+                if total != previous:
+                    changes[row.research_id] = [total[0] - previous[0], total[1] - previous[1]]
+                    self.totals[row.research_id] = total
+            self.synced_at = now
+            return True, changes
+        except Exception as e:
+            db.rollback()
+            ErrorHandler.log_error(e, "Flushing research counters")
+            return False, {}
+        finally:
+            db.close()
+
+    def _take_pending(self) -> Dict[str, List[int]]:
+        """Detach the buffer into in_flight (called on the event loop thread)"""
+        pending, self.pending = dict(self.pending), defaultdict(lambda: [0, 0])
+        _merge(self.in_flight, pending)
+        return {research_id: list(counts) for research_id, counts in self.in_flight.items()}
+
+    def _after_sync(self, written: bool) -> None:
+        """Event-loop side of a flush: keep failed deltas for the next batch"""
+        if written:
+            self.in_flight = {}
+
+    def _sync_and_apply(self, deltas: Dict[str, List[int]]) -> Tuple[bool, int]:
+        """Write, then feed every worker's changes to the sinks (worker thread)"""
+        written, changes = self._sync(deltas)
+        if changes:
+            self._apply(changes, live=True)
+        return written, len(changes)
+
+    def flush_sync(self) -> int:
+        """Flush synchronously; returns how many items changed"""
+        written, changed = self._sync_and_apply(self._take_pending())
+        self._after_sync(written)
+        return changed
+
+    async def flush(self) -> int:
+        """Flush without blocking the event loop"""
+        async with self.flush_lock:
+            deltas = self._take_pending()
+            written, changed = await asyncio.to_thread(self._sync_and_apply, deltas)
+            self._after_sync(written)
+            return changed
+
+    def load(self) -> int:
+        """Feed persisted totals to the sinks (once, at startup)"""
+        db = SessionLocal()
+        try:
+            now = datetime.now()
+            totals = {
+                row.research_id: [row.view_count or 0, row.download_count or 0]
+                for row in db.query(ResearchStats).all()
+            }
+        except Exception as e:
+            ErrorHandler.log_error(e, "Loading research counters")
+            return 0
+        finally:
+            db.close()
+        self.totals = {research_id: list(counts) for research_id, counts in totals.items()}
+        self.synced_at = now
+        if totals:
+            self._apply(totals, live=False)
+        return len(totals)
+
+    async def start_flush_task(self) -> None:
+        """Load persisted totals and start periodic flushing"""
+        if self.flush_task and not self.flush_task.done():
+            return
+        await asyncio.to_thread(self.load)
+
+        async def flush_loop():
+            while True:
+                await asyncio.sleep(self.flush_interval)
+                # Shielded: cancelling the loop lets a write in progress commit and settle
+                # in_flight, so the final flush (queued on flush_lock) cannot resend it
+                await asyncio.shield(self.flush())
+
+        self.flush_task = asyncio.create_task(flush_loop())
+
+    async def stop_flush_task(self) -> None:
+        """Stop the task, let a running flush finish, then flush what is left"""
+        if self.flush_task:
+            self.flush_task.cancel()
+            self.flush_task = None
+        await self.flush()
+
+# Global research counters instance
+research_counters = ResearchCounters()
@@ -0,0 +1,269 @@
+"""
+Research paper ingestion for HANU-YOUTH platform
+Streams uploads to disk, then extracts text page by page in a worker process
+pool and writes index-ready chunks to disk, tracking per-file status
+"""
+
+from typing import Dict, List, Any, Optional, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import asyncio
+import itertools
+import json
+import os
+import time
+import uuid
+import aiofiles
+from fastapi import UploadFile
+from app.core.config import settings
+from app.core.error_handling import APIError, ErrorHandler
+from app.services.search_index import search_index
+from app.services.vector_index import vector_index
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # Bytes read from the request per step
+CHUNK_WORDS = 200  # Words per index chunk
+CHUNK_OVERLAP = 40  # Words shared between neighbouring chunks
+MAX_PAGE_CHARS = 200_000  # Guard against pathological pages
+SNIPPET_CHARS = 300  # Search result preview length when there is no description
+
+def _limit_worker_memory(limit_mb: int) -> None:
+    """Pool initializer: cap the worker's address space so one bad PDF cannot exhaust the host"""
+    try:
+        import resource
+
+        limit = limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ImportError, ValueError, OSError):
+        pass
+
+def chunk_words(words: List[str], size: int = CHUNK_WORDS, overlap: int = CHUNK_OVERLAP) -> List[str]:
+    """Split a word list into overlapping chunks"""
+    step = max(1, size - overlap)
+    return [" ".join(words[i:i + size]) for i in range(0, max(1, len(words) - overlap), step)]
+
+def iter_chunk_text(chunks_path: str) -> Iterator[str]:
+    """Stream chunk text from a JSONL file, skipping the overlap repeated from the previous chunk"""
+    with open(chunks_path, encoding="utf-8") as chunks:
+        for line in chunks:
+            chunk = json.loads(line)
+            if chunk["chunk"] == 0:
+                yield chunk["text"]
+            else:
+                yield " ".join(chunk["text"].split()[CHUNK_OVERLAP:])
+
+def count_pages(path: str) -> int:
+    """Number of pages in a PDF (worker process)"""
+    from pypdf import PdfReader
+
+    return len(PdfReader(path).pages)
+
+def extract_pages(path: str, chunks_path: str, start: int, end: int) -> Dict[str, int]:
+    """Extract pages [start, end) and append their chunks to a JSONL file (worker process)
+
+    Only one page's text is held at a time, so memory does not grow with the PDF.
+    """
+    from pypdf import PdfReader
+
+    reader = PdfReader(path)
+    chunks = 0
+    characters = 0
+    with open(chunks_path, "a", encoding="utf-8") as out:
+        for number in range(start, min(end, len(reader.pages))):
+            text = (reader.pages[number].extract_text() or "")[:MAX_PAGE_CHARS]
+            characters += len(text)
+            words = text.split()
+            if not words:
+                continue
+            for index, chunk in enumerate(chunk_words(words)):
+                out.write(json.dumps({"page": number + 1, "chunk": index, "text": chunk}, ensure_ascii=False) + "\n")
+                chunks += 1
+    return {"chunks": chunks, "characters": characters}
+
+class ResearchIngestion:
+    """Bounded queue of uploaded PDFs processed by a worker pool"""
+
+    def __init__(self, workers: int = settings.INGEST_WORKERS, queue_size: int = settings.INGEST_QUEUE_SIZE,
+                 page_batch: int = settings.INGEST_PAGE_BATCH, worker_memory_mb: int = settings.INGEST_WORKER_MEMORY_MB,
+                 job_ttl: int = settings.INGEST_JOB_TTL):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.page_batch = page_batch
+        self.worker_memory_mb = worker_memory_mb
+        self.job_ttl = job_ttl
+        self.upload_dir = os.path.join(settings.UPLOAD_DIR, "research")
+        self.queue: Optional[asyncio.Queue] = None
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.worker_tasks: List[asyncio.Task] = []
+        self.jobs: Dict[str, Dict[str, Any]] = {}  # file_id -> status
+        self.finished: Dict[str, float] = {}  # file_id -> monotonic finish time, oldest first
+        self.reserved = 0  # uploads in flight that already hold a queue slot
+
+    def _ensure_queue(self) -> asyncio.Queue:
+        """Create the queue on the running loop"""
+        if self.queue is None:
+            self.queue = asyncio.Queue(maxsize=self.queue_size)
+        return self.queue
+
+    def reserve(self) -> None:
+        """Claim a queue slot before accepting an upload body (backpressure)"""
+        queue = self._ensure_queue()
+        if queue.qsize() + self.reserved >= self.queue_size:
+            raise APIError("Ingestion queue is full, try again shortly", "INGESTION_BUSY", status_code=503)
+        self.reserved += 1
+
+    def _finish(self, file_id: str) -> None:
+        """Start a finished job's expiry clock"""
+        self.finished[file_id] = time.monotonic()
+
+    def _evict_expired(self) -> None:
+        """Forget finished jobs older than job_ttl (oldest first, so this stops early)"""
+        cutoff = time.monotonic() - self.job_ttl
+        for file_id, finished_at in list(self.finished.items()):
+            if finished_at > cutoff:
+                break
+            del self.finished[file_id]
+            self.jobs.pop(file_id, None)
+
+    async def save_upload(self, file: UploadFile, user_id: int, title: Optional[str],
+                          description: Optional[str]) -> Dict[str, Any]:
+        """Stream an upload to disk in fixed-size chunks and queue it for extraction"""
+        self.reserve()
+        try:
+            self._evict_expired()
+            os.makedirs(self.upload_dir, exist_ok=True)
+            filename = os.path.basename(file.filename or "") or "upload.pdf"
+            file_id = f"{uuid.uuid4()}_{filename}"
+            file_path = os.path.join(self.upload_dir, file_id)
+
+            size = 0
+            async with aiofiles.open(file_path, "wb") as out:
+                while True:
+                    block = await file.read(UPLOAD_CHUNK_SIZE)
+                    if not block:
+                        break
+                    size += len(block)
+                    if size > settings.MAX_FILE_SIZE:
+                        break
+                    await out.write(block)
+
+            if size > settings.MAX_FILE_SIZE:
+                os.remove(file_path)
+                raise APIError(
+                    f"File exceeds the {settings.MAX_FILE_SIZE // (1024 * 1024)} MB limit",
+                    "FILE_TOO_LARGE",
+                    status_code=413
+                )
+
+            job = {
+                "file_id": file_id,
+                "user_id": user_id,
+                "title": title or filename,
+                "description": description,
+                "file_path": file_path,
+                "chunks_path": f"{file_path}.chunks.jsonl",
+                "file_size": size,
+                "status": "queued",
+                "total_pages": None,
+                "pages_processed": 0,
+                "chunks": 0,
+                "error": None,
+                "upload_date": datetime.now().isoformat(),
+                "completed_at": None
+            }
+            self.jobs[file_id] = job
+            self._ensure_queue().put_nowait(file_id)
+            return job
+        finally:
+            self.reserved -= 1
+
+    def get_status(self, file_id: str, user_id: int) -> Dict[str, Any]:
+        """Public status of a user's upload"""
+        self._evict_expired()
+        job = self.jobs.get(file_id)
+        if job is None or job["user_id"] != user_id:
+            raise APIError("Upload not found", "UPLOAD_NOT_FOUND", status_code=404)
+        return {key: value for key, value in job.items() if key not in ("file_path", "chunks_path", "user_id")}
+
+    async def _process(self, job: Dict[str, Any]) -> None:
+        """Extract one PDF in page batches, updating status between batches"""
+        loop = asyncio.get_running_loop()
+        job["status"] = "processing"
+        if os.path.exists(job["chunks_path"]):
+            os.remove(job["chunks_path"])
+
+        job["total_pages"] = await loop.run_in_executor(self.executor, count_pages, job["file_path"])
+        for start in range(0, job["total_pages"], self.page_batch):
+            result = await loop.run_in_executor(
+                self.executor, extract_pages, job["file_path"], job["chunks_path"], start, start + self.page_batch
+            )
+            job["pages_processed"] = min(job["total_pages"], start + self.page_batch)
+            job["chunks"] += result["chunks"]
+
+        await asyncio.to_thread(self._index, job)
+        job["status"] = "completed"
+        job["completed_at"] = datetime.now().isoformat()
+
+    @staticmethod
+    def _index(job: Dict[str, Any]) -> None:
+        """Add an extracted paper to the full-text index"""
+        text = iter_chunk_text(job["chunks_path"]) if os.path.exists(job["chunks_path"]) else iter(())
+        opening = next(text, "")
+        search_index.add_document(
+            job["file_id"],
+            title=job["title"],
+            abstract=job["description"] or "",
+            text=itertools.chain([opening], text),
+            metadata={
+                "title": job["title"],
+                "content": job["description"] or opening[:SNIPPET_CHARS],
+                "url": "",
+                "type": "research",
+                "source": "Community upload",
+                "date": job["upload_date"][:10]
+            }
+        )
+        # Title, description and opening text are what the embedding model can use
+        vector_index.add_document(job["file_id"], " ".join(filter(None, [job["title"], job["description"], opening])))
+
+    async def _worker(self) -> None:
+        """Take queued uploads one at a time"""
+        while True:
+            file_id = await self.queue.get()
+            job = self.jobs.get(file_id)
+            try:
+                if job is not None:
+                    await self._process(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                ErrorHandler.log_error(e, f"Extracting research upload {file_id}")
+                job["status"] = "failed"
+                job["error"] = "Could not extract text from this PDF"
+            finally:
+                if job is not None and job["status"] in ("completed", "failed"):
+                    self._finish(file_id)
+                self.queue.task_done()
+
+    async def start(self) -> None:
+        """Start the extraction pool and queue consumers"""
+        if self.executor is not None:
+            return
+        self._ensure_queue()
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_limit_worker_memory,
+            initargs=(self.worker_memory_mb,)
+        )
+        self.worker_tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """Stop consumers and the pool (queued uploads stay on disk)"""
+        for task in self.worker_tasks:
+            task.cancel()
+        self.worker_tasks = []
+        if self.executor is not None:
+            executor, self.executor = self.executor, None
+            await asyncio.to_thread(executor.shutdown, True, cancel_futures=True)
+
+# Global research ingestion pipeline
+research_ingestion = ResearchIngestion()
@@ -0,0 +1,440 @@
+"""
+Full-text search index for HANU-YOUTH platform
+In-process BM25 inverted index over research titles, abstracts and extracted
+PDF text, with block-compressed postings and on-disk snapshots
+"""
+
+from typing import Dict, List, Any, Optional, Iterable, Tuple, Union, Callable
+from collections import Counter
+from functools import lru_cache
+import asyncio
+import json
+import math
+import os
+import re
+import threading
+import zipfile
+import numpy as np
+from nltk.stem import PorterStemmer
+from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+from app.core.config import settings
+from app.core.error_handling import ErrorHandler
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+BLOCK_SIZE = 128  # Postings per sealed block
+MAX_TF = 65535  # Term frequencies are stored as uint16 at most
+FIELD_WEIGHTS = {"title": 3, "abstract": 2, "text": 1}  # Per-field term frequency multipliers
+
+_stemmer = PorterStemmer()
+
+@lru_cache(maxsize=200_000)
+def stem(word: str) -> str:
+    """Porter stem of a lowercase word (memoised; vocabularies are small)"""
+    return _stemmer.stem(word)
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase, drop stop words and stem"""
+    return [stem(word) for word in TOKEN_RE.findall(text.lower()) if len(word) > 1 and word not in ENGLISH_STOP_WORDS]
+
+def _grow(values: np.ndarray, size: int) -> np.ndarray:
+    """Copy of an array zero-padded (or truncated) to size"""
+    grown = np.zeros(size, dtype=values.dtype)
+    count = min(size, len(values))
+    grown[:count] = values[:count]
+    return grown
+
+def _patch_narrow(values: np.ndarray, dtype) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Narrow array plus (positions, values) of the entries too large for it"""
+    ceiling = np.iinfo(dtype).max
+    positions = np.flatnonzero(values >= ceiling)
+    return np.minimum(values, ceiling).astype(dtype), positions, values[positions]
+
+def _patch_widen(narrow: np.ndarray, positions: np.ndarray, exceptions: np.ndarray, dtype) -> np.ndarray:
+    """Inverse of _patch_narrow"""
+    values = narrow.astype(dtype)
+    values[positions] = exceptions
+    return values
+
+def _write_npz(out, arrays: Dict[str, np.ndarray], level: int = 1) -> None:
+    """np.load-compatible archive with fast deflate (savez_compressed is fixed at level 6)"""
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED, compresslevel=level) as archive:
+        for name, values in arrays.items():
+            with archive.open(f"{name}.npy", "w", force_zip64=True) as member:
+                np.lib.format.write_array(member, np.asanyarray(values), allow_pickle=False)
+
+def _pack(values: np.ndarray) -> np.ndarray:
+    """Store non-negative integers in the narrowest unsigned dtype that holds them"""
+    top = int(values.max()) if len(values) else 0
+    dtype = np.uint8 if top < 1 << 8 else np.uint16 if top < 1 << 16 else np.uint32
+    return values.astype(dtype)
+
+class PostingList:
+    """Doc ids (delta-encoded) and term frequencies for one term
+
+    Appends go to a small Python tail; every BLOCK_SIZE postings the tail is
+    sealed into a numpy block of gaps and frequencies packed to the narrowest
+    dtype. Internal doc numbers only grow, so appends keep the list sorted.
+    """
+
+    __slots__ = ("blocks", "tail_docs", "tail_tfs", "count")
+
+    def __init__(self):
+        self.blocks: List[Tuple[int, np.ndarray, np.ndarray]] = []  # (first doc, gaps, tfs)
+        self.tail_docs: List[int] = []
+        self.tail_tfs: List[int] = []
+        self.count = 0
+
+    @classmethod
+    def from_arrays(cls, docs: np.ndarray, tfs: np.ndarray) -> "PostingList":
+        """Build a fully sealed list from sorted doc numbers"""
+        postings = cls()
+        for start in range(0, len(docs), BLOCK_SIZE):
+            postings._seal(docs[start:start + BLOCK_SIZE], tfs[start:start + BLOCK_SIZE])
+        postings.count = len(docs)
+        return postings
+
+    def _seal(self, docs: np.ndarray, tfs: np.ndarray) -> None:
+        """Append one compressed block"""
+        docs = np.asarray(docs, dtype=np.int64)
+        gaps = np.diff(docs, prepend=docs[0])
+        self.blocks.append((int(docs[0]), _pack(gaps), _pack(np.asarray(tfs, dtype=np.int64))))
+
+    def add(self, doc: int, tf: int) -> None:
+        """Append a posting for a doc newer than any already present"""
+        self.tail_docs.append(doc)
+        self.tail_tfs.append(tf)
+        self.count += 1
+        if len(self.tail_docs) >= BLOCK_SIZE:
+            self._seal(self.tail_docs, self.tail_tfs)
+            self.tail_docs = []
+            self.tail_tfs = []
+
+    def decode(self) -> Tuple[np.ndarray, np.ndarray]:
+        """All doc numbers and term frequencies"""
+        docs = [first + np.cumsum(gaps, dtype=np.int64) for first, gaps, _ in self.blocks]
+        tfs = [block_tfs for _, _, block_tfs in self.blocks]
+        if self.tail_docs:
+            docs.append(np.asarray(self.tail_docs, dtype=np.int64))
+            tfs.append(np.asarray(self.tail_tfs, dtype=np.uint16))
+        if not docs:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        return np.concatenate(docs), np.concatenate(tfs).astype(np.float32)
+
+    def nbytes(self) -> int:
+        """Bytes held by postings (sealed blocks plus the uncompressed tail)"""
+        return sum(gaps.nbytes + tfs.nbytes for _, gaps, tfs in self.blocks) + 16 * len(self.tail_docs)
+
+class InvertedIndex:
+    """BM25 inverted index with incremental updates and atomic snapshots"""
+
+    def __init__(self, path: str = settings.data_path(settings.SEARCH_INDEX_PATH), k1: float = 1.2, b: float = 0.75,
+                 compact_ratio: float = 0.3):
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self.compact_ratio = compact_ratio
+        self.lock = threading.RLock()
+        self.snapshot_task: Optional[asyncio.Task] = None
+        self._reset()
+
+    def _reset(self) -> None:
+        """Empty all index state"""
+        self.postings: Dict[str, PostingList] = {}
+        self.doc_ids: List[str] = []  # internal doc number -> external id
+        self.doc_numbers: Dict[str, int] = {}  # external id -> internal doc number (live docs only)
+        self.doc_lengths = np.zeros(1024, dtype=np.float32)
+        self.alive = np.zeros(1024, dtype=bool)
+        self.total_length = 0.0
+        self.meta: Dict[str, Dict[str, Any]] = {}
+        self.dirty = False
+
+    def __len__(self) -> int:
+        return len(self.doc_numbers)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self.doc_numbers
+
+    @staticmethod
+    def _term_counts(title: str, abstract: str, text: Union[str, Iterable[str]]) -> Counter:
+        """Field-weighted term frequencies; text may be a stream of chunks"""
+        counts: Counter = Counter()
+        for field, value in (("title", title), ("abstract", abstract)):
+            weight = FIELD_WEIGHTS[field]
+            for term in tokenize(value or ""):
+                counts[term] += weight
+        for chunk in ([text] if isinstance(text, str) else text):
+            counts.update(tokenize(chunk))
+        return counts
+
+    def _append(self, doc_id: str, counts: Counter, metadata: Optional[Dict[str, Any]]) -> None:
+        """Assign the next doc number and append its postings (lock held)"""
+        if doc_id in self.doc_numbers:
+            self._remove(doc_id)
+
+        number = len(self.doc_ids)
+        if number >= len(self.doc_lengths):
+            self.doc_lengths = _grow(self.doc_lengths, number * 2)
+            self.alive = _grow(self.alive, number * 2)
+        length = float(sum(counts.values()))
+        self.doc_ids.append(doc_id)
+        self.doc_numbers[doc_id] = number
+        self.doc_lengths[number] = length
+        self.alive[number] = True
+        self.total_length += length
+        for term, tf in counts.items():
+            postings = self.postings.get(term)
+            if postings is None:
+                postings = self.postings[term] = PostingList()
+            postings.add(number, min(tf, MAX_TF))
+        if metadata is not None:
+            self.meta[doc_id] = metadata
+        self.dirty = True
+
+    def add_document(self, doc_id: str, title: str = "", abstract: str = "",
+                     text: Union[str, Iterable[str]] = "", metadata: Optional[Dict[str, Any]] = None) -> None:
+        """Index (or re-index) one document"""
+        counts = self._term_counts(title, abstract, text)
+        with self.lock:
+            self._append(doc_id, counts, metadata)
+
+    def add_documents(self, documents: Iterable[Dict[str, Any]]) -> int:
+        """Bulk-index dicts with doc_id/title/abstract/text/metadata keys under one lock"""
+        added = 0
+        with self.lock:
+            for document in documents:
+                counts = self._term_counts(document.get("title", ""), document.get("abstract", ""),
+                                           document.get("text", ""))
+                self._append(document["doc_id"], counts, document.get("metadata"))
+                added += 1
+        return added
+
+    def _remove(self, doc_id: str) -> None:
+        """Tombstone a live document (lock held)"""
+        number = self.doc_numbers.pop(doc_id)
+        self.alive[number] = False
+        self.total_length -= float(self.doc_lengths[number])
+        self.meta.pop(doc_id, None)
+        self.dirty = True
+
+    def remove_document(self, doc_id: str) -> bool:
+        """Drop a document; postings are reclaimed by compaction"""
+        with self.lock:
+            if doc_id not in self.doc_numbers:
+                return False
+            self._remove(doc_id)
+            if len(self.doc_ids) - len(self.doc_numbers) > self.compact_ratio * len(self.doc_ids):
+                self.compact()
+            return True
+
+    def compact(self) -> None:
+        """Renumber live documents and rewrite postings without tombstones"""
+        with self.lock:
+            total = len(self.doc_ids)
+            alive = self.alive[:total]
+            remap = np.cumsum(alive) - 1
+            postings: Dict[str, PostingList] = {}
+            for term, posting_list in self.postings.items():
+                docs, tfs = posting_list.decode()
+                keep = alive[docs]
+                if keep.any():
+                    postings[term] = PostingList.from_arrays(remap[docs[keep]], tfs[keep])
+
+            live = np.flatnonzero(alive)
+            self.postings = postings
+            self.doc_ids = [self.doc_ids[i] for i in live]
+            self.doc_numbers = {doc_id: number for number, doc_id in enumerate(self.doc_ids)}
+            size = max(1024, len(live))
+            self.doc_lengths = _grow(self.doc_lengths[live], size)
+            self.alive = np.zeros(size, dtype=bool)
+            self.alive[:len(live)] = True
+            self.dirty = True
+
+    def search(self, query: str, k: int = 10,
+               predicate: Optional[Callable[[str], bool]] = None) -> List[Tuple[str, float]]:
+        """Top-k (doc_id, BM25 score) pairs, best first, optionally filtered by doc id"""
+        terms = set(tokenize(query))
+        if not terms or k <= 0:
+            return []
+
+        with self.lock:
+            live = len(self.doc_numbers)
+            if not live:
+                return []
+            total = len(self.doc_ids)
+            lengths = self.doc_lengths[:total]
+            average_length = self.total_length / live
+            matched_docs, contributions = [], []
+            for term in terms:
+                posting_list = self.postings.get(term)
+                if posting_list is None:
+                    continue
+                docs, tfs = posting_list.decode()
+                df = posting_list.count
+                idf = math.log(1.0 + (total - df + 0.5) / (df + 0.5))
+                norm = self.k1 * (1.0 - self.b + self.b * lengths[docs] / average_length)
+                matched_docs.append(docs)
+                contributions.append((idf * tfs * (self.k1 + 1.0) / (tfs + norm)).astype(np.float32))
+            if not matched_docs:
+                return []
+
+            matched = sum(len(docs) for docs in matched_docs)
+            if len(matched_docs) == 1:
+                candidates, candidate_scores = matched_docs[0], contributions[0]
+            elif matched * 8 < total:
+                # Selective query: merge the postings directly instead of touching every doc
+                candidates, inverse = np.unique(np.concatenate(matched_docs), return_inverse=True)
+                candidate_scores = np.bincount(inverse, weights=np.concatenate(contributions)).astype(np.float32)
+            else:
+                scores = np.zeros(total, dtype=np.float32)
+                for docs, contribution in zip(matched_docs, contributions):
+                    scores[docs] += contribution
+                candidates = np.flatnonzero(scores)
+                candidate_scores = scores[candidates]
+            live_mask = self.alive[candidates]
+            candidates, candidate_scores = candidates[live_mask], candidate_scores[live_mask]
+
+            if predicate is None:
+                if len(candidates) > k:
+                    top = np.sort(np.argpartition(-candidate_scores, k - 1)[:k])
+                    candidates, candidate_scores = candidates[top], candidate_scores[top]
+                order = np.argsort(-candidate_scores, kind="stable")
+                return [(self.doc_ids[candidates[i]], float(candidate_scores[i])) for i in order]
+
+            # Filtered: walk candidates best-first until k pass
+            hits: List[Tuple[str, float]] = []
+            for i in np.argsort(-candidate_scores, kind="stable"):
+                doc_id = self.doc_ids[candidates[i]]
+                if predicate(doc_id):
+                    hits.append((doc_id, float(candidate_scores[i])))
+                    if len(hits) >= k:
+                        break
+            return hits
+
+    def get_metadata(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        """Stored display metadata for a document"""
+        return self.meta.get(doc_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """Index size figures"""
+        with self.lock:
+            postings = sum(posting_list.count for posting_list in self.postings.values())
+            compressed = sum(posting_list.nbytes() for posting_list in self.postings.values())
+            return {
+                "documents": len(self.doc_numbers),
+                "tombstones": len(self.doc_ids) - len(self.doc_numbers),
+                "terms": len(self.postings),
+                "postings": postings,
+                "postings_bytes": compressed,
+                "bytes_per_posting": round(compressed / postings, 2) if postings else 0.0
+            }
+
+    def save_snapshot(self, path: Optional[str] = None) -> bool:
+        """Write the index to disk atomically (temp file then rename)"""
+        path = path or self.path
+        with self.lock:
+            if len(self.doc_ids) != len(self.doc_numbers):
+                self.compact()
+            terms = list(self.postings)
+            decoded = [self.postings[term].decode() for term in terms]
+            offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+            np.cumsum([len(docs) for docs, _ in decoded], out=offsets[1:])
+            docs = np.concatenate([docs for docs, _ in decoded]) if decoded else np.empty(0, dtype=np.int64)
+            tfs = np.concatenate([term_tfs for _, term_tfs in decoded]) if decoded else np.empty(0, dtype=np.float32)
+            # Gaps within each term; the first posting of a term is stored absolute
+            gaps = np.diff(docs, prepend=0)
+            starts = offsets[:-1][np.diff(offsets) > 0]
+            gaps[starts] = docs[starts]
+            header = {
+                "terms": terms,
+                "doc_ids": list(self.doc_ids),
+                "meta": dict(self.meta),
+                "k1": self.k1,
+                "b": self.b
+            }
+            lengths = self.doc_lengths[:len(self.doc_ids)].copy()
+            self.dirty = False
+
+        try:
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            temp_path = f"{path}.tmp"
+            # Most gaps fit in 16 bits and most frequencies in 8; the rest are stored as patches
+            gaps, gap_positions, gap_exceptions = _patch_narrow(gaps, np.uint16)
+            tfs, tf_positions, tf_exceptions = _patch_narrow(tfs.astype(np.int64), np.uint8)
+            with open(temp_path, "wb") as out:
+                _write_npz(out, {
+                    "header": np.frombuffer(json.dumps(header, default=str).encode("utf-8"), dtype=np.uint8),
+                    "offsets": offsets,
+                    "gaps": gaps,
+                    "gap_positions": gap_positions,
+                    "gap_exceptions": gap_exceptions,
+                    "tfs": tfs,
+                    "tf_positions": tf_positions,
+                    "tf_exceptions": tf_exceptions,
+                    "lengths": lengths
+                })
+            os.replace(temp_path, path)
+            return True
+        except Exception as e:
+            ErrorHandler.log_error(e, "Saving search index snapshot")
+            self.dirty = True
+            return False
+
+    def load_snapshot(self, path: Optional[str] = None) -> bool:
+        """Replace the index with a snapshot from disk, if one exists"""
+        path = path or self.path
+        if not os.path.exists(path):
+            return False
+        try:
+            with np.load(path) as data:
+                header = json.loads(data["header"].tobytes().decode("utf-8"))
+                offsets = data["offsets"]
+                gaps = _patch_widen(data["gaps"], data["gap_positions"], data["gap_exceptions"], np.int64)
+                tfs = _patch_widen(data["tfs"], data["tf_positions"], data["tf_exceptions"], np.int64)
+                lengths = data["lengths"]
+
+            postings = {}
+            for i, term in enumerate(header["terms"]):
+                start, end = offsets[i], offsets[i + 1]
+                postings[term] = PostingList.from_arrays(np.cumsum(gaps[start:end], dtype=np.int64), tfs[start:end])
+
+            with self.lock:
+                self._reset()
+                self.postings = postings
+                self.doc_ids = header["doc_ids"]
+                self.doc_numbers = {doc_id: number for number, doc_id in enumerate(self.doc_ids)}
+                size = max(1024, len(self.doc_ids))
+                self.doc_lengths = _grow(lengths.astype(np.float32), size)
+                self.alive = np.zeros(size, dtype=bool)
+                self.alive[:len(self.doc_ids)] = True
+                self.total_length = float(lengths.sum())
+                self.meta = header["meta"]
+            return True
+        except Exception as e:
+            ErrorHandler.log_error(e, "Loading search index snapshot")
+            return False
+
+    async def start_snapshot_task(self, interval: int = settings.SEARCH_SNAPSHOT_INTERVAL) -> None:
+        """Periodically persist the index when it has changed"""
+        if self.snapshot_task and not self.snapshot_task.done():
+            return
+
+        async def snapshot_loop():
+            while True:
+                await asyncio.sleep(interval)
+                if self.dirty:
+                    await asyncio.to_thread(self.save_snapshot)
+
+        self.snapshot_task = asyncio.create_task(snapshot_loop())
+
+    async def stop_snapshot_task(self) -> None:
+        """Stop the task and write a final snapshot"""
+        if self.snapshot_task:
+            self.snapshot_task.cancel()
+            self.snapshot_task = None
+        if self.dirty:
+            await asyncio.to_thread(self.save_snapshot)
+
+# Global search index, restored from the last snapshot
+search_index = InvertedIndex()
+search_index.load_snapshot()
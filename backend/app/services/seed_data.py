@@ -270,6 +270,132 @@ def seed_power_ups(db: Session):
     
     db.commit()
 
+def seed_shop_items(db: Session):
+    """Seed shop catalog data"""
+    shop_items = [
+        {
+            "slug": "bundle_starter_pack",
+            "name": "Starter Pack",
+            "description": "Perfect for new users! Includes coins, gems, and a special avatar",
+            "category": "bundles",
+            "item_type": "bundle",
+            "rarity": "special",
+            "cost_coins": 0,
+            "cost_gems": 10,
+            "original_cost_coins": 0,
+            "original_cost_gems": 15,
+            "is_limited": True,
+            "contents": ["avatar_rookie", "coins_1000", "gems_5"]
+        },
+        {
+            "slug": "avatar_dragon_lord",
+            "name": "Dragon Lord",
+            "description": "Majestic dragon-themed avatar with animated effects",
+            "category": "avatars",
+            "item_type": "avatar",
+            "rarity": "legendary",
+            "cost_coins": 2000,
+            "cost_gems": 20,
+            "is_featured": True,
+            "attributes": {"is_new": True, "popularity": 95}
+        },
+        {
+            "slug": "theme_neon_dreams",
+            "name": "Neon Dreams",
+            "description": "Cyberpunk-inspired theme with animated neon lights",
+            "category": "themes",
+            "item_type": "theme",
+            "rarity": "epic",
+            "cost_coins": 800,
+            "cost_gems": 5,
+            "original_cost_coins": 1000,
+            "original_cost_gems": 8,
+            "is_featured": True
+        },
+        {
+            "slug": "power_up_double_xp",
+            "name": "Double XP Boost",
+            "description": "2x XP for all activities for 24 hours",
+            "category": "power_ups",
+            "item_type": "power_up",
+            "rarity": "rare",
+            "cost_coins": 500,
+            "cost_gems": 3,
+            "original_cost_coins": 750,
+            "original_cost_gems": 5,
+            "is_daily_special": True,
+            "duration": 86400  # 24 hours in seconds
+        },
+        {
+            "slug": "avatar_seasonal_special",
+            "name": "Seasonal Special Avatar",
+            "description": "Limited edition seasonal avatar",
+            "category": "avatars",
+            "item_type": "avatar",
+            "rarity": "epic",
+            "cost_coins": 1200,
+            "cost_gems": 8,
+            "is_daily_special": True,
+            "attributes": {"is_seasonal": True}
+        },
+        {
+            "slug": "avatar_cyber_ninja",
+            "name": "Cyber Ninja",
+            "description": "Stealthy ninja avatar with a glowing visor",
+            "category": "avatars",
+            "item_type": "avatar",
+            "rarity": "rare",
+            "cost_coins": 500,
+            "cost_gems": 0
+        },
+        {
+            "slug": "avatar_rookie",
+            "name": "Rookie",
+            "description": "Classic avatar for new explorers",
+            "category": "avatars",
+            "item_type": "avatar",
+            "rarity": "common",
+            "cost_coins": 100,
+            "cost_gems": 0
+        },
+        {
+            "slug": "theme_neon_cyberpunk",
+            "name": "Neon Cyberpunk",
+            "description": "Dark theme with neon accents",
+            "category": "themes",
+            "item_type": "theme",
+            "rarity": "common",
+            "cost_coins": 300,
+            "cost_gems": 0
+        },
+        {
+            "slug": "badge_global_citizen",
+            "name": "Global Citizen",
+            "description": "Profile badge for community champions",
+            "category": "badges",
+            "item_type": "badge",
+            "rarity": "rare",
+            "cost_coins": 400,
+            "cost_gems": 2
+        },
+        {
+            "slug": "effect_confetti_burst",
+            "name": "Confetti Burst",
+            "description": "Celebrate correct answers with confetti",
+            "category": "effects",
+            "item_type": "effect",
+            "rarity": "epic",
+            "cost_coins": 600,
+            "cost_gems": 4
+        }
+    ]
+    
+    for item_data in shop_items:
+        item = InventoryItem(**item_data)
+        db.add(item)
+    
+    db.commit()
+
 def seed_sample_quizzes(db: Session):
     """Seed sample quiz data"""
     quizzes = [
@@ -601,6 +727,9 @@ def main():
         print("  Seeding power-ups...")
         seed_power_ups(db)
         
+        print("  Seeding shop items...")
+        seed_shop_items(db)
+        
         print("  Seeding quizzes...")
         seed_sample_quizzes(db)
         
@@ -0,0 +1,229 @@
+"""
+Shop catalog service for HANU-YOUTH platform
+Loads InventoryItem rows into an immutable in-memory index so catalog
+reads never touch the database
+"""
+
+from typing import Dict, List, Any, Optional, Tuple
+from datetime import datetime, date, timedelta
+from types import MappingProxyType
+from collections import defaultdict
+import threading
+from sqlalchemy.orm import Session
+from app.core.cache import cache, CACHE_KEYS, CACHE_TAGS
+from app.models import InventoryItem
+
+# Display metadata for shop categories (item counts come from the catalog)
+SHOP_CATEGORIES = [
+    {
+        "id": "avatars",
+        "name": "Avatars",
+        "description": "Custom profile pictures and representations",
+        "icon": "👤"
+    },
+    {
+        "id": "themes",
+        "name": "Themes",
+        "description": "UI themes and color schemes",
+        "icon": "🎨"
+    },
+    {
+        "id": "badges",
+        "name": "Badges",
+        "description": "Achievement badges and titles",
+        "icon": "🏆"
+    },
+    {
+        "id": "effects",
+        "name": "Effects",
+        "description": "Visual effects and animations",
+        "icon": "✨"
+    },
+    {
+        "id": "power_ups",
+        "name": "Power-ups",
+        "description": "Gameplay enhancements and boosts",
+        "icon": "⚡"
+    },
+    {
+        "id": "bundles",
+        "name": "Bundles",
+        "description": "Special value packs and collections",
+        "icon": "📦"
+    }
+]
+
+# Payload keys derived from InventoryItem columns; display attributes may not override them
+RESERVED_KEYS = frozenset({
+    "id", "catalog_id", "name", "description", "type", "category", "rarity", "cost",
+    "is_daily_special", "original_cost", "discount", "is_featured", "is_limited",
+    "ends_at", "duration", "items_included"
+})
+
+class CatalogIndex:
+    """Read-only snapshot of the shop catalog"""
+
+    def __init__(self, items: List[Dict[str, Any]], version: int):
+        self.version = version
+
+        by_category = defaultdict(list)
+        by_rarity = defaultdict(list)
+        for item in items:
+            by_category[item["category"]].append(item)
+            by_rarity[item["rarity"]].append(item)
+
+        self.by_id = MappingProxyType({item["id"]: item for item in items})
+        self.by_category = MappingProxyType({key: tuple(value) for key, value in by_category.items()})
+        self.by_rarity = MappingProxyType({key: tuple(value) for key, value in by_rarity.items()})
+        self.category_counts = MappingProxyType({key: len(value) for key, value in by_category.items()})
+        self.featured = tuple(item for item in items if item.get("is_featured") or item.get("is_limited"))
+        self.daily_specials = tuple(item for item in items if item["is_daily_special"])
+
+    def daily_special(self, day: date) -> Optional[Dict[str, Any]]:
+        """Item in today's daily special slot (rotates every 24 hours)"""
+        if not self.daily_specials:
+            return None
+        return self.daily_specials[day.timetuple().tm_yday % len(self.daily_specials)]
+
+class ShopCatalog:
+    """Versioned shop catalog with precomputed views"""
+
+    def __init__(self):
+        self.index: Optional[CatalogIndex] = None
+        self.version = 0
+        self.load_lock = threading.Lock()
+
+    @staticmethod
+    def _discount(cost: Dict[str, int], original: Dict[str, int]) -> Optional[float]:
+        """Fractional discount when one currency is priced (coins and gems are not interchangeable)"""
+        priced = [currency for currency in ("coins", "gems") if original[currency] or cost[currency]]
+        if len(priced) != 1 or not original[priced[0]]:
+            return None
+        currency = priced[0]
+        return round(1 - cost[currency] / original[currency], 2)
+
+    @staticmethod
+    def _to_dict(item: InventoryItem) -> Dict[str, Any]:
+        """Shape a catalog row like the shop API payload"""
+        data = {
+            "id": item.slug,
+            "catalog_id": item.id,
+            "name": item.name,
+            "description": item.description,
+            "type": item.item_type,
+            "category": item.category,
+            "rarity": item.rarity,
+            "cost": {"coins": item.cost_coins or 0, "gems": item.cost_gems or 0},
+            "is_daily_special": bool(item.is_daily_special)
+        }
+
+        if item.original_cost_coins is not None or item.original_cost_gems is not None:
+            original = {
+                "coins": item.original_cost_coins or 0,
+                "gems": item.original_cost_gems or 0
+            }
+            data["original_cost"] = original
+            discount = ShopCatalog._discount(data["cost"], original)
+            if discount is not None:
+                data["discount"] = discount
+
+        if item.is_featured:
+            data["is_featured"] = True
+        if item.is_limited:
+            data["is_limited"] = True
+            if item.available_until:
+                data["ends_at"] = item.available_until
+        if item.duration:
+            data["duration"] = item.duration
+        if item.contents:
+            data["items_included"] = list(item.contents)
+        data.update(
+            (key, value) for key, value in (item.attributes or {}).items()
+            if key not in RESERVED_KEYS
+        )
+
+        return data
+
+    def load(self, db: Session) -> CatalogIndex:
+        """Build a fresh index from the database (one query)"""
+        items = db.query(InventoryItem).filter(
+            InventoryItem.is_active == True
+        ).order_by(InventoryItem.id).all()
+
+        with self.load_lock:
+            self.version += 1
+            self.index = CatalogIndex([self._to_dict(item) for item in items], self.version)
+            return self.index
+
+    def get_index(self, db: Session) -> CatalogIndex:
+        """Current index, loading it on first use"""
+        index = self.index
+        if index is None:
+            index = self.load(db)
+        return index
+
+    def invalidate(self) -> None:
+        """Drop the index and every view cached for it (call after editing items)"""
+        with self.load_lock:
+            self.index = None
+            self.version += 1
+        cache.invalidate_tag(CACHE_TAGS['SHOP_CATALOG'])
+
+    def _cached_view(self, index: CatalogIndex, view: str, builder, ttl: Optional[int] = None) -> Any:
+        """Cache a derived view under the index version"""
+        cache_key = CACHE_KEYS['SHOP_CATALOG'].format(version=index.version, view=view)
+        result = cache.get(cache_key)
+        if result is None:
+            result = builder()
+            cache.set(cache_key, result, ttl, tags=[CACHE_TAGS['SHOP_CATALOG']])
+        return result
+
+    def get(self, db: Session, item_id: str) -> Optional[Dict[str, Any]]:
+        """Look up an item by its public id"""
+        return self.get_index(db).by_id.get(item_id)
+
+    def get_by_category(self, db: Session, category: str) -> Tuple[Dict[str, Any], ...]:
+        """Items in a category"""
+        return self.get_index(db).by_category.get(category, ())
+
+    def get_by_rarity(self, db: Session, rarity: str) -> Tuple[Dict[str, Any], ...]:
+        """Items of a rarity"""
+        return self.get_index(db).by_rarity.get(rarity, ())
+
+    def get_categories(self, db: Session) -> List[Dict[str, Any]]:
+        """Category metadata with live item counts"""
+        index = self.get_index(db)
+        return self._cached_view(index, "categories", lambda: [
+            {**category, "item_count": index.category_counts.get(category["id"], 0)}
+            for category in SHOP_CATEGORIES
+        ])
+
+    def get_featured(self, db: Session) -> Dict[str, Any]:
+        """Featured items and today's daily special"""
+        index = self.get_index(db)
+        now = datetime.now()
+        today = now.date()
+        refresh_time = datetime.combine(today + timedelta(days=1), datetime.min.time())
+
+        def build():
+            return {
+                "featured_items": [
+                    item for item in index.featured
+                    if not item.get("ends_at") or item["ends_at"] > now
+                ],
+                "daily_special": index.daily_special(today),
+                "refresh_time": refresh_time
+            }
+
+        # Expire with the daily rotation or the next limited offer, whichever is first
+        expires_at = min(
+            [refresh_time] + [
+                item["ends_at"] for item in index.featured
+                if item.get("ends_at") and item["ends_at"] > now
+            ]
+        )
+        ttl = max(1, int((expires_at - now).total_seconds()))
+        return self._cached_view(index, f"featured:{today.isoformat()}", build, ttl)
+
+# Global shop catalog instance
+shop_catalog = ShopCatalog()
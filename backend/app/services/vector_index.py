@@ -0,0 +1,625 @@
+"""
+Semantic vector search for HANU-YOUTH platform
+Embeds research documents in background batches, stores them in a memory-mapped
+float16 matrix with an IVF index, and fuses vector hits with BM25 rankings
+"""
+
+from typing import Dict, List, Any, Optional, Iterable, Iterator, Tuple, Callable
+from datetime import datetime
+import asyncio
+import importlib.util
+import json
+import logging
+import math
+import os
+import pickle
+import shutil
+import threading
+import numpy as np
+from app.core.config import settings
+from app.core.error_handling import ErrorHandler
+from app.services.search_index import search_index, tokenize
+
+logger = logging.getLogger(__name__)
+
+MAX_TEXT_CHARS = 20_000  # Text kept per document for embedding
+LSA_FIT_SAMPLE = 50_000  # Documents used to fit the fallback embedder
+LSA_VOCABULARY = 100_000  # Terms kept by the fallback embedder
+KMEANS_SAMPLE_PER_LIST = 64  # Training rows per IVF list
+RRF_CONSTANT = 60  # Reciprocal rank fusion damping
+
+class TextEmbedder:
+    """Sentence embeddings from a CPU transformer, or LSA when torch/transformers are missing"""
+
+    def __init__(self, model_name: str = settings.EMBEDDING_MODEL, dim: int = settings.VECTOR_DIM,
+                 batch_size: int = settings.VECTOR_EMBED_BATCH):
+        self.model_name = model_name
+        self.dim = dim
+        self.batch_size = batch_size
+        self.backend = "transformer" if self.transformer_available() else "lsa"
+        self.pipeline = None  # fitted LSA pipeline
+        self.tokenizer = None
+        self.model = None
+
+    @staticmethod
+    def transformer_available() -> bool:
+        """Whether torch and transformers are installed"""
+        return all(importlib.util.find_spec(module) is not None for module in ("torch", "transformers"))
+
+    @property
+    def ready(self) -> bool:
+        """Whether embed() can run"""
+        return self.backend == "transformer" or self.pipeline is not None
+
+    def fit(self, texts: List[str]) -> None:
+        """Fit the LSA fallback on a corpus sample (no-op for the transformer)"""
+        if self.backend != "lsa":
+            return
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.decomposition import TruncatedSVD
+        from sklearn.pipeline import make_pipeline
+        from sklearn.preprocessing import Normalizer
+
+        vectorizer = TfidfVectorizer(tokenizer=tokenize, lowercase=False, token_pattern=None, sublinear_tf=True,
+                                     max_features=LSA_VOCABULARY, dtype=np.float32)
+        matrix = vectorizer.fit_transform(texts)
+        components = max(1, min(self.dim, matrix.shape[0] - 1, matrix.shape[1] - 1))
+        svd = TruncatedSVD(n_components=components, algorithm="randomized", random_state=0).fit(matrix)
+        pipeline = make_pipeline(vectorizer, svd, Normalizer(copy=False))
+        self.pipeline = pipeline
+        self.dim = components
+
+    def load_model(self) -> None:
+        """Load the tokenizer and model once"""
+        if self.model is None:
+            import torch
+            from transformers import AutoTokenizer, AutoModel
+
+            torch.set_num_threads(settings.LOCAL_INFERENCE_THREADS)
+            self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+            self.model = AutoModel.from_pretrained(self.model_name)
+            self.model.eval()
+            self.dim = self.model.config.hidden_size
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """L2-normalised float32 embeddings, one row per text"""
+        if self.backend == "lsa":
+            return np.asarray(self.pipeline.transform(texts), dtype=np.float32)
+
+        import torch
+
+        self.load_model()
+        rows = []
+        for start in range(0, len(texts), self.batch_size):
+            inputs = self.tokenizer(texts[start:start + self.batch_size], padding=True, truncation=True,
+                                    max_length=256, return_tensors="pt")
+            with torch.inference_mode():
+                hidden = self.model(**inputs).last_hidden_state
+            # Mean pooling over real tokens
+            mask = inputs["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+            pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+            rows.append(torch.nn.functional.normalize(pooled, dim=1).numpy())
+        return np.vstack(rows).astype(np.float32)
+
+    def save(self, path: str) -> None:
+        """Persist the fitted state"""
+        with open(path, "wb") as out:
+            pickle.dump({"backend": self.backend, "model_name": self.model_name, "dim": self.dim,
+                         "pipeline": self.pipeline}, out)
+
+    @classmethod
+    def load(cls, path: str) -> "TextEmbedder":
+        """Restore an embedder saved with save()"""
+        with open(path, "rb") as source:
+            state = pickle.load(source)
+        embedder = cls(model_name=state["model_name"], dim=state["dim"])
+        embedder.backend = state["backend"]
+        embedder.pipeline = state["pipeline"]
+        return embedder
+
+class IVFIndex:
+    """Inverted-file ANN index over a memory-mapped float16 matrix
+
+    Rows are stored grouped by their nearest centroid, so probing a list reads
+    one contiguous slice of the memory map.
+    """
+
+    def __init__(self, vectors: np.ndarray, centroids: np.ndarray, offsets: np.ndarray):
+        self.vectors = vectors  # (n, dim) float16, grouped by list
+        self.centroids = centroids  # (lists, dim) float32, normalised
+        self.offsets = offsets  # list i owns rows offsets[i]:offsets[i + 1]
+
+    @staticmethod
+    def list_count(rows: int) -> int:
+        """Number of IVF lists for a corpus size (exact search below 10k rows)"""
+        return 1 if rows < 10_000 else int(min(4096, math.sqrt(rows)))
+
+    @staticmethod
+    def train(sample: np.ndarray, lists: int) -> np.ndarray:
+        """Spherical k-means centroids from a sample of rows"""
+        if lists <= 1:
+            return np.zeros((1, sample.shape[1]), dtype=np.float32)
+        from sklearn.cluster import MiniBatchKMeans
+
+        kmeans = MiniBatchKMeans(n_clusters=lists, batch_size=4096, n_init=1, random_state=0)
+        kmeans.fit(sample)
+        centroids = kmeans.cluster_centers_.astype(np.float32)
+        centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-9)
+        return centroids
+
+    @staticmethod
+    def assign(vectors: np.ndarray, centroids: np.ndarray, batch: int = 65_536) -> np.ndarray:
+        """Nearest centroid per row"""
+        labels = np.zeros(len(vectors), dtype=np.int32)
+        if len(centroids) > 1:
+            for start in range(0, len(vectors), batch):
+                block = np.asarray(vectors[start:start + batch], dtype=np.float32)
+                labels[start:start + batch] = np.argmax(block @ centroids.T, axis=1)
+        return labels
+
+    @classmethod
+    def build(cls, raw_path: str, directory: str) -> Tuple["IVFIndex", np.ndarray]:
+        """Train lists on a sample of a raw .npy matrix and write it regrouped by list
+
+        Returns the opened index and the permutation applied to the raw rows.
+        """
+        raw = np.load(raw_path, mmap_mode="r")
+        count, dim = raw.shape
+        lists = cls.list_count(count)
+        sample_rows = np.sort(np.random.default_rng(0).choice(
+            count, size=min(count, lists * KMEANS_SAMPLE_PER_LIST), replace=False
+        ))
+        centroids = cls.train(np.asarray(raw[sample_rows], dtype=np.float32), lists)
+        labels = cls.assign(raw, centroids)
+        order = np.argsort(labels, kind="stable")
+        offsets = np.zeros(len(centroids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(labels, minlength=len(centroids)), out=offsets[1:])
+
+        vectors = np.lib.format.open_memmap(os.path.join(directory, "vectors.npy"), mode="w+",
+                                            dtype=np.float16, shape=(count, dim))
+        for start in range(0, count, 65_536):
+            rows = order[start:start + 65_536]
+            ascending = np.sort(rows)  # sequential reads from the raw map
+            vectors[start:start + len(rows)] = raw[ascending][np.searchsorted(ascending, rows)]
+        vectors.flush()
+        del vectors, raw
+        np.savez(os.path.join(directory, "ivf.npz"), centroids=centroids, offsets=offsets)
+        return cls.open(directory), order
+
+    @classmethod
+    def open(cls, directory: str) -> "IVFIndex":
+        """Memory-map an index written by build()"""
+        with np.load(os.path.join(directory, "ivf.npz")) as data:
+            centroids, offsets = data["centroids"], data["offsets"]
+        return cls(np.load(os.path.join(directory, "vectors.npy"), mmap_mode="r"), centroids, offsets)
+
+    def search(self, query: np.ndarray, nprobe: int, limit: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Row numbers and cosine scores of the best rows in the nprobe nearest lists"""
+        if len(self.centroids) > nprobe:
+            probe = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+        else:
+            probe = np.arange(len(self.centroids))
+
+        rows, scores = [], []
+        for list_id in probe:
+            start, end = int(self.offsets[list_id]), int(self.offsets[list_id + 1])
+            if end > start:
+                rows.append(np.arange(start, end))
+                scores.append(np.asarray(self.vectors[start:end], dtype=np.float32) @ query)
+        if not rows:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        rows, scores = np.concatenate(rows), np.concatenate(scores)
+        if len(rows) > limit:
+            top = np.argpartition(-scores, limit - 1)[:limit]
+            rows, scores = rows[top], scores[top]
+        order = np.argsort(-scores, kind="stable")
+        return rows[order], scores[order]
+
+class _Generation:
+    """One immutable built index: ids, IVF over the memory map, and its embedder"""
+
+    def __init__(self, name: str, doc_ids: List[str], ivf: IVFIndex, embedder: TextEmbedder):
+        self.name = name
+        self.doc_ids = doc_ids
+        self.ivf = ivf
+        self.embedder = embedder
+
+class VectorIndex:
+    """Embedding search with background rebuilds swapped in atomically
+
+    Every add/remove is appended to a corpus log. Between rebuilds, new documents
+    are embedded in small batches into an in-memory buffer searched exactly; a
+    rebuild re-embeds the whole log into a new generation directory and then
+    repoints the manifest with a single rename.
+    """
+
+    def __init__(self, directory: str = settings.data_path(settings.VECTOR_INDEX_DIR), nprobe: int = settings.VECTOR_NPROBE,
+                 min_similarity: float = settings.VECTOR_MIN_SIMILARITY,
+                 rebuild_ratio: float = settings.VECTOR_REBUILD_RATIO):
+        self.directory = directory
+        self.nprobe = nprobe
+        self.min_similarity = min_similarity
+        self.rebuild_ratio = rebuild_ratio
+        self.corpus_path = os.path.join(directory, "corpus.jsonl")
+        self.manifest_path = os.path.join(directory, "manifest.json")
+        self.lock = threading.RLock()
+        self.build_lock = threading.Lock()
+        self.generation: Optional[_Generation] = None
+        self.generation_ids: set = set()
+        self.corpus_offset = 0  # corpus bytes covered by the current generation
+        self.seq = 0  # corpus log sequence number of the latest change
+        self.pending: Dict[str, Tuple[int, str]] = {}  # doc_id -> (seq, text) awaiting embedding
+        self.fresh: Dict[str, Tuple[int, str, np.ndarray]] = {}  # doc_id -> (seq, text, vector) not yet in a generation
+        self.deleted: Dict[str, int] = {}  # doc_id -> seq of the removal
+        self._fresh_matrix: Optional[Tuple[List[str], np.ndarray]] = None
+        self.rebuild_task: Optional[asyncio.Task] = None
+        self.last_rebuild: Optional[str] = None
+
+    @property
+    def ready(self) -> bool:
+        """Whether a generation is loaded"""
+        return self.generation is not None
+
+    def __contains__(self, doc_id: str) -> bool:
+        with self.lock:
+            if doc_id in self.deleted:
+                return False
+            return doc_id in self.pending or doc_id in self.fresh or doc_id in self.generation_ids
+
+    def _log(self, record: Dict[str, Any]) -> None:
+        """Append one change to the corpus log (lock held)"""
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.corpus_path, "a", encoding="utf-8") as corpus:
+            corpus.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def add_document(self, doc_id: str, text: str) -> None:
+        """Queue a document (or new version) for embedding"""
+        text = text[:MAX_TEXT_CHARS]
+        with self.lock:
+            self._log({"id": doc_id, "text": text})
+            self.seq += 1
+            self.pending[doc_id] = (self.seq, text)
+            self.fresh.pop(doc_id, None)
+            self.deleted.pop(doc_id, None)
+            self._fresh_matrix = None
+
+    def remove_document(self, doc_id: str) -> None:
+        """Hide a document now; it is dropped from storage at the next rebuild"""
+        with self.lock:
+            self._log({"id": doc_id, "deleted": True})
+            self.seq += 1
+            self.deleted[doc_id] = self.seq
+            self.pending.pop(doc_id, None)
+            self.fresh.pop(doc_id, None)
+            self._fresh_matrix = None
+
+    def embed_pending(self, limit: int = 1024) -> int:
+        """Embed queued documents into the fresh buffer; returns how many were embedded"""
+        generation = self.generation
+        if generation is None or not generation.embedder.ready:
+            return 0
+        with self.lock:
+            batch = list(self.pending.items())[:limit]
+        if not batch:
+            return 0
+
+        vectors = generation.embedder.embed([text for _, (_, text) in batch])
+        with self.lock:
+            if self.generation is not generation:
+                # A rebuild swapped embedders meanwhile; these vectors are in the wrong space
+                return 0
+            for (doc_id, (seq, text)), vector in zip(batch, vectors):
+                # Skip documents changed again while embedding
+                if self.pending.get(doc_id, (None,))[0] == seq:
+                    del self.pending[doc_id]
+                    self.fresh[doc_id] = (seq, text, vector)
+            self._fresh_matrix = None
+        return len(batch)
+
+    def _fresh_rows(self) -> Tuple[List[str], np.ndarray]:
+        """Stacked fresh vectors (lock held)"""
+        if self._fresh_matrix is None:
+            ids = list(self.fresh)
+            matrix = np.vstack([self.fresh[doc_id][2] for doc_id in ids]) if ids else np.empty((0, 0), dtype=np.float32)
+            self._fresh_matrix = (ids, matrix)
+        return self._fresh_matrix
+
+    def search(self, query: str, k: int = 10,
+               predicate: Optional[Callable[[str], bool]] = None) -> List[Tuple[str, float]]:
+        """Top-k (doc_id, cosine similarity) pairs, best first"""
+        generation = self.generation
+        if generation is None or k <= 0 or not query.strip():
+            return []
+
+        vector = generation.embedder.embed([query])[0]
+        # Over-fetch so filtering and superseded rows still leave k hits
+        limit = len(generation.doc_ids) if predicate is not None else max(k * 4, 64)
+        rows, scores = generation.ivf.search(vector, self.nprobe, limit)
+        with self.lock:
+            # Removed documents, and those with a newer vector in the fresh buffer
+            hidden = self.deleted.keys() | self.fresh.keys()
+            candidates = [(generation.doc_ids[row], float(score)) for row, score in zip(rows, scores)
+                          if generation.doc_ids[row] not in hidden]
+            fresh_ids, fresh_matrix = self._fresh_rows()
+            if fresh_ids and fresh_matrix.shape[1] == len(vector):
+                candidates.extend(zip(fresh_ids, (fresh_matrix @ vector).tolist()))
+
+        hits: List[Tuple[str, float]] = []
+        for doc_id, score in sorted(candidates, key=lambda hit: hit[1], reverse=True):
+            if score < self.min_similarity:
+                break
+            if predicate is not None and not predicate(doc_id):
+                continue
+            hits.append((doc_id, score))
+            if len(hits) >= k:
+                break
+        return hits
+
+    def _read_corpus(self, end: int) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """(byte offset, record) for each corpus line before end"""
+        with open(self.corpus_path, "rb") as corpus:
+            offset = 0
+            for line in corpus:
+                if offset >= end:
+                    break
+                yield offset, json.loads(line)
+                offset += len(line)
+
+    def _live_offsets(self, end: int) -> Dict[str, int]:
+        """Latest line offset per live document id"""
+        latest: Dict[str, int] = {}
+        for offset, record in self._read_corpus(end):
+            if record.get("deleted"):
+                latest.pop(record["id"], None)
+            else:
+                latest[record["id"]] = offset
+        return latest
+
+    def _iter_live(self, end: int, latest: Dict[str, int]) -> Iterator[Tuple[str, str]]:
+        """(doc_id, text) for live documents in log order"""
+        for offset, record in self._read_corpus(end):
+            if latest.get(record["id"]) == offset:
+                yield record["id"], record["text"]
+
+    def rebuild(self) -> bool:
+        """Re-embed the corpus into a new generation and swap it in"""
+        if not self.build_lock.acquire(blocking=False):
+            return False
+        try:
+            with self.lock:
+                if not os.path.exists(self.corpus_path):
+                    return False
+                end = os.path.getsize(self.corpus_path)
+                seq = self.seq
+            latest = self._live_offsets(end)
+            count = len(latest)
+            if count < 2:
+                return False
+
+            name = f"gen-{datetime.now().strftime('%Y%m%d%H%M%S%f')}"
+            path = os.path.join(self.directory, name)
+            os.makedirs(path, exist_ok=True)
+
+            embedder = TextEmbedder()
+            if embedder.backend == "lsa":
+                step = max(1, count // LSA_FIT_SAMPLE)
+                embedder.fit([text for i, (_, text) in enumerate(self._iter_live(end, latest)) if i % step == 0])
+            else:
+                embedder.load_model()
+
+            # Embed in batches straight into an unsorted float16 memory map
+            raw_path = os.path.join(path, "vectors.raw")
+            raw = np.lib.format.open_memmap(raw_path, mode="w+", dtype=np.float16, shape=(count, embedder.dim))
+            doc_ids: List[str] = []
+            batch_ids, batch_texts = [], []
+            for doc_id, text in self._iter_live(end, latest):
+                batch_ids.append(doc_id)
+                batch_texts.append(text)
+                if len(batch_texts) >= embedder.batch_size:
+                    raw[len(doc_ids):len(doc_ids) + len(batch_ids)] = embedder.embed(batch_texts)
+                    doc_ids.extend(batch_ids)
+                    batch_ids, batch_texts = [], []
+            if batch_texts:
+                raw[len(doc_ids):len(doc_ids) + len(batch_ids)] = embedder.embed(batch_texts)
+                doc_ids.extend(batch_ids)
+
+            raw.flush()
+            del raw
+            _, order = IVFIndex.build(raw_path, path)
+            os.remove(raw_path)
+            doc_ids = [doc_ids[i] for i in order]
+            with open(os.path.join(path, "ids.json"), "w", encoding="utf-8") as out:
+                json.dump(doc_ids, out)
+            embedder.save(os.path.join(path, "embedder.pkl"))
+
+            self._swap(name, end, seq, latest)
+            return True
+        except Exception as e:
+            ErrorHandler.log_error(e, "Rebuilding vector index")
+            return False
+        finally:
+            self.build_lock.release()
+
+    def _swap(self, name: str, end: int, seq: int, latest: Dict[str, int]) -> None:
+        """Compact the corpus log, repoint the manifest and load the new generation"""
+        compacted_path = f"{self.corpus_path}.compact"
+        with open(compacted_path, "wb") as out:
+            with open(self.corpus_path, "rb") as corpus:
+                offset = 0
+                for line in corpus:
+                    if offset >= end:
+                        break
+                    if latest.get(json.loads(line)["id"]) == offset:
+                        out.write(line)
+                    offset += len(line)
+            covered = out.tell()
+
+        with self.lock:
+            # Changes logged while building are carried over verbatim
+            with open(compacted_path, "ab") as out, open(self.corpus_path, "rb") as corpus:
+                corpus.seek(end)
+                shutil.copyfileobj(corpus, out)
+            os.replace(compacted_path, self.corpus_path)
+
+            manifest_temp = f"{self.manifest_path}.tmp"
+            with open(manifest_temp, "w", encoding="utf-8") as out:
+                json.dump({"generation": name, "corpus_offset": covered, "count": len(latest)}, out)
+            os.replace(manifest_temp, self.manifest_path)
+
+            previous = self.generation.name if self.generation else None
+            self.generation = self._open_generation(name)
+            self.generation_ids = set(self.generation.doc_ids)
+            self.corpus_offset = covered
+            self.pending = {doc_id: entry for doc_id, entry in self.pending.items() if entry[0] > seq}
+            # Fresh vectors came from the old embedder; re-queue the ones the build did not cover
+            for doc_id, (added, text, _) in self.fresh.items():
+                if added > seq:
+                    self.pending[doc_id] = (added, text)
+            self.fresh = {}
+            self.deleted = {doc_id: removed for doc_id, removed in self.deleted.items() if removed > seq}
+            self._fresh_matrix = None
+            self.last_rebuild = datetime.now().isoformat()
+
+        if previous and previous != name:
+            # In-flight searches keep their mapping; unlinking is safe on POSIX
+            shutil.rmtree(os.path.join(self.directory, previous), ignore_errors=True)
+        logger.info(f"Vector index {name} ready with {len(latest)} documents")
+
+    def _open_generation(self, name: str) -> _Generation:
+        """Memory-map a built generation"""
+        path = os.path.join(self.directory, name)
+        with open(os.path.join(path, "ids.json"), encoding="utf-8") as source:
+            doc_ids = json.load(source)
+        return _Generation(name, doc_ids, IVFIndex.open(path), TextEmbedder.load(os.path.join(path, "embedder.pkl")))
+
+    def load(self) -> bool:
+        """Open the current generation and queue documents logged after it"""
+        try:
+            generation = None
+            covered = 0
+            if os.path.exists(self.manifest_path):
+                with open(self.manifest_path, encoding="utf-8") as source:
+                    manifest = json.load(source)
+                generation = self._open_generation(manifest["generation"])
+                covered = manifest["corpus_offset"]
+
+            pending: Dict[str, Tuple[int, str]] = {}
+            deleted: Dict[str, int] = {}
+            seq = 0
+            if os.path.exists(self.corpus_path):
+                with open(self.corpus_path, "rb") as corpus:
+                    corpus.seek(covered)
+                    for line in corpus:
+                        record = json.loads(line)
+                        seq += 1
+                        if record.get("deleted"):
+                            pending.pop(record["id"], None)
+                            deleted[record["id"]] = seq
+                        else:
+                            pending[record["id"]] = (seq, record["text"])
+                            deleted.pop(record["id"], None)
+
+            with self.lock:
+                self.generation = generation
+                self.generation_ids = set(generation.doc_ids) if generation else set()
+                self.corpus_offset = covered
+                self.seq = seq
+                self.pending = pending
+                self.deleted = deleted
+                self.fresh = {}
+                self._fresh_matrix = None
+            return generation is not None
+        except Exception as e:
+            ErrorHandler.log_error(e, "Loading vector index")
+            return False
+
+    def needs_rebuild(self) -> bool:
+        """No generation yet, or too many changes since the last one"""
+        with self.lock:
+            changes = len(self.pending) + len(self.fresh) + len(self.deleted)
+            if self.generation is None:
+                return changes > 0
+            return changes > max(100, self.rebuild_ratio * len(self.generation_ids))
+
+    def stats(self) -> Dict[str, Any]:
+        """Index size figures"""
+        with self.lock:
+            generation = self.generation
+            return {
+                "generation": generation.name if generation else None,
+                "backend": generation.embedder.backend if generation else TextEmbedder().backend,
+                "documents": len(generation.doc_ids) if generation else 0,
+                "dimensions": generation.embedder.dim if generation else None,
+                "ivf_lists": len(generation.ivf.centroids) if generation else 0,
+                "pending": len(self.pending),
+                "fresh": len(self.fresh),
+                "deleted": len(self.deleted),
+                "last_rebuild": self.last_rebuild
+            }
+
+    async def start_rebuild_task(self, refresh_interval: int = settings.VECTOR_REFRESH_INTERVAL) -> None:
+        """Embed new documents in batches and rebuild in the background when needed"""
+        if self.rebuild_task and not self.rebuild_task.done():
+            return
+
+        async def rebuild_loop():
+            while True:
+                if self.needs_rebuild():
+                    await asyncio.to_thread(self.rebuild)
+                elif self.pending:
+                    await asyncio.to_thread(self.embed_pending)
+                await asyncio.sleep(refresh_interval)
+
+        self.rebuild_task = asyncio.create_task(rebuild_loop())
+
+    async def stop_rebuild_task(self) -> None:
+        """Stop the background task (the corpus log already holds every change)"""
+        if self.rebuild_task:
+            self.rebuild_task.cancel()
+            self.rebuild_task = None
+
+def fuse_rankings(rankings: Iterable[List[Tuple[str, float]]], k: int,
+                  constant: int = RRF_CONSTANT) -> List[Tuple[str, float]]:
+    """Reciprocal rank fusion of several best-first rankings"""
+    fused: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, (doc_id, _) in enumerate(ranking):
+            fused[doc_id] = fused.get(doc_id, 0.0) + 1.0 / (constant + rank + 1)
+    return sorted(fused.items(), key=lambda hit: hit[1], reverse=True)[:k]
+
+def normalize_scores(hits: List[Tuple[str, float]], mode: str) -> List[Tuple[str, float]]:
+    """Map one mode's scores onto 0-1
+
+    keyword: BM25 relative to the best hit; semantic: cosine similarity
+    clipped at 0; hybrid: RRF relative to ranking first in both lists.
+    """
+    if mode == "keyword":
+        best = hits[0][1] if hits else 0.0
+        return [(doc_id, score / best if best > 0 else 0.0) for doc_id, score in hits]
+    if mode == "semantic":
+        return [(doc_id, min(1.0, max(0.0, score))) for doc_id, score in hits]
+    best = 2.0 / (RRF_CONSTANT + 1)
+    return [(doc_id, min(1.0, score / best)) for doc_id, score in hits]
+
+def hybrid_search(query: str, k: int = 10, predicate: Optional[Callable[[str], bool]] = None,
+                  mode: str = "hybrid", normalize: bool = False) -> List[Tuple[str, float]]:
+    """Keyword (BM25), semantic (vector) or fused retrieval; falls back to keyword until vectors are built
+
+    Raw scores differ in scale by mode; normalize maps them onto 0-1 for the mode actually used.
+    """
+    if mode == "keyword" or not vector_index.ready:
+        mode = "keyword"
+        hits = search_index.search(query, k, predicate)
+    elif mode == "semantic":
+        hits = vector_index.search(query, k, predicate)
+    else:
+        depth = max(k, 50)
+        hits = fuse_rankings([
+            search_index.search(query, depth, predicate),
+            vector_index.search(query, depth, predicate)
+        ], k)
+    return normalize_scores(hits, mode) if normalize else hits
+
+# Global vector index; the app lifespan opens the last built generation
+vector_index = VectorIndex()
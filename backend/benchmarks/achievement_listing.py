@@ -0,0 +1,77 @@
+"""
+Microbenchmark for the achievement listing merge
+Compares the legacy nested linear scan against a dict-indexed merge
+(the same hash join the /achievements outer join performs in the database)
+
+Run from the backend directory: python -m benchmarks.achievement_listing
+"""
+
+from types import SimpleNamespace
+from datetime import datetime
+import timeit
+
+ACHIEVEMENT_COUNT = 500
+UNLOCK_COUNT = 500
+REPEAT = 5
+NUMBER = 10
+
+def build_fixtures(achievement_count: int, unlock_count: int):
+    """Build achievement and unlock rows shaped like the ORM objects"""
+    achievements = [SimpleNamespace(id=i) for i in range(1, achievement_count + 1)]
+    user_achievements = [
+        SimpleNamespace(achievement_id=i, unlocked_at=datetime(2024, 1, 1), progress=100.0)
+        for i in range(1, unlock_count + 1)
+    ]
+    return achievements, user_achievements
+
+def legacy_nested_scan(achievements, user_achievements):
+    """Original O(A x U) implementation"""
+    unlocked_achievement_ids = {ua.achievement_id for ua in user_achievements}
+    result = []
+    for achievement in achievements:
+        user_achievement = next(
+            (ua for ua in user_achievements if ua.achievement_id == achievement.id),
+            None
+        )
+        result.append((
+            achievement.id,
+            achievement.id in unlocked_achievement_ids,
+            user_achievement.unlocked_at if user_achievement else None,
+            user_achievement.progress if user_achievement else 0.0
+        ))
+    return result
+
+def indexed_merge(achievements, user_achievements):
+    """O(A + U) dict-indexed merge"""
+    by_achievement = {ua.achievement_id: ua for ua in user_achievements}
+    result = []
+    for achievement in achievements:
+        user_achievement = by_achievement.get(achievement.id)
+        result.append((
+            achievement.id,
+            user_achievement is not None,
+            user_achievement.unlocked_at if user_achievement else None,
+            user_achievement.progress if user_achievement else 0.0
+        ))
+    return result
+
+def main():
+    """Run the benchmark and print per-call timings"""
+    achievements, user_achievements = build_fixtures(ACHIEVEMENT_COUNT, UNLOCK_COUNT)
+    assert legacy_nested_scan(achievements, user_achievements) == indexed_merge(achievements, user_achievements)
+
+    print(f"📊 {ACHIEVEMENT_COUNT} achievements x {UNLOCK_COUNT} unlocks")
+    timings = {}
+    for name, func in (("legacy_nested_scan", legacy_nested_scan), ("indexed_merge", indexed_merge)):
+        best = min(timeit.repeat(
+            lambda: func(achievements, user_achievements),
+            repeat=REPEAT,
+            number=NUMBER
+        )) / NUMBER
+        timings[name] = best
+        print(f"  {name:<20} {best * 1000:8.3f} ms/call")
+
+    print(f"  speedup              {timings['legacy_nested_scan'] / timings['indexed_merge']:8.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark for AI request micro-batching
+Fires bursts of concurrent translate requests at a local stub model that
+charges a fixed overhead per call plus a small cost per input, with limited
+concurrent calls (like a GPU-backed endpoint), and compares one call per
+request against MicroBatcher
+
+Run from the backend directory: python -m benchmarks.ai_batching
+"""
+
+import asyncio
+import time
+from app.services.ai_batcher import MicroBatcher, AI_BATCH_OPERATIONS
+
+REQUESTS = 512
+CALL_OVERHEAD = 0.020  # Seconds per model call
+PER_ITEM = 0.001  # Seconds per input in a call
+MODEL_CONCURRENCY = 4  # Calls the backend serves at once
+
+class StubModel:
+    """Stand-in model endpoint with per-call overhead and bounded concurrency"""
+
+    def __init__(self):
+        self.semaphore = asyncio.Semaphore(MODEL_CONCURRENCY)
+        self.calls = 0
+
+    async def translate(self, items):
+        """Translate a list of inputs in one call"""
+        async with self.semaphore:
+            self.calls += 1
+            await asyncio.sleep(CALL_OVERHEAD + PER_ITEM * len(items))
+            return [f"[fr] {item['text']}" for item in items]
+
+async def run(submit):
+    """Fire every request at once and time each one"""
+    latencies = []
+
+    async def one(i):
+        start = time.perf_counter()
+        await submit({"text": f"sentence {i}"})
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(REQUESTS)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "throughput": REQUESTS / elapsed,
+        "p50": latencies[len(latencies) // 2] * 1000,
+        "p99": latencies[int(len(latencies) * 0.99)] * 1000
+    }
+
+async def benchmark():
+    """Compare unbatched and batched dispatch"""
+    unbatched_model = StubModel()
+
+    async def unbatched(item):
+        return (await unbatched_model.translate([item]))[0]
+
+    batched_model = StubModel()
+    batcher = MicroBatcher("translate_text", batched_model.translate, **AI_BATCH_OPERATIONS["translate_text"])
+
+    results = {
+        "one call per request": (await run(unbatched), unbatched_model.calls),
+        "micro-batched": (await run(batcher.submit), batched_model.calls)
+    }
+
+    print(f"📊 {REQUESTS} concurrent translate requests "
+          f"(stub: {CALL_OVERHEAD * 1000:.0f} ms/call + {PER_ITEM * 1000:.0f} ms/item, {MODEL_CONCURRENCY} concurrent calls)")
+    for name, (result, calls) in results.items():
+        print(f"  {name:22} {result['throughput']:8.0f} req/s   "
+              f"p50 {result['p50']:7.1f} ms   p99 {result['p99']:7.1f} ms   {calls:4} model calls")
+
+    gain = results["micro-batched"][0]["throughput"] / results["one call per request"][0]["throughput"]
+    print(f"  throughput gain        {gain:8.1f}x")
+
+def main():
+    """Run the benchmark"""
+    asyncio.run(benchmark())
+
+if __name__ == "__main__":
+    main()
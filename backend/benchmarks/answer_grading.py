@@ -0,0 +1,148 @@
+"""
+Benchmark for the local answer grader
+Grades a generated corpus of short_answer and code responses (exact, noisy,
+reordered, numeric, wrong and near-miss wrong variants) and reports per-answer
+latency, accuracy against the labels, the false-accept rate and how many
+answers would still need AI review
+
+Run from the backend directory: python -m benchmarks.answer_grading
+"""
+
+import random
+import time
+from app.services.answer_grader import answer_grader
+
+CORPUS_SIZE = 20000
+SEED = 7
+
+SHORT_ANSWERS = [
+    "Artificial Intelligence", "United Nations", "Sustainable Development Goals",
+    "photosynthesis", "mitochondria", "São Paulo", "Paris", "renewable energy",
+    "climate change", "machine learning", "carbon dioxide", "World Health Organization"
+]
+# Wrong answers that look like the key (character similarity alone would accept them)
+NEAR_MISSES = [
+    ("mitosis", "meiosis"), ("nitrite", "nitrate"), ("Austria", "Australia"), ("H2O", "H2O2"),
+    ("sodium chloride", "sodium chlorate"), ("ionic", "iconic"), ("x == 1", "x = 1"),
+    ("photosynthesis", "photosynthetic"), ("Sweden", "Swede"), ("affect", "effect")
+]
+NUMERIC_ANSWERS = ["17", "1945", "3.14", "50%", "1/2", "193", "2030", "0.75"]
+CODE_ANSWERS = [
+    "def add(a, b):\n    return a + b",
+    "for i in range(10):\n    print(i)",
+    "result = [x * x for x in items if x > 0]",
+    "int total = a + b;"
+]
+
+def typo(text: str, rng: random.Random) -> str:
+    """Swap two adjacent letters inside a long word"""
+    words = text.split()
+    candidates = [i for i, word in enumerate(words) if len(word) > 6]
+    if not candidates:
+        return text.upper()
+    i = rng.choice(candidates)
+    word = words[i]
+    j = rng.randrange(1, len(word) - 2)
+    words[i] = word[:j] + word[j + 1] + word[j] + word[j + 2:]
+    return " ".join(words)
+
+def build_corpus(size: int, rng: random.Random):
+    """Generate (correct_answer, user_answer, question_type, expected) rows"""
+    corpus = []
+    for _ in range(size):
+        kind = rng.random()
+        if kind < 0.1:
+            key, answer = rng.choice(NEAR_MISSES)
+            corpus.append((key, answer, "short_answer", False))
+        elif kind < 0.55:
+            key = rng.choice(SHORT_ANSWERS)
+            variant = rng.choice(["exact", "case", "punct", "article", "reorder", "accent", "typo", "wrong"])
+            if variant == "exact":
+                answer, expected = key, True
+            elif variant == "case":
+                answer, expected = f"  {key.upper()} ", True
+            elif variant == "punct":
+                answer, expected = f"{key}.", True
+            elif variant == "article":
+                answer, expected = f"the {key}", True
+            elif variant == "reorder":
+                answer, expected = " ".join(reversed(key.split())), True
+            elif variant == "accent":
+                answer, expected = key.replace("a", "á", 1), True
+            elif variant == "typo":
+                answer, expected = typo(key, rng), True
+            else:
+                answer, expected = rng.choice([a for a in SHORT_ANSWERS if a != key]), False
+            corpus.append((key, answer, "short_answer", expected))
+        elif kind < 0.8:
+            key = rng.choice(NUMERIC_ANSWERS)
+            value = answer_grader.parse_number(key)[0]
+            variant = rng.choice(["exact", "decimal", "near", "wrong"])
+            if variant == "exact":
+                answer, expected = key, True
+            elif variant == "decimal":
+                answer, expected = f"{value:.4f}", True
+            elif variant == "near":
+                # Within half a unit of an integer key, or 1% off a decimal one
+                answer, expected = (f"{value + 0.4:g}" if value == int(value) else f"{value * 1.01:.4f}"), False
+            else:
+                answer, expected = f"{value + 1:g}", False
+            corpus.append((key, answer, "short_answer", expected))
+        else:
+            key = rng.choice(CODE_ANSWERS)
+            variant = rng.choice(["exact", "spacing", "comment", "wrong"])
+            if variant == "exact":
+                answer, expected = key, True
+            elif variant == "spacing":
+                answer, expected = key.replace(" + ", "+").replace(", ", ",").replace("    ", "  "), True
+            elif variant == "comment":
+                answer, expected = key + "  # done", True
+            else:
+                answer, expected = key.replace("+", "-").replace("*", "/").replace("10", "11"), False
+            corpus.append((key, answer, "code", expected))
+    return corpus
+
+def legacy_grade(correct_answer: str, answer: str) -> bool:
+    """Original lower().strip() equality"""
+    return answer.lower().strip() == correct_answer.lower().strip()
+
+def main():
+    """Run the benchmark and print a summary"""
+    rng = random.Random(SEED)
+    corpus = build_corpus(CORPUS_SIZE, rng)
+
+    # Answer keys are prepared once per question, as the compiled quiz payload does
+    prepared = {(key, kind): answer_grader.prepare(key, kind) for key, _, kind, _ in corpus}
+
+    start = time.perf_counter()
+    grades = [answer_grader.grade(prepared[(key, kind)], answer) for key, answer, kind, _ in corpus]
+    elapsed = time.perf_counter() - start
+
+    decided = [grade for grade in grades if not grade["needs_review"]]
+    correct_decisions = sum(
+        1 for grade, (_, _, _, expected) in zip(grades, corpus)
+        if not grade["needs_review"] and grade["is_correct"] == expected
+    )
+    wrong = [grade for grade, (_, _, _, expected) in zip(grades, corpus) if not expected]
+    false_accepts = sum(1 for grade in wrong if grade["is_correct"])
+    near_miss_keys = {key for key, _ in NEAR_MISSES}
+    near_misses = [
+        grade for grade, (key, _, _, expected) in zip(grades, corpus)
+        if not expected and key in near_miss_keys
+    ]
+    legacy_correct = sum(
+        1 for key, answer, _, expected in corpus
+        if legacy_grade(key, answer) == expected
+    )
+
+    print(f"📊 {CORPUS_SIZE} generated answers")
+    print(f"  grader latency        {elapsed / CORPUS_SIZE * 1e6:8.2f} µs/answer")
+    print(f"  decided locally       {len(decided) / CORPUS_SIZE * 100:8.1f} %")
+    print(f"  accuracy (decided)    {correct_decisions / max(1, len(decided)) * 100:8.1f} %")
+    print(f"  false accepts         {false_accepts / max(1, len(wrong)) * 100:8.2f} %  ({false_accepts} of {len(wrong)} wrong)")
+    print(f"  near misses accepted  {sum(1 for grade in near_misses if grade['is_correct']):8d}    "
+          f"(of {len(near_misses)}, {sum(1 for grade in near_misses if grade['needs_review'])} sent to review)")
+    print(f"  legacy accuracy       {legacy_correct / CORPUS_SIZE * 100:8.1f} %")
+
+if __name__ == "__main__":
+    main()
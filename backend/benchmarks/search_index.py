@@ -0,0 +1,110 @@
+"""
+Benchmark for the BM25 full-text index
+Indexes synthetic research records (Zipf-distributed vocabulary, short title
+plus abstract) and reports build throughput, postings compression, top-k query
+latency, incremental updates and snapshot save/load
+
+Run from the backend directory: python -m benchmarks.search_index [documents]
+"""
+
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+from app.services.search_index import InvertedIndex
+
+DOCUMENTS = 1_000_000
+VOCABULARY = 50_000
+TITLE_WORDS = 8
+ABSTRACT_WORDS = 40
+QUERIES = 200
+SEED = 5
+
+SYLLABLES = ["ka", "ro", "mi", "sun", "tel", "va", "dor", "pli", "nex", "qua", "zen", "lo", "bri", "gat", "hu", "for"]
+
+def build_vocabulary(rng: np.random.Generator) -> list:
+    """Pronounceable pseudo-words so the stemmer sees realistic input"""
+    words = set()
+    while len(words) < VOCABULARY:
+        words.add("".join(rng.choice(SYLLABLES, size=rng.integers(2, 5))))
+    return sorted(words)
+
+def documents(count: int, vocabulary: list, rng: np.random.Generator):
+    """Yield index records with Zipf-distributed words"""
+    ranks = np.arange(1, len(vocabulary) + 1)
+    weights = 1.0 / ranks
+    weights /= weights.sum()
+    batch = 10_000
+    for start in range(0, count, batch):
+        size = min(batch, count - start)
+        picks = rng.choice(len(vocabulary), size=(size, TITLE_WORDS + ABSTRACT_WORDS), p=weights)
+        for offset, row in enumerate(picks):
+            words = [vocabulary[i] for i in row]
+            yield {
+                "doc_id": f"doc_{start + offset}",
+                "title": " ".join(words[:TITLE_WORDS]),
+                "abstract": " ".join(words[TITLE_WORDS:])
+            }
+
+def percentile(values: list, p: float) -> float:
+    """p-th percentile in milliseconds"""
+    return float(np.percentile(values, p)) * 1000
+
+def main():
+    """Run the benchmark and print a summary"""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else DOCUMENTS
+    rng = np.random.default_rng(SEED)
+    vocabulary = build_vocabulary(rng)
+    index = InvertedIndex(path=os.path.join(tempfile.mkdtemp(), "search_index.npz"))
+
+    print(f"📊 Build ({count:,} documents, {TITLE_WORDS + ABSTRACT_WORDS} words each)")
+    start = time.perf_counter()
+    index.add_documents(documents(count, vocabulary, rng))
+    elapsed = time.perf_counter() - start
+    stats = index.stats()
+    print(f"  build time            {elapsed:10.1f} s   ({count / elapsed:,.0f} docs/s)")
+    print(f"  terms                 {stats['terms']:10,}")
+    print(f"  postings              {stats['postings']:10,}")
+    print(f"  postings memory       {stats['postings_bytes'] / 2**20:10.1f} MB  "
+          f"({stats['bytes_per_posting']} B/posting vs 12 B uncompressed)")
+
+    print("📊 Top-10 query latency")
+    for terms, label in ((1, "1 rare term"), (1, "1 common term"), (2, "2 terms"), (3, "3 terms")):
+        timings = []
+        for _ in range(QUERIES):
+            if label == "1 common term":
+                words = [vocabulary[int(rng.integers(0, 20))]]
+            elif label == "1 rare term":
+                words = [vocabulary[int(rng.integers(1000, len(vocabulary)))]]
+            else:
+                words = [vocabulary[int(rng.integers(0, 2000))] for _ in range(terms)]
+            query = " ".join(words)
+            begin = time.perf_counter()
+            index.search(query, 10)
+            timings.append(time.perf_counter() - begin)
+        print(f"  {label:15}   p50 {percentile(timings, 50):8.2f} ms   p95 {percentile(timings, 95):8.2f} ms")
+
+    print("📊 Incremental updates")
+    begin = time.perf_counter()
+    for record in documents(1000, vocabulary, rng):
+        index.add_document(f"new_{record['doc_id']}", record["title"], record["abstract"])
+    print(f"  add (per document)    {(time.perf_counter() - begin):10.3f} ms")
+    begin = time.perf_counter()
+    for i in range(1000):
+        index.remove_document(f"doc_{i}")
+    print(f"  remove (per document) {(time.perf_counter() - begin):10.3f} ms")
+
+    print("📊 Snapshot")
+    begin = time.perf_counter()
+    index.save_snapshot()
+    saved = time.perf_counter() - begin
+    print(f"  save                  {saved:10.1f} s   ({os.path.getsize(index.path) / 2**20:.1f} MB on disk)")
+    restored = InvertedIndex(path=index.path)
+    begin = time.perf_counter()
+    restored.load_snapshot()
+    print(f"  load                  {time.perf_counter() - begin:10.1f} s   ({len(restored):,} documents)")
+    os.remove(index.path)
+
+if __name__ == "__main__":
+    main()
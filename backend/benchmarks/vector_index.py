@@ -0,0 +1,100 @@
+"""
+Benchmark for semantic vector search
+Part one rebuilds a generation end to end from a synthetic corpus log (batch
+embedding, IVF training, regrouping, atomic swap); part two measures IVF top-k
+latency and recall against exact search on a 1M x 256 float16 memory map
+
+Run from the backend directory: python -m benchmarks.vector_index [rows]
+"""
+
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+from app.services.vector_index import VectorIndex, IVFIndex
+
+CORPUS_DOCUMENTS = 20_000
+ROWS = 1_000_000
+DIM = 256
+TOPICS = 2_000
+QUERIES = 100
+K = 10
+NPROBES = [4, 8, 16, 32]
+SEED = 3
+
+WORDS = [
+    "solar", "grid", "energy", "health", "clinic", "vaccine", "school", "teacher", "literacy", "water",
+    "sanitation", "rainfall", "drought", "crop", "yield", "market", "income", "youth", "employment", "policy",
+    "climate", "flood", "migration", "mobile", "internet", "access", "rural", "urban", "women", "finance"
+]
+
+def rebuild_corpus(directory: str, rng: np.random.Generator) -> None:
+    """Time a full rebuild from the corpus log"""
+    index = VectorIndex(directory=directory)
+    for i in range(CORPUS_DOCUMENTS):
+        words = rng.choice(WORDS, size=40)
+        index.add_document(f"doc_{i}", " ".join(words))
+    start = time.perf_counter()
+    index.rebuild()
+    elapsed = time.perf_counter() - start
+    stats = index.stats()
+    print(f"📊 Rebuild ({CORPUS_DOCUMENTS:,} documents, {stats['backend']} embedder, {stats['dimensions']} dims)")
+    print(f"  rebuild time          {elapsed:10.1f} s   ({CORPUS_DOCUMENTS / elapsed:,.0f} docs/s)")
+    begin = time.perf_counter()
+    for _ in range(QUERIES):
+        index.search("rural clinic vaccine access", K)
+    print(f"  query (embed + ANN)   {(time.perf_counter() - begin) / QUERIES * 1000:10.2f} ms")
+
+def clustered_rows(rows: int, centers: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """Unit vectors scattered around the topic centers"""
+    vectors = centers[rng.integers(0, TOPICS, rows)] + 0.6 * rng.standard_normal((rows, DIM)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+def ann(directory: str, rows: int, rng: np.random.Generator) -> None:
+    """IVF latency and recall@K"""
+    raw_path = os.path.join(directory, "raw.npy")
+    centers = rng.standard_normal((TOPICS, DIM)).astype(np.float32)
+    raw = np.lib.format.open_memmap(raw_path, mode="w+", dtype=np.float16, shape=(rows, DIM))
+    for start in range(0, rows, 100_000):
+        raw[start:start + 100_000] = clustered_rows(min(100_000, rows - start), centers, rng)
+    raw.flush()
+    del raw
+
+    start = time.perf_counter()
+    index, _ = IVFIndex.build(raw_path, directory)
+    print(f"📊 IVF ({rows:,} x {DIM} float16, {len(index.centroids)} lists)")
+    print(f"  build time            {time.perf_counter() - start:10.1f} s")
+    print(f"  matrix on disk        {os.path.getsize(os.path.join(directory, 'vectors.npy')) / 2**20:10.1f} MB")
+
+    queries = clustered_rows(QUERIES, centers, rng)
+    exact = []
+    for query in queries:
+        scores = np.empty(rows, dtype=np.float32)
+        for begin in range(0, rows, 200_000):
+            scores[begin:begin + 200_000] = np.asarray(index.vectors[begin:begin + 200_000], dtype=np.float32) @ query
+        exact.append(set(np.argpartition(-scores, K - 1)[:K].tolist()))
+
+    for nprobe in NPROBES:
+        timings = []
+        recall = 0
+        for query, truth in zip(queries, exact):
+            begin = time.perf_counter()
+            found, _ = index.search(query, nprobe, K)
+            timings.append(time.perf_counter() - begin)
+            recall += len(truth & set(found.tolist()))
+        print(f"  nprobe {nprobe:3}   p50 {np.percentile(timings, 50) * 1000:7.2f} ms   "
+              f"p95 {np.percentile(timings, 95) * 1000:7.2f} ms   recall@{K} {recall / (K * QUERIES):.3f}")
+
+def main():
+    """Run the benchmark"""
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else ROWS
+    rng = np.random.default_rng(SEED)
+    with tempfile.TemporaryDirectory() as directory:
+        rebuild_corpus(os.path.join(directory, "corpus"), rng)
+    with tempfile.TemporaryDirectory() as directory:
+        ann(directory, rows, rng)
+
+if __name__ == "__main__":
+    main()
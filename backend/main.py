@@ -7,12 +7,25 @@ from fastapi import FastAPI, HTTPException, Depends, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer
 from contextlib import asynccontextmanager
+import asyncio
 import uvicorn
 from app.core.config import settings
 from app.api.v1.api import api_router
 from app.core.cache import cache
 from app.api.v1.endpoints.chatbot_optimized import start_conversation_cleanup
 from app.api.v1.endpoints.voice_optimized import start_audio_cleanup
+from app.services.daily_challenges import daily_challenge_service
+from app.services.quiz_sessions import quiz_sessions
+from app.services.learning_progress import learning_progress
+from app.services.question_analytics import question_analytics
+from app.services.ai_cache import ai_result_cache
+from app.services.ai_service import ai_service
+from app.services.local_inference import local_inference
+from app.services.research_ingestion import research_ingestion
+from app.services.search_index import search_index
+from app.services.vector_index import vector_index
+from app.services.research_counters import research_counters
+from app.api.v1.endpoints.database_optimized import data_store
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -24,12 +37,38 @@ async def lifespan(app: FastAPI):
     await cache.start_cleanup_task()
     await start_conversation_cleanup()
     await start_audio_cleanup()
+    await daily_challenge_service.start_scheduler()
+    await quiz_sessions.start_checkpoint_task()
+    await learning_progress.start_reconcile_task()
+    await question_analytics.start_flush_task()
+    await ai_service.start()
+    if settings.LOCAL_INFERENCE_ENABLED:
+        await local_inference.start()
+    await research_ingestion.start()
+    await search_index.start_snapshot_task()
+    # Open the last vector generation and queue what it lacks before rebuilds start
+    await asyncio.to_thread(vector_index.load)
+    await asyncio.to_thread(data_store.index_vectors)
+    await vector_index.start_rebuild_task()
+    await research_counters.start_flush_task()
     
     print("✅ Cache and background services initialized")
     
     yield
     # Shutdown
     print("🛑 HANU-YOUTH Backend Shutting Down...")
+    await daily_challenge_service.stop_scheduler()
+    await quiz_sessions.stop_checkpoint_task()
+    await learning_progress.stop_reconcile_task()
+    await question_analytics.stop_flush_task()
+    await ai_service.close()
+    await local_inference.shutdown()
+    await research_ingestion.stop()
+    await search_index.stop_snapshot_task()
+    await vector_index.stop_rebuild_task()
+    await research_counters.stop_flush_task()
+    ai_result_cache.purge_expired()
+    ai_result_cache.close()
 
 # Create FastAPI app
 app = FastAPI(
@@ -0,0 +1,31 @@
+"""
+Test configuration for HANU-YOUTH backend
+Points the database and data files at a scratch directory before the app is imported
+"""
+
+import os
+import sys
+import tempfile
+
+DATA_DIR = tempfile.mkdtemp(prefix="hanu-youth-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(DATA_DIR, 'test.db')}")
+os.environ.setdefault("DATA_DIR", DATA_DIR)
+os.environ.setdefault("AI_CACHE_PATH", ":memory:")
+os.environ.setdefault("DEBUG", "false")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from app.core.database import Base, engine, SessionLocal
+import app.models  # noqa: F401  (registers every table)
+
+Base.metadata.create_all(bind=engine)
+
+@pytest.fixture
+def db():
+    """Session on the scratch database, rolled back and closed after the test"""
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.rollback()
+        session.close()
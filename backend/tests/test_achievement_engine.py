@@ -0,0 +1,31 @@
+"""
+Tests for achievement unlocks
+"""
+
+from app.core.cache import cache, CACHE_KEYS
+from app.models import User, Achievement, UserAchievement
+from app.services.achievement_engine import AchievementRuleEngine
+
+def test_unlock_is_granted_once_despite_a_stale_cache(db):
+    achievement = Achievement(
+        name="Searcher", description="d", icon="i", category="research",
+        xp_reward=100, coin_reward=50, gem_reward=0, criteria={"type": "search", "count": 1}
+    )
+    user = User(email="searcher@example.com", username="searcher", hashed_password="x",
+                xp=0, coins=0, gems=0, total_searches=1)
+    db.add_all([achievement, user])
+    db.commit()
+    engine = AchievementRuleEngine()
+    engine.compile([achievement])
+
+    first = engine.process_events(db, user, ["search_performed"])
+    db.commit()
+    # Another worker's cache still says nothing is unlocked
+    cache.set(CACHE_KEYS['USER_ACHIEVEMENTS'].format(user_id=user.id), set())
+    second = engine.process_events(db, user, ["search_performed"])
+    db.commit()
+
+    assert [rule["achievement_id"] for rule in first] == [achievement.id]
+    assert second == []
+    assert (user.xp, user.coins) == (100, 50)
+    assert db.query(UserAchievement).filter(UserAchievement.user_id == user.id).count() == 1
@@ -0,0 +1,51 @@
+"""
+Tests for the AI result cache
+"""
+
+import pytest
+from app.services.ai_cache import AIResultCache, DEGRADED_KEY
+from app.services.ai_service import ai_service
+
+@pytest.mark.asyncio
+async def test_degraded_results_are_not_stored():
+    cache = AIResultCache(path=":memory:")
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        return {"text": "x", DEGRADED_KEY: True}
+
+    await cache.get_or_compute("fact_check", {"text": "x"}, compute)
+    await cache.get_or_compute("fact_check", {"text": "x"}, compute)
+    assert len(calls) == 2
+    assert await cache.get(cache.make_key("fact_check", {"text": "x"})) is None
+
+@pytest.mark.asyncio
+async def test_real_results_are_stored():
+    cache = AIResultCache(path=":memory:")
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        return {"translated_text": "bonjour"}
+
+    first = await cache.get_or_compute("translate_text", {"text": "hello"}, compute)
+    second = await cache.get_or_compute("translate_text", {"text": "hello"}, compute)
+    assert first == second == {"translated_text": "bonjour"}
+    assert len(calls) == 1
+
+@pytest.mark.asyncio
+async def test_mock_fallbacks_are_flagged_degraded():
+    ai_service.api_key = None
+    [fact] = await ai_service._fact_check_batch([{"text": "The sky is blue", "context": None}])
+    [translation] = await ai_service._translate_batch([
+        {"text": "hello", "source_language": "en", "target_language": "fr"}
+    ])
+    assert fact[DEGRADED_KEY] and translation[DEGRADED_KEY]
+
+@pytest.mark.asyncio
+async def test_generated_quiz_is_keyed_by_question_types():
+    multiple_choice = await ai_service.generate_quiz("Solar energy", "easy", 2, ["multiple_choice"])
+    true_false = await ai_service.generate_quiz("Solar energy", "easy", 2, ["true_false"])
+    assert {q["question_type"] for q in multiple_choice["questions"]} == {"multiple_choice"}
+    assert {q["question_type"] for q in true_false["questions"]} == {"true_false"}
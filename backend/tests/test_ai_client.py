@@ -0,0 +1,88 @@
+"""
+Tests for the pooled model API client
+"""
+
+import asyncio
+import json
+import pytest
+import pytest_asyncio
+from app.services.ai_service import HAIService
+
+class CountingServer:
+    """Minimal keep-alive HTTP/1.1 server that counts TCP connections"""
+
+    def __init__(self):
+        self.connections = 0
+        self.requests = 0
+        self.server = None
+
+    async def start(self) -> str:
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+        host, port = self.server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    async def stop(self) -> None:
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in head.decode().split("\r\n"):
+                    name, _, value = line.partition(":")
+                    if name.lower() == "content-length":
+                        length = int(value)
+                await reader.readexactly(length)
+                self.requests += 1
+                body = json.dumps({"request": self.requests}).encode()
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    + f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+@pytest_asyncio.fixture
+async def server():
+    server = CountingServer()
+    url = await server.start()
+    yield server, url
+    await server.stop()
+
+def make_service(url):
+    service = HAIService()
+    service.base_url = url
+    return service
+
+@pytest.mark.asyncio
+async def test_post_reuses_one_connection(server):
+    server, url = server
+    service = make_service(url)
+    await service.start()
+    try:
+        results = [await service._post("/echo", {"n": n}) for n in range(5)]
+    finally:
+        await service.close()
+
+    assert [result["request"] for result in results] == [1, 2, 3, 4, 5]
+    assert server.connections == 1
+
+@pytest.mark.asyncio
+async def test_post_outside_lifespan_opens_shared_client(server):
+    server, url = server
+    service = make_service(url)
+
+    await service._post("/echo", {})
+    client = service.client
+    await service._post("/echo", {})
+
+    assert service.client is client
+    assert server.connections == 1
+    await service.close()
+    assert service.client is None
@@ -0,0 +1,45 @@
+"""
+Tests for daily challenge materialization and batched progress
+"""
+
+from datetime import date, datetime
+import pytest
+from app.core.cache import cache, CACHE_KEYS
+from app.models import DailyChallenge, UserDailyChallenge
+from app.services.daily_challenges import DailyChallengeService
+from app.services.gamification_service import gamification_service
+
+def test_materialize_ignores_rows_another_worker_inserted(db):
+    day = date(2030, 1, 2)
+    template = gamification_service.generate_daily_challenges(day)[0]
+    # Another worker inserted one of the day's challenges (inactive, so the read misses it)
+    db.add(DailyChallenge(
+        challenge_key=template["id"], title=template["title"], description=template["description"],
+        challenge_type=template["type"], target_value=template["target_value"],
+        challenge_date=datetime.combine(day, datetime.min.time()), is_active=False
+    ))
+    db.commit()
+
+    challenges = DailyChallengeService().materialize(db, day)
+
+    assert len(challenges) == 2
+    assert db.query(DailyChallenge).filter(DailyChallenge.challenge_key == template["id"]).count() == 1
+
+@pytest.mark.asyncio
+async def test_flush_resolves_challenges_on_the_loop(db, monkeypatch):
+    service = DailyChallengeService()
+    day = datetime.now().date()
+    cache.delete(CACHE_KEYS['DAILY_CHALLENGES'].format(day=day.isoformat()))
+    challenge_type = gamification_service.generate_daily_challenges(day)[0]["type"]
+
+    def no_thread_lookups(*args, **kwargs):
+        raise AssertionError("challenges must be resolved before the worker thread")
+
+    monkeypatch.setattr(service, "get_challenges", no_thread_lookups)
+    monkeypatch.setattr(service, "materialize", no_thread_lookups)
+    service.activity_stream.append((42, challenge_type, 1, day))
+
+    assert await service.flush() == 1
+    assert service.materialized_day == day
+    assert cache.get(CACHE_KEYS['DAILY_CHALLENGES'].format(day=day.isoformat()))
+    assert db.query(UserDailyChallenge).filter(UserDailyChallenge.user_id == 42).count() == 1
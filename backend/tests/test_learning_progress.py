@@ -0,0 +1,64 @@
+"""
+Tests for learning path rollups and reconciliation
+"""
+
+from datetime import datetime
+import pytest
+from app.models import User, LearningPath, LearningModule, UserModuleProgress, UserPathProgress
+from app.services.learning_progress import LearningProgressEngine
+
+@pytest.fixture
+def path(db):
+    path = LearningPath(title="Path", description="d", category="ai", xp_reward=500, coin_reward=250)
+    db.add(path)
+    db.flush()
+    module = LearningModule(path_id=path.id, title="M", description="d", content="c")
+    db.add(module)
+    db.commit()
+    return path, module
+
+def make_user(db, name):
+    user = User(email=f"{name}@example.com", username=name, hashed_password="x", xp=0, coins=0)
+    db.add(user)
+    db.commit()
+    return user
+
+def test_module_completes_once_under_a_stale_read(db, path):
+    engine = LearningProgressEngine()
+    user = make_user(db, "stale")
+    _, module = path
+    progress = UserModuleProgress(user_id=user.id, module_id=module.id, is_completed=False)
+    db.add(progress)
+    db.commit()
+
+    # A concurrent request completes the module after this one read the row
+    db.query(UserModuleProgress).filter(UserModuleProgress.id == progress.id).update(
+        {UserModuleProgress.is_completed: True}, synchronize_session=False
+    )
+
+    assert not engine._complete_module(db, progress, datetime.now())
+
+def test_path_progress_is_one_row_per_user_and_path(db, path):
+    engine = LearningProgressEngine()
+    user = make_user(db, "twice")
+    first = engine.ensure_path_progress(db, user.id, path[0].id, 1, datetime.now())
+    second = engine.ensure_path_progress(db, user.id, path[0].id, 1, datetime.now())
+
+    assert first.id == second.id
+    assert db.query(UserPathProgress).filter(UserPathProgress.user_id == user.id).count() == 1
+
+def test_reconcile_grants_path_rewards_once(db, path):
+    engine = LearningProgressEngine()
+    user = make_user(db, "missed")
+    path, module = path
+    # Module completed but the path rollup was never applied
+    db.add(UserModuleProgress(user_id=user.id, module_id=module.id, is_completed=True))
+    db.add(UserPathProgress(user_id=user.id, path_id=path.id, is_completed=False, modules_completed=0))
+    db.commit()
+
+    _, rewarded = engine.reconcile(db)
+    _, rewarded_again = engine.reconcile(db)
+
+    db.refresh(user)
+    assert user.id in rewarded and user.id not in rewarded_again
+    assert (user.xp, user.coins) == (500, 250)
@@ -0,0 +1,21 @@
+"""
+Tests for the local inference process pool
+"""
+
+import pytest
+from app.services import local_inference as module
+from app.services.local_inference import LocalInferenceBackend
+
+def broken_init(*args):
+    raise RuntimeError("model failed to load")
+
+@pytest.mark.asyncio
+async def test_failed_warmup_leaves_backend_disabled(monkeypatch):
+    monkeypatch.setattr(LocalInferenceBackend, "available", staticmethod(lambda: True))
+    monkeypatch.setattr(module, "_init_worker", broken_init)
+    backend = LocalInferenceBackend(workers=1)
+
+    await backend.start()
+
+    assert not backend.ready
+    assert backend.stats["warm_start_seconds"] is None
@@ -0,0 +1,43 @@
+"""
+Tests for database-enforced power-up quotas
+"""
+
+from datetime import datetime, timedelta
+from app.core.cache import cache
+from app.models import UserPowerUp
+from app.services.power_up_quota import PowerUpQuotaStore
+
+def uses_in_db(db, user_id, power_up_id):
+    db.expire_all()
+    return db.query(UserPowerUp.uses_today).filter(
+        UserPowerUp.user_id == user_id, UserPowerUp.power_up_id == power_up_id
+    ).scalar()
+
+def test_limit_holds_when_another_process_used_the_quota(db):
+    store = PowerUpQuotaStore()
+    store.load_counters(db, 7, [1])  # this process's counter says 0 uses
+    assert store.peek_uses(7, 1) == 0
+
+    # Another worker process uses both of today's uses
+    db.add(UserPowerUp(user_id=7, power_up_id=1, uses_today=2, last_used=datetime.now()))
+    db.commit()
+
+    assert store.try_consume(db, 7, 1, max_uses=2) is None
+    assert uses_in_db(db, 7, 1) == 2
+    assert store.peek_uses(7, 1) == 2
+
+def test_consume_counts_in_database_and_resets_daily(db):
+    store = PowerUpQuotaStore()
+    assert store.try_consume(db, 8, 1, max_uses=2) == 1
+    assert store.try_consume(db, 8, 1, max_uses=2) == 2
+    db.commit()
+    assert store.try_consume(db, 8, 1, max_uses=2) is None
+    assert uses_in_db(db, 8, 1) == 2
+
+    # Yesterday's uses do not count against today
+    db.query(UserPowerUp).filter(UserPowerUp.user_id == 8).update(
+        {UserPowerUp.last_used: datetime.now() - timedelta(days=1)}
+    )
+    db.commit()
+    cache.delete(store._key(8, 1, datetime.now().date()))
+    assert store.try_consume(db, 8, 1, max_uses=2) == 1
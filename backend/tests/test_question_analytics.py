@@ -0,0 +1,32 @@
+"""
+Tests for per-question answer analytics
+"""
+
+from app.models import QuestionStats
+from app.services.question_analytics import QuestionAnalytics
+
+def test_flushes_from_two_workers_add_up(db):
+    first, second = QuestionAnalytics(), QuestionAnalytics()
+    first.record(901, True, 4)
+    second.record(901, False, 40)
+    second.record(901, True, 4)
+
+    first.flush_sync()
+    second.flush_sync()
+
+    row = db.query(QuestionStats).filter(QuestionStats.question_id == 901).one()
+    assert (row.attempts, row.correct, row.time_spent_total) == (3, 2, 48)
+    assert sum(row.time_histogram) == 3
+    assert second.get_stats(db, 901)["attempts"] == 3
+
+def test_cached_totals_are_bounded(db):
+    analytics = QuestionAnalytics(max_cached_totals=2)
+    for question_id in (911, 912, 913):
+        analytics.get_stats(db, question_id)
+    assert list(analytics.totals) == [912, 913]
+
+def test_failed_flush_requeues_deltas():
+    analytics = QuestionAnalytics()
+    analytics.record(921, True, 3)
+    assert analytics._after_write({}, analytics._take_pending()) == 0
+    assert analytics.pending[921]["attempts"] == 1
@@ -0,0 +1,77 @@
+"""
+Tests for cache-resident quiz sessions and checkpointing
+"""
+
+import pytest
+from app.models import QuizAttempt, UserAnswer
+from app.services.answer_grader import answer_grader
+from app.services.quiz_sessions import QuizSessionStore
+
+KEY = {
+    "question_type": "short_answer",
+    "correct_answer": "Paris",
+    "normalized_answer": "paris",
+    "prepared": answer_grader.prepare("Paris", "short_answer"),
+    "points": 10,
+    "explanation": None
+}
+
+@pytest.fixture
+def attempt(db):
+    attempt = QuizAttempt(user_id=1, quiz_id=1, max_score=20.0)
+    db.add(attempt)
+    db.commit()
+    return attempt
+
+def open_session(store, attempt):
+    return store.create(attempt, {1: KEY, 2: KEY}, {"xp_reward": 0, "coin_reward": 0})
+
+def record(store, session, question_id):
+    store._record(session, KEY, question_id, "Paris", 5)
+    store.dirty.add(session["attempt_id"])
+
+def answers(db, attempt):
+    db.expire_all()
+    return db.query(UserAnswer).filter(UserAnswer.attempt_id == attempt.id).count()
+
+def test_failed_commit_keeps_answers_pending(db, attempt, monkeypatch):
+    store = QuizSessionStore()
+    session = open_session(store, attempt)
+    record(store, session, 1)
+
+    def fail():
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(db, "commit", fail)
+    assert store.checkpoint_session(db, session) == 0
+    assert len(session["pending"]) == 1
+    monkeypatch.undo()
+
+    assert store.checkpoint_session(db, session) == 1
+    assert session["pending"] == [] and answers(db, attempt) == 1
+
+def test_stale_checkpoint_does_not_overwrite_newer_tallies(db, attempt):
+    store = QuizSessionStore()
+    session = open_session(store, attempt)
+    record(store, session, 1)
+    stale = store._take_due(force=True)  # snapshot at one answer, written "later"
+
+    record(store, session, 2)
+    store.checkpoint_session(db, session)
+    store._write_checkpoints(stale)
+
+    db.expire_all()
+    row = db.get(QuizAttempt, attempt.id)
+    assert (row.answered_count, row.score) == (2, 20.0)
+    assert answers(db, attempt) == 2
+
+def test_failed_checkpoint_of_closed_session_is_retried(db, attempt):
+    store = QuizSessionStore()
+    session = open_session(store, attempt)
+    record(store, session, 1)
+    batches = store._take_due(force=True)
+
+    store.close(attempt.id)
+    store._requeue(batches)  # the thread's write failed after the attempt closed
+    assert store.checkpoint_sync() == 1
+    assert answers(db, attempt) == 1
@@ -0,0 +1,48 @@
+"""
+Tests for buffered research counters
+"""
+
+import asyncio
+import time
+import pytest
+from app.services.research_counters import ResearchCounters
+
+@pytest.mark.asyncio
+async def test_stop_during_flush_writes_each_delta_once():
+    counters = ResearchCounters(flush_interval=0)
+    written = []
+
+    def slow_sync(deltas):
+        time.sleep(0.2)  # still writing when stop_flush_task cancels the loop
+        written.append(deltas)
+        return True, {}
+
+    counters._sync = slow_sync
+    counters.load = lambda: 0
+    counters.record_view("paper", 3)
+    await counters.start_flush_task()
+    await asyncio.sleep(0.05)
+    counters.record_view("paper", 2)
+    await counters.stop_flush_task()
+
+    views = sum(deltas.get("paper", [0, 0])[0] for deltas in written)
+    assert views == 5
+    assert counters.in_flight == {}
+
+@pytest.mark.asyncio
+async def test_failed_write_is_retried_with_new_deltas():
+    counters = ResearchCounters(flush_interval=60)
+    outcomes = iter([(False, {}), (True, {})])
+    written = []
+
+    def sync(deltas):
+        written.append(deltas)
+        return next(outcomes)
+
+    counters._sync = sync
+    counters.record_download("paper")
+    await counters.flush()
+    counters.record_download("paper")
+    await counters.flush()
+    assert written[-1] == {"paper": [0, 2]}
+    assert counters.unflushed("paper") == (0, 0)
@@ -0,0 +1,33 @@
+"""
+Tests for shop catalog payloads
+"""
+
+from app.models import InventoryItem
+from app.services.seed_data import seed_shop_items
+from app.services.shop_catalog import ShopCatalog
+
+def item(**fields):
+    fields.setdefault("slug", "item")
+    fields.setdefault("name", "Item")
+    return InventoryItem(**fields)
+
+def test_discount_is_per_currency():
+    gems_only = ShopCatalog._to_dict(item(
+        cost_coins=0, cost_gems=10, original_cost_coins=0, original_cost_gems=15
+    ))
+    mixed = ShopCatalog._to_dict(item(
+        cost_coins=900, cost_gems=1, original_cost_coins=1000, original_cost_gems=20
+    ))
+
+    assert gems_only["discount"] == 0.33
+    assert "discount" not in mixed
+    assert mixed["original_cost"] == {"coins": 1000, "gems": 20}
+
+def test_seeded_starter_pack_has_no_end_date(db):
+    if not db.query(InventoryItem).filter(InventoryItem.slug == "bundle_starter_pack").first():
+        seed_shop_items(db)
+    starter = db.query(InventoryItem).filter(InventoryItem.slug == "bundle_starter_pack").one()
+
+    assert starter.available_until is None
+    payload = ShopCatalog._to_dict(starter)
+    assert payload["is_limited"] and "ends_at" not in payload